@@ -0,0 +1,217 @@
+import html
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# Syntetyczne odpowiedniki OLX, Allegro Lokalnie i grup FB - te same selektory i formaty co prawdziwe strony,
+# więc scrapery działają bez zmian (bazowe URL-e podmienia config benchmarku).
+
+MODELS = [
+    'iPhone 11', 'iPhone 11 Pro', 'iPhone 12', 'iPhone 12 Pro', 'iPhone 13', 'iPhone 13 Pro',
+    'iPhone 13 Pro Max', 'iPhone 14', 'iPhone 14 Pro', 'iPhone 15'
+]
+STORAGE = ['64GB', '128GB', '256GB']
+CONDITIONS = [
+    ('zbity ekran', 'Ekran pęknięty, dotyk działa, reszta sprawna.'),
+    ('uszkodzony', 'Telefon uszkodzony, nie ładuje się. Sprzedam na części.'),
+    ('nie włącza się', 'Po zalaniu nie włącza się, obudowa ładna.'),
+    ('blokada icloud', 'Blokada iCloud, brak dostępu do konta.'),
+    ('pęknięte plecki', 'Pęknięte plecki, ekran bez rys, bateria 85%.'),
+    ('stan idealny', 'Stan idealny, bateria 91%, komplet z pudełkiem.')
+]
+SOURCES = ('olx', 'allegro', 'facebook')
+
+
+class SyntheticMarketplace:
+    """
+    Lokalny serwer HTTP z ogłoszeniami trzech źródeł (najnowsze pierwsze).
+
+    Args:
+        listings: liczba ogłoszeń na start w każdym źródle
+        new_share: jaka część pierwszej strony (page_size) pojawia się jako nowa przy każdym advance()
+        latency_ms: sztuczne opóźnienie każdej odpowiedzi
+        groups: liczba grup FB (feed każdej grupy to osobny wycinek ogłoszeń)
+    """
+
+    def __init__(self, listings=500, new_share=0.2, latency_ms=0, groups=3, page_size=25, feed_size=40, seed=1):
+        self.new_share = new_share
+        self.latency = latency_ms / 1000
+        self.groups = groups
+        self.page_size = page_size
+        self.feed_size = feed_size
+        self._random = random.Random(seed)
+        self._next_id = 100000
+        self._lock = threading.Lock()
+        self.feeds = {source: [self._listing() for _ in range(listings)] for source in SOURCES}
+        self.requests = 0
+        self._server = None
+        self._thread = None
+
+    def _listing(self):
+        self._next_id += 1
+        model = self._random.choice(MODELS)
+        storage = self._random.choice(STORAGE)
+        condition, description = self._random.choice(CONDITIONS)
+        return {
+            'id': self._next_id,
+            'title': f"{model} {storage} {condition}",
+            'description': f"Sprzedam {model} {storage}. {description} Odbiór Warszawa.",
+            'price': self._random.randrange(150, 900, 10),
+            'slug': f"{model.lower().replace(' ', '-')}-{storage.lower()}"
+        }
+
+    def advance(self):
+        """Nowe ogłoszenia na górze każdego źródła (kolejny cykl)"""
+        count = round(self.new_share * self.page_size)
+        with self._lock:
+            for source in SOURCES:
+                self.feeds[source][:0] = [self._listing() for _ in range(count)]
+        return count
+
+    # Serwer
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host='127.0.0.1', port=0):
+        handler = type('Handler', (_Handler,), {'market': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _page(self, source, page_num):
+        start = (page_num - 1) * self.page_size
+        with self._lock:
+            return list(self.feeds[source][start:start + self.page_size])
+
+    def _find(self, source, listing_id):
+        with self._lock:
+            return next((l for l in self.feeds[source] if l['id'] == listing_id), None)
+
+    def group_feed(self, group):
+        """Feed grupy: ogłoszenia źródła facebook z id % groups == group (grupy się nie nakładają)"""
+        with self._lock:
+            feed = [l for l in self.feeds['facebook'] if l['id'] % self.groups == group]
+        return feed[:self.feed_size]
+
+    # Renderowanie
+
+    def olx_url(self, listing):
+        return f"{self.base_url}/d/oferta/{listing['slug']}-ID{listing['id']}.html"
+
+    def render_olx_results(self, page_num):
+        listings = self._page('olx', page_num)
+        state = {'listing': {'listing': {'ads': [{
+            'id': l['id'],
+            'url': self.olx_url(l),
+            'title': l['title'],
+            'description': l['description'],
+            'price': {'regularPrice': {'value': l['price']}, 'displayValue': f"{l['price']} zł"},
+            'location': {'cityName': 'Warszawa'},
+            'photos': [],
+            'isPromoted': False
+        } for l in listings]}}}
+        cards = ''.join(
+            f'<div data-cy="l-card" id="{l["id"]}"><a href="/d/oferta/{l["slug"]}-ID{l["id"]}.html">'
+            f'<div data-cy="ad-card-title"><h4>{html.escape(l["title"])}</h4></div></a>'
+            f'<p data-testid="ad-price">{l["price"]} zł</p>'
+            f'<p data-testid="location-date">Warszawa - Dzisiaj</p></div>'
+            for l in listings
+        )
+        script = f'<script>window.__PRERENDERED_STATE__= {json.dumps(json.dumps(state))};</script>'
+        return f'<html><head>{script}</head><body>{cards}</body></html>'
+
+    def render_olx_api(self, offset, limit):
+        with self._lock:
+            listings = list(self.feeds['olx'][offset:offset + limit])
+        return {'data': [{
+            'id': l['id'],
+            'url': self.olx_url(l),
+            'title': l['title'],
+            'description': l['description'],
+            'params': [{'key': 'price', 'value': {'value': l['price'], 'label': f"{l['price']} zł"}}],
+            'location': {'city': {'name': 'Warszawa'}},
+            'photos': [],
+            'promotion': {'top_ad': False}
+        } for l in listings]}
+
+    def render_olx_detail(self, listing_id):
+        listing = self._find('olx', listing_id)
+        if listing is None:
+            return None
+        return (f'<html><body><h1>{html.escape(listing["title"])}</h1>'
+                f'<div data-cy="ad_description">{html.escape(listing["description"])}</div></body></html>')
+
+    def render_allegro_results(self, page_num):
+        articles = ''.join(
+            f'<article><a href="/oferta/{l["slug"]}-{l["id"]}"><h3>{html.escape(l["title"])}</h3></a>'
+            f'<span data-testid="listing-price">{l["price"]},00 zł</span>'
+            f'<p data-testid="listing-description">{html.escape(l["description"])}</p></article>'
+            for l in self._page('allegro', page_num)
+        )
+        return f'<html><body>{articles}</body></html>'
+
+    def render_group(self, group):
+        posts = ''.join(
+            f'<div role="article"><a href="/groups/{group}/posts/{l["id"]}/">{l["id"]}</a>'
+            f'<div data-testid="post_message">{html.escape(l["description"])} Cena {l["price"]} zł</div></div>'
+            for l in self.group_feed(group)
+        )
+        return f'<html><body>{posts}</body></html>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    market = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8'):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        market = self.market
+        market.requests += 1
+        if market.latency:
+            time.sleep(market.latency)
+
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        path = parts.path
+        page_num = int(query.get('page', ['1'])[0])
+
+        if path.startswith('/api/v1/offers'):
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', [str(market.page_size)])[0])
+            return self._send(200, json.dumps(market.render_olx_api(offset, limit)), 'application/json')
+        if path.startswith('/elektronika/'):
+            return self._send(200, market.render_olx_results(page_num))
+        if path.startswith('/d/oferta/'):
+            listing_id = int(path.rsplit('-ID', 1)[-1].split('.')[0])
+            body = market.render_olx_detail(listing_id)
+            return self._send(200, body) if body else self._send(404, 'Nie znaleziono')
+        if path.startswith('/oferty/'):
+            return self._send(200, market.render_allegro_results(page_num))
+        if path.startswith('/groups/'):
+            segments = [s for s in path.split('/') if s]
+            group = int(segments[1]) if len(segments) > 1 and segments[1].isdigit() else 0
+            return self._send(200, market.render_group(group % market.groups))
+        self._send(404, 'Nie znaleziono')
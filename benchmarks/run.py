@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark pełnych cykli (OLX + Allegro + grupa FB) na syntetycznym marketplace.
+Te same scrapery, pula przeglądarek, CycleExecutor i watchdog co w worker.py - zmienia się tylko
+config (bazowe URL-e -> lokalny serwer, bez AI i Discorda). Wynik w JSON do porównań między commitami.
+
+Użycie:
+    python -m benchmarks.run --listings 1000 --new-share 0.2 --latency-ms 50 --cycles 5
+    python -m benchmarks.run --olx-mode browser --output wyniki.json
+"""
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.marketplace import SyntheticMarketplace
+from utils.config_loader import ConfigLoader
+from utils.database import Database
+from utils.profitability import ProfitabilityCalculator
+from utils.metrics import metrics
+from worker import ScrapeWorker
+
+logger = logging.getLogger('escraper.benchmark')
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+
+class CountingSink:
+    """Lokalne wyjście zamiast Discorda - liczy wysłane wiadomości"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, content=None, *, embed=None):
+        self.sent += 1
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_config(base_url, args, workdir, source_config=os.path.join(ROOT_DIR, 'config.yaml')):
+    """Kopia config.yaml skierowana na lokalny serwer (plik w katalogu roboczym benchmarku)"""
+    with open(source_config, 'r', encoding='utf-8') as f:
+        raw = copy.deepcopy(yaml.safe_load(f))
+
+    raw.setdefault('ai', {})['enabled'] = False
+    raw['olx'] = dict(raw.get('olx') or {}, site_base_url=base_url, api_base_url=f"{base_url}/api/v1/offers/",
+                      api_params={}, fetch_mode=args.olx_mode)
+    raw.setdefault('sources', {})['allegro_lokalnie'] = {'enabled': True, 'url': f"{base_url}/oferty/q/iphone"}
+    raw.setdefault('facebook', {})['priority_groups'] = [f"{base_url}/groups/{g}/" for g in range(args.groups)]
+    raw['metrics'] = dict(raw.get('metrics') or {}, enabled=False, summary_path='')
+    raw['cache'] = dict(raw.get('cache') or {}, enabled=args.cache,
+                        directory=os.path.join(workdir, 'cache'))
+    raw['sessions'] = dict(raw.get('sessions') or {}, directory=os.path.join(workdir, 'sessions'),
+                           required_cookies={})
+
+    path = os.path.join(workdir, 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(raw, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    return path
+
+
+class PeakSampler:
+    """Szczytowy RSS (Python, przeglądarka) i liczba otwartych kart - próbkowane w tle"""
+
+    def __init__(self, worker, interval=0.25):
+        self.worker = worker
+        self.interval = interval
+        self.python_rss_mb = 0.0
+        self.browser_rss_mb = 0.0
+        self.pages = 0
+        self._task = None
+
+    def _sample(self):
+        browser_rss, python_rss = self.worker.memory_watchdog.sample()
+        self.python_rss_mb = max(self.python_rss_mb, python_rss or 0.0)
+        self.browser_rss_mb = max(self.browser_rss_mb, browser_rss or 0.0)
+        self.pages = max(self.pages, self.worker.browser_pool.open_pages())
+
+    async def _run(self):
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._sample()
+
+
+def _capture(name, scrape, collected):
+    """Opakowuje scraper tak, żeby jego statystyki trafiły do wyniku cyklu"""
+    async def run(context, output):
+        stats = await scrape(context, output)
+        collected[name] = stats or {}
+        return stats
+    return run
+
+
+async def run_benchmark(args):
+    market = SyntheticMarketplace(args.listings, args.new_share, args.latency_ms, args.groups)
+    base_url = market.start()
+    workdir = tempfile.mkdtemp(prefix='escraper-bench-')
+    config = ConfigLoader(write_config(base_url, args, workdir))
+    db = Database(os.path.join(workdir, 'bench.db'))
+    worker = ScrapeWorker(config, db, ProfitabilityCalculator(config), None, worker_id='benchmark')
+    sink = CountingSink()
+    logger.info(f"🏁 [BENCH] Marketplace {base_url}, katalog roboczy {workdir}")
+
+    cycles = []
+    sampler = PeakSampler(worker)
+    try:
+        await worker.browser_pool.start()
+        sampler.start()
+        for cycle in range(1, args.cycles + 1):
+            collected = {}
+            group_url = config.config['facebook']['priority_groups'][(cycle - 1) % args.groups]
+            scan_group = lambda ctx, out, url=group_url: worker.fb_scraper.scan_group_feed(ctx, out, url)
+            sources = [
+                ('olx', 'OLX', _capture('olx', worker.olx_scraper.scrape, collected)),
+                ('allegro', 'Allegro', _capture('allegro', worker.allegro_scraper.scrape, collected)),
+                ('facebook', 'FB', _capture('facebook', scan_group, collected))
+            ]
+
+            requests_before = market.requests
+            started = time.perf_counter()
+            with metrics.span('cycle_total'):
+                results = await worker.cycle_executor.run(sources, sink)
+            elapsed = time.perf_counter() - started
+
+            await worker.memory_watchdog.check()
+            await worker.browser_pool.end_cycle()
+
+            offers = sum(stats.get('checked', 0) for stats in collected.values())
+            cycles.append({
+                'cycle': cycle,
+                'seconds': round(elapsed, 3),
+                'offers': offers,
+                'new': sum(stats.get('new', 0) for stats in collected.values()),
+                'http_requests': market.requests - requests_before,
+                'sources': {name: {'ok': ok, **collected.get(name, {})} for name, ok in results.items()}
+            })
+            logger.info(f"🏁 [BENCH] Cykl {cycle}: {elapsed:.2f}s, ofert {offers}")
+            market.advance()
+    finally:
+        await sampler.stop()
+        await worker.browser_pool.close()
+        market.stop()
+
+    total_seconds = sum(c['seconds'] for c in cycles)
+    total_offers = sum(c['offers'] for c in cycles)
+    summary = metrics.summary()
+    return {
+        'commit': _git_commit(),
+        'created_at': datetime.now().isoformat(),
+        'params': vars(args),
+        'offers_per_second': round(total_offers / total_seconds, 2) if total_seconds else 0.0,
+        'total_seconds': round(total_seconds, 3),
+        'total_offers': total_offers,
+        'messages_sent': sink.sent,
+        'peak_python_rss_mb': round(sampler.python_rss_mb, 1),
+        'peak_browser_rss_mb': round(sampler.browser_rss_mb, 1),
+        'peak_open_pages': sampler.pages,
+        'cycles': cycles,
+        'stages': summary['stages'],
+        'counters': summary['counters']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cykli scrapowania na syntetycznym marketplace")
+    parser.add_argument('--listings', type=int, default=500, help="Ogłoszeń na start w każdym źródle")
+    parser.add_argument('--new-share', type=float, default=0.2,
+                        help="Część pierwszej strony pojawiająca się jako nowa co cykl")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Opóźnienie każdej odpowiedzi serwera")
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--groups', type=int, default=3, help="Liczba grup FB")
+    parser.add_argument('--olx-mode', choices=['http', 'browser'], default='http')
+    parser.add_argument('--cache', action='store_true', help="Włącz dyskowy cache stron ofert")
+    parser.add_argument('--output', default=None, help="Plik wyniku (domyślnie benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    result = asyncio.run(run_benchmark(args))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{result['commit'] or 'nocommit'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"offers/s={result['offers_per_second']} czas={result['total_seconds']}s "
+          f"RSS python={result['peak_python_rss_mb']}MB przeglądarka={result['peak_browser_rss_mb']}MB "
+          f"karty={result['peak_open_pages']} -> {output}")
+
+
+if __name__ == "__main__":
+    main()
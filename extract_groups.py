@@ -1,9 +1,12 @@
 import asyncio
 import yaml
 from playwright.async_api import async_playwright
-import json
 import logging
 
+from utils.config_loader import ConfigLoader
+from utils.resource_policy import ResourcePolicy
+from utils.session_store import SessionStore
+
 # Ustawienie loggera
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -13,11 +16,15 @@ async def extract_my_groups():
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            # Ładujemy Twoje ciasteczka, żeby być zalogowanym
-            context = await browser.new_context()
-            with open('fb_cookies.json', 'r') as f:
-                cookies = json.load(f)
-                await context.add_cookies(cookies)
+            config = ConfigLoader('config.yaml')
+            sessions = SessionStore.from_config(config)
+            # Zapisana sesja FB scrapera (albo Twoje ciasteczka z fb_cookies.json), żeby być zalogowanym
+            state = sessions.state_for('facebook')
+            context = await browser.new_context(storage_state=state)
+            # Ta sama polityka zasobów co scraper FB (bez obrazów, fontów, trackerów)
+            await ResourcePolicy.from_config(config, 'facebook').apply(context)
+            if state is None:
+                await context.add_cookies(sessions.seed_cookies() or [])
             
             page = await context.new_page()
             logger.info("🔗 Wchodzę na listę Twoich grup...")
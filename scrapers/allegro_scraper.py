@@ -3,6 +3,13 @@ from datetime import datetime
 import discord
 import logging
 
+from utils.metrics import metrics
+from utils.listing_ids import allegro_listing_id
+from utils.pagination import PageFingerprints, WatermarkWalk, page_url
+from scrapers.card_scripts import read_cards
+from scrapers.smart_match import send_inventory_matches
+from utils.inventory import OfferInventory
+
 logger = logging.getLogger('escraper.allegro')
 
 class AllegroScraper:
@@ -14,6 +21,8 @@ class AllegroScraper:
         
         # URL Allegro Lokalnie - użytkownik ustawi filtry ręcznie
         self.allegro_url = self._build_allegro_url()
+        self.fingerprints = PageFingerprints('allegro')
+        self.inventory = OfferInventory(database, config_loader, profit_calculator)
     
     def _build_allegro_url(self):
         """Buduje URL Allegro Lokalnie na podstawie konfiguracji"""
@@ -23,47 +32,74 @@ class AllegroScraper:
     
     async def scrape(self, context, channel):
         page = await context.new_page()
-        await page.route("**/*.{png,jpg,jpeg,webp,gif,svg}", lambda route: route.abort())
         
         try:
             logger.info("🔍 Rozpoczynam skanowanie Allegro Lokalnie...")
             logger.info(f"🔗 URL: {self.allegro_url}")
             
-            # INCREASE TIMEOUTS - 60 sekund na polskie warunki sieciowe
-            await page.goto(self.allegro_url, wait_until="domcontentloaded", timeout=60000)
-            logger.info("✅ Strona Allegro Lokalnie załadowana")
-            
-            # Poczekaj na załadowanie ofert
-            await asyncio.sleep(3)
-            
-            # Allegro Lokalnie używa article jako kontener oferty
-            await page.wait_for_selector('article', timeout=30000)
-            offers = await page.locator('article').all()
-            logger.info(f"📊 Znaleziono {len(offers)} ogłoszeń na stronie")
-            
             # Statystyki
             stats = {
                 'checked': 0,
+                'new': 0,
                 'sent': 0,
                 'skipped_no_price': 0,
                 'skipped_budget': 0,
                 'skipped_duplicate': 0,
+                'skipped_seen': 0,
                 'skipped_model': 0,
                 'skipped_not_profitable': 0,
-                'skipped_ai': 0
+                'skipped_ai': 0,
+                'unchanged': False
             }
             
+            # Strony wyników od najnowszych do znacznika z poprzedniego skanu (najwyżej max_pages)
+            pagination = self.config.get_pagination_config()
+            walk = WatermarkWalk(self.db, 'allegro', self.allegro_url,
+                                 pagination['max_pages'], pagination['watermark_size'])
+            page_num = 1
+            while walk.more:
+                cards = await self._read_cards(page, page_num)
+                for card in cards:
+                    card['listing_id'] = allegro_listing_id(card['url']) if card['url'] else None
+                
+                # Pierwsza strona identyczna jak w poprzednim cyklu - nic do zrobienia
+                if page_num == 1:
+                    first_page = [(card['listing_id'], card['price_text']) for card in cards]
+                    if self.fingerprints.unchanged(self.allegro_url, first_page):
+                        stats['unchanged'] = True
+                        logger.info("⏭️ [Allegro] Pierwsza strona bez zmian (odcisk ID) - pomijam cykl")
+                        return stats
+                walk.add(cards)
+                page_num += 1
+            
             max_budget = self.config.get_max_budget()
             
-            for offer in offers[:25]:
+            # Oferty zdjęte z listy albo przecenione wychodzą z inwentarza smart matchingu
+            self.inventory.sync_walk('allegro', walk)
+            
+            # Znane ogłoszenia (ID oferty + cena) - jedno zapytanie na całą listę, bez czytania opisu i hashowania
+            seen = self.db.filter_seen('allegro', [(card['listing_id'], card['price']) for card in walk.listings if card['price']])
+            
+            # Opłacalność wszystkich nowych kart w budżecie jednym przeliczeniem (wynik czytany po deduplikacji)
+            candidates = [
+                card for card in walk.listings
+                if card['price'] and card['price'] <= max_budget and card['listing_id'] not in seen
+            ]
+            with metrics.span('profit_calculate', source='allegro'):
+                profits = self.profit_calc.calculate_many(
+                    (card['title'], card['price'], card['description'] or card['title']) for card in candidates
+                )
+            for card, profit in zip(candidates, profits):
+                card['profit'] = profit
+            
+            for card in walk.listings:
                 try:
                     stats['checked'] += 1
                     
-                    # Pobierz tytuł
-                    title_el = offer.locator('h2, h3, [data-testid="listing-title"]')
-                    if await title_el.count() == 0:
+                    # Tytuł
+                    title = card['title']
+                    if not title:
                         continue
-                    title = await title_el.first.inner_text()
                     
                     # Sprawdź czy zawiera "iphone"
                     if "iphone" not in title.lower():
@@ -76,19 +112,17 @@ class AllegroScraper:
                         logger.debug(f"🚫 Model wyłączony: {title[:30]}")
                         continue
                     
-                    # Pobierz cenę - Allegro Lokalnie używa różnych selektorów
-                    price_el = offer.locator('[data-testid="listing-price"], .price, [class*="price"]')
-                    if await price_el.count() == 0:
+                    # Cena - selektory Allegro Lokalnie (z fallbackami) sprawdza skrypt karty
+                    price_text = card['price_text']
+                    if not price_text:
                         stats['skipped_no_price'] += 1
                         continue
                     
-                    price_text = await price_el.first.inner_text()
-                    price_digits = ''.join(filter(str.isdigit, price_text.split(',')[0]))
-                    if not price_digits:
+                    price_val = card['price']
+                    if not price_val:
                         stats['skipped_no_price'] += 1
                         logger.debug(f"⚠️ Brak ceny w tekście: {price_text}")
                         continue
-                    price_val = int(price_digits)
                     
                     # Sprawdź budżet
                     if price_val > max_budget:
@@ -96,53 +130,57 @@ class AllegroScraper:
                         logger.debug(f"💰 Poza budżetem: {price_val}zł > {max_budget}zł")
                         continue
                     
-                    # Pobierz URL
-                    link_el = offer.locator('a').first
-                    raw_href = await link_el.get_attribute('href')
-                    full_url = "https://allegrolokalnie.pl" + raw_href if "allegrolokalnie.pl" not in raw_href else raw_href
+                    # URL absolutny, bez hasha - query params zostają (potrzebne do działania linku)
+                    url = card['url']
+                    if not url:
+                        continue
                     
-                    # Usuń tylko hash, zostaw query params (potrzebne do działania linku)
-                    url = full_url.split('#')[0]
+                    # Znane ogłoszenie (ID oferty + cena) - sprawdzone wsadowo przed pętlą
+                    listing_id = card['listing_id']
+                    if listing_id in seen:
+                        stats['skipped_seen'] += 1
+                        continue
                     
-                    # Pobierz opis (jeśli dostępny na liście)
-                    desc_el = offer.locator('[data-testid="listing-description"], .description, p')
-                    description = ""
-                    if await desc_el.count() > 0:
-                        try:
-                            description = await desc_el.first.inner_text(timeout=2000)
-                        except:
-                            description = title
-                    else:
-                        description = title
+                    # Opis (jeśli dostępny na liście)
+                    description = card['description'] or title
                     
                     # ABSOLUTE DUPLICATE LOCK - użyj get_offer_hash i commit_or_abort
-                    content_hash = self.db.get_offer_hash(title, price_val, description, "Warszawa")
-                    
-                    # COMMIT OR ABORT LOGIC - IMMEDIATE DB INSERT
-                    if not self.db.commit_or_abort(content_hash, title, price_val, url):
+                    with metrics.span('dedup', source='allegro'):
+                        content_hash = self.db.get_offer_hash(title, price_val, description, "Warszawa")
+                        # COMMIT OR ABORT LOGIC - IMMEDIATE DB INSERT
+                        is_new = self.db.commit_or_abort(content_hash, title, price_val, url, source='allegro')
+                    self.db.mark_seen('allegro', listing_id, price_val)
+                    if not is_new:
                         stats['skipped_duplicate'] += 1
                         logger.info(f"🔄 [Allegro] ABORT - Duplicate detected: {title[:30]}")
                         continue  # NATYCHMIASTOWE ABORT
+                    stats['new'] += 1
                     
-                    # KALKULACJA OPŁACALNOŚCI
-                    profit_result = self.profit_calc.calculate(title, price_val, description)
+                    # KALKULACJA OPŁACALNOŚCI - policzona wsadowo przed pętlą
+                    profit_result = card['profit']
                     
                     # AI Analiza (jeśli włączona)
                     ai_result = None
                     if self.ai and self.ai.enabled:
                         try:
-                            ai_result = await self.ai.analyze_offer(title, price_val, description, [])
+                            with metrics.span('ai_analyze', source='allegro'):
+                                ai_result = await self.ai.analyze_offer(title, price_val, description, [])
                         except Exception as ai_err:
                             logger.debug(f"⚠️ AI analiza nie powiodła się: {ai_err}")
                             stats['skipped_ai'] += 1
                     
+                    # SMART MATCHING - para z otwartą ofertą z inwentarza (inne cykle i źródła)
+                    if profit_result:
+                        matches = await asyncio.to_thread(self.inventory.offer, 'allegro', listing_id, profit_result, url, title)
+                        await send_inventory_matches(channel, matches, self.config, 'allegro')
+                    
                     # Sprawdź czy wysyłać
                     discord_config = self.config.get_discord_config()
                     should_send = discord_config['send_all'] or (profit_result and profit_result.get('is_profitable'))
                     
                     if not should_send and profit_result:
                         stats['skipped_not_profitable'] += 1
-                        logger.info(f"💸 Allegro nieopłacalne: {title[:40]} | {profit_result.get('recommendation', '')}")
+                        logger.info(f"💸 Allegro nieopłacalne: {title[:40]} | zysk {profit_result.get('potential_profit')}zł")
                         continue
                     
                     logger.info(f"🎯 ZNALEZIONO: {title} | {price_val}zł")
@@ -197,7 +235,8 @@ class AllegroScraper:
                     # JUŻ ZAPISANE W BAZIE PRZEZ commit_or_abort() - kontynuuj do Discord
                     
                     try:
-                        await channel.send(embed=embed)
+                        with metrics.span('channel_send', source='allegro'):
+                            await channel.send(embed=embed)
                         stats['sent'] += 1
                         logger.info(f"✅ Wysłano na Discord: {title[:40]}")
                     except Exception as de:
@@ -209,11 +248,15 @@ class AllegroScraper:
                     logger.error(f"Traceback: {traceback.format_exc()}")
                     continue
             
+            walk.finish()
+            self.fingerprints.remember(self.allegro_url, first_page)
+            
             logger.info(
-                f"📈 PODSUMOWANIE Allegro: Sprawdzono={stats['checked']}, Wysłano={stats['sent']}, "
+                f"📈 PODSUMOWANIE Allegro: Sprawdzono={stats['checked']}, Nowe={stats['new']}, Wysłano={stats['sent']}, "
                 f"Pominięto: budżet={stats['skipped_budget']}, duplikaty={stats['skipped_duplicate']}, "
-                f"model={stats['skipped_model']}, nieopłacalne={stats['skipped_not_profitable']}, brak_ceny={stats['skipped_no_price']}"
+                f"znane={stats['skipped_seen']}, model={stats['skipped_model']}, nieopłacalne={stats['skipped_not_profitable']}, brak_ceny={stats['skipped_no_price']}"
             )
+            return stats
             
         except Exception as e:
             logger.error(f"❌ Błąd skanowania Allegro: {e}")
@@ -221,3 +264,28 @@ class AllegroScraper:
             logger.error(f"Traceback: {traceback.format_exc()}")
         finally:
             await page.close()
+    
+    async def _read_cards(self, page, page_num=1):
+        """Karty jednej strony wyników (pusta lista gdy dalsza strona nie istnieje)"""
+        # INCREASE TIMEOUTS - 60 sekund na polskie warunki sieciowe
+        with metrics.span('page_goto', source='allegro'):
+            await page.goto(page_url(self.allegro_url, page_num), wait_until="domcontentloaded", timeout=60000)
+        logger.info(f"✅ Strona Allegro Lokalnie załadowana (strona {page_num})")
+        
+        # Poczekaj na załadowanie ofert
+        await asyncio.sleep(3)
+        
+        # Allegro Lokalnie używa article jako kontener oferty
+        try:
+            with metrics.span('wait_for_selector', source='allegro'):
+                await page.wait_for_selector('article', timeout=30000)
+        except Exception:
+            if page_num == 1:
+                raise
+            return []  # koniec wyników
+        
+        # Wszystkie pola kart jednym page.evaluate (bez round-tripów per pole)
+        with metrics.span('read_cards', source='allegro'):
+            cards = await read_cards(page, 'allegro', limit=25)
+        logger.info(f"📊 Znaleziono {len(cards)} ogłoszeń na stronie")
+        return cards
@@ -0,0 +1,83 @@
+import logging
+
+from utils.price_parser import parse_prices
+
+logger = logging.getLogger('escraper.cards')
+
+# Skrypty odczytu kart z listy wyników: jeden page.evaluate zwraca wszystkie pola wszystkich kart
+# (zamiast 5-8 wywołań locator/inner_text/get_attribute na kartę). Fallbacki selektorów są w JS.
+# Każda karta: {id, title, price_text, url, image_urls, meta, description, full_text, promoted}
+# + po stronie Pythona: price, negotiable, exchange (utils.price_parser)
+
+_HELPERS = """
+    const pick = (root, selectors) => {
+        for (const sel of selectors) {
+            const el = root.querySelector(sel);
+            if (el && el.innerText && el.innerText.trim()) return el;
+        }
+        return null;
+    };
+    const text = (el) => el ? el.innerText.trim() : null;
+    const images = (root) => Array.from(root.querySelectorAll('img'))
+        .map(img => img.currentSrc || img.src || img.getAttribute('data-src') || '')
+        .filter(src => src.startsWith('http'))
+        .slice(0, 3);
+    const href = (root) => {
+        const a = root.querySelector('a[href]');
+        return a ? a.href.split('#')[0] : null;
+    };
+"""
+
+OLX_CARDS_JS = """(limit) => {
+    %s
+    return Array.from(document.querySelectorAll('div[data-cy="l-card"]')).slice(0, limit).map(card => {
+        const fullText = card.innerText || '';
+        return {
+            id: card.id || card.getAttribute('data-id') || null,
+            title: text(pick(card, ['[data-cy="ad-card-title"] h4', '[data-cy="ad-card-title"] h6',
+                                    'h4', 'h6', 'h3'])) || fullText.split('\\n')[0],
+            price_text: text(pick(card, ['p[data-testid="ad-price"]', '[data-testid="ad-price"]'])),
+            url: href(card),
+            image_urls: images(card),
+            meta: text(pick(card, ['p[data-testid="location-date"]', '[data-testid="location-date"]'])),
+            description: null,
+            full_text: fullText,
+            promoted: !!card.querySelector('[data-testid="adCard-featured"]')
+        };
+    });
+}""" % _HELPERS
+
+ALLEGRO_CARDS_JS = """(limit) => {
+    %s
+    return Array.from(document.querySelectorAll('article')).slice(0, limit).map(card => {
+        const fullText = card.innerText || '';
+        return {
+            id: card.getAttribute('data-id') || null,
+            title: text(pick(card, ['h2', 'h3', '[data-testid="listing-title"]'])),
+            price_text: text(pick(card, ['[data-testid="listing-price"]', '.price', '[class*="price"]'])),
+            url: href(card),
+            image_urls: images(card),
+            meta: text(pick(card, ['[data-testid="listing-location"]', '[class*="location"]', 'time'])),
+            description: text(pick(card, ['[data-testid="listing-description"]', '.description', 'p'])),
+            full_text: fullText,
+            promoted: !!card.querySelector('[data-testid*="promoted"], [class*="promoted"], [class*="featured"]')
+        };
+    });
+}""" % _HELPERS
+
+CARD_SCRIPTS = {
+    'olx': OLX_CARDS_JS,
+    'allegro': ALLEGRO_CARDS_JS
+}
+
+
+async def read_cards(page, source, limit=25):
+    """Wszystkie karty listy wyników jednym wywołaniem page.evaluate (lista słowników)"""
+    cards = await page.evaluate(CARD_SCRIPTS[source], limit)
+    # Ceny całej strony jednym wywołaniem wspólnego parsera
+    for card, price in zip(cards, parse_prices([card['price_text'] for card in cards], strict=False)):
+        card['price'] = price['value']
+        card['negotiable'] = price['negotiable']
+        card['exchange'] = price['exchange']
+    logger.debug(f"🔍 [CARDS] {source}: odczytano {len(cards)} kart w jednym evaluate")
+    return cards
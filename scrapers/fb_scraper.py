@@ -5,14 +5,29 @@ import discord
 import logging
 import re
 
+from utils.metrics import metrics
+from utils.listing_ids import fb_post_id
+from utils.pagination import WatermarkWalk
+from utils.price_parser import parse_price
+from utils.session_store import SessionStore
+from utils.inventory import OfferInventory
+from scrapers.smart_match import send_inventory_matches
+
 logger = logging.getLogger('escraper.fb')
 
+# Tagi słów kluczowych (utils.text_tagger): post w grupie o iPhonie / powiadomienie o sprzedaży
+POST_KEYWORDS = frozenset({'iphone', 'apple', 'sale', 'buy'})
+SALES_KEYWORDS = frozenset({'new_post', 'sale'})
+
 class FacebookScraper:
     def __init__(self, database, config_loader, profit_calculator, ai_analyzer=None):
         self.db = database
         self.config = config_loader
         self.profit_calc = profit_calculator
         self.ai = ai_analyzer
+        self.sessions = SessionStore.from_config(config_loader)
+        self.inventory = OfferInventory(database, config_loader, profit_calculator)
+        self.group_index = 0  # Indeks aktualnej grupy do rotacji (bez harmonogramu)
         self.fb_notifications_url = "https://m.facebook.com/notifications"
         self.fb_marketplace_url = "https://www.facebook.com/marketplace/warsaw/search?query=iphone&exact=false"
     
@@ -114,9 +129,11 @@ class FacebookScraper:
         
         return cookie_found
     
-    async def scan_group_feed(self, context, channel):
+    async def scan_group_feed(self, context, channel, group_url=None):
         """
         Skanuje feed jednej grupy Facebook (rotacja grup).
+        Jeśli podano group_url (wybrany przez harmonogram) - skanuje dokładnie tę grupę.
+        Zwraca statystyki skanu ('new' - liczba nowych postów).
         """
         logger.info("🔔 [FB] Rozpoczynam skanowanie grupy FB...")
         print("DEBUG: Rozpoczynam skanowanie grupy FB...")
@@ -127,18 +144,21 @@ class FacebookScraper:
         posts_per_group = fb_config.get('posts_per_group', 5)
         group_rotation = fb_config.get('group_rotation', True)
         
+        if group_url:
+            logger.info(f"⏱️ [FB] Grupa wybrana przez harmonogram: {group_url}")
+            return await self._scan_single_group(context, channel, group_url, posts_per_group)
+        
         if not priority_groups:
             logger.warning("⚠️ [FB] Brak grup w konfiguracji. Uruchom: python extract_groups.py")
-            return
+            return None
         
         # Wybierz grupę do skanowania
-        from main import bot_state
-        current_index = bot_state.get('current_group_index', 0)
+        current_index = self.group_index
         
         if group_rotation:
             # Rotacja grup - jedna grupa na cykl
             group_url = priority_groups[current_index % len(priority_groups)]
-            bot_state['current_group_index'] = (current_index + 1) % len(priority_groups)
+            self.group_index = (current_index + 1) % len(priority_groups)
             logger.info(f"🔄 [FB] Rotacja grup #{current_index + 1}/{len(priority_groups)}: {group_url}")
         else:
             # Skanuj wszystkie grupy (legacy mode)
@@ -146,29 +166,27 @@ class FacebookScraper:
             logger.info(f"📋 [FB] Skanowanie pierwszej grupy: {group_url}")
         
         # Skanuj wybraną grupę
-        await self._scan_single_group(context, channel, group_url, posts_per_group)
+        return await self._scan_single_group(context, channel, group_url, posts_per_group)
 
     async def _scan_single_group(self, context, channel, group_url, posts_per_group):
         """
         Skanuje pojedynczą grupę Facebook i sprawdza najnowsze posty.
         """
         logger.info(f"🔍 [FB] Skanuję grupę: {group_url}")
+        stats = {'checked': 0, 'new': 0, 'skipped_seen': 0}
         
         try:
             page = await context.new_page()
             logger.info(f"🔗 [FB] Wchodzę na grupę: {group_url}")
             
             # INCREASE TIMEOUTS - 60 sekund na polskie warunki sieciowe
-            await page.goto(group_url, timeout=60000, wait_until="domcontentloaded")
+            with metrics.span('page_goto', source='facebook', group=group_url):
+                await page.goto(group_url, timeout=60000, wait_until="domcontentloaded")
             logger.info("✅ [FB] Strona grupy załadowana")
             
             # Czekaj na załadowanie postów
             await asyncio.sleep(2)
             
-            # MEMORY CLEANUP - wymuś GC po załadowaniu strony
-            import gc
-            gc.collect()
-            
             # Szukaj postów w grupie
             post_selectors = [
                 'div[role="article"]',
@@ -177,6 +195,12 @@ class FacebookScraper:
                 'div.x1yztbdb'
             ]
             
+            # Znacznik = ID najnowszych postów z poprzedniego skanu; zimny start = pierwsze N postów
+            pagination = self.config.get_pagination_config()
+            walk = WatermarkWalk(self.db, 'facebook', group_url,
+                                 pagination['fb_max_scrolls'] + 1, pagination['watermark_size'])
+            max_posts = pagination['fb_max_posts'] if walk.previous else posts_per_group
+            
             posts_found = False
             for selector in post_selectors:
                 try:
@@ -185,14 +209,37 @@ class FacebookScraper:
                         logger.info(f"📊 [FB] Znaleziono {len(posts)} postów (selector: {selector})")
                         posts_found = True
                         
-                        # Przetwarzaj pierwsze N postów
-                        for i, post in enumerate(posts[:posts_per_group]):
-                            try:
-                                await self._process_group_post(page, post, i + 1, channel)
-                            except Exception as e:
-                                logger.warning(f"⚠️ [FB] Błąd przetwarzania posta #{i + 1}: {e}")
-                                continue
+                        # Feed od najnowszych: przewijaj aż do znacznika (limit przewinięć i postów)
+                        processed = 0
+                        while True:
+                            batch = []
+                            for post in posts[processed:max_posts]:
+                                batch.append({'listing_id': await self._post_id(post), 'element': post})
+                            processed += len(batch)
+                            
+                            for item in walk.add(batch):
+                                post_num = stats['checked'] + 1
+                                try:
+                                    stats['checked'] += 1
+                                    result = await self._process_group_post(
+                                        page, item['element'], post_num, channel, group_url, post_id=item['listing_id']
+                                    )
+                                    if result == 'seen':
+                                        stats['skipped_seen'] += 1
+                                    elif result:
+                                        stats['new'] += 1
+                                except Exception as e:
+                                    logger.warning(f"⚠️ [FB] Błąd przetwarzania posta #{post_num}: {e}")
+                                    continue
+                            
+                            if not walk.more or processed >= max_posts:
+                                break
+                            # Przewinięcie doładowuje starsze posty
+                            await page.mouse.wheel(0, 4000)
+                            await asyncio.sleep(2)
+                            posts = await page.locator(selector).all()
                         
+                        walk.finish()
                         break
                 except Exception as e:
                     logger.debug(f"🔍 [FB] Selector {selector} nie zadziałał: {e}")
@@ -201,11 +248,10 @@ class FacebookScraper:
             if not posts_found:
                 logger.warning("⚠️ [FB] Nie znaleziono żadnych postów w grupie")
             
-            # MEMORY CLEANUP przed zamknięciem strony
+            # Pamięć pilnuje MemoryWatchdog (RSS per źródło) - tu tylko zamykamy kartę
             await page.close()
-            import gc
-            gc.collect()
-            logger.info("✅ [FB] Skanowanie grupy zakończone + GC")
+            logger.info(f"✅ [FB] Skanowanie grupy zakończone (nowe: {stats['new']}, znane: {stats['skipped_seen']})")
+            return stats
             
         except Exception as e:
             logger.error(f"❌ [FB] Błąd skanowania grupy: {e}")
@@ -213,12 +259,22 @@ class FacebookScraper:
                 await page.close()
             except:
                 pass
+            return None
 
-    async def _process_group_post(self, page, post_element, post_num, channel):
+    async def _process_group_post(self, page, post_element, post_num, channel, group_url, post_id=None):
         """
         Przetwarza pojedynczy post z grupy Facebook.
+        Zwraca True gdy post jest nową ofertą (zapisaną w bazie), 'seen' gdy ID posta jest już znane.
+        group_url - etykieta metryk (ta sama co przy page_goto grupy).
         """
         try:
+            # Znany post (ID z linku) - bez czytania treści
+            if post_id is None:
+                post_id = await self._post_id(post_element)
+            if self.db.filter_seen('facebook', [(post_id, 0)]):
+                logger.debug(f"⏭️ [FB] Post #{post_num} - znany (ID {post_id})")
+                return 'seen'
+            
             # Pobierz tekst posta
             text_selectors = [
                 'div[data-testid="post_message"]',
@@ -243,33 +299,20 @@ class FacebookScraper:
                 return
             
             # Sprawdź czy post zawiera słowa kluczowe (iPhone)
-            post_lower = post_text.lower()
-            iphone_keywords = ['iphone', 'apple', 'sprzedam', 'kupię']
+            keywords = self.config.get_text_tagger().tag(post_text)['keywords']
             
-            if not any(keyword in post_lower for keyword in iphone_keywords):
+            if not keywords & POST_KEYWORDS:
                 logger.debug(f"⏭️ [FB] Post #{post_num} - nie zawiera słów kluczowych")
+                self.db.mark_seen('facebook', post_id, 0)
                 return
             
             logger.info(f"🎯 [FB] Post #{post_num} zawiera słowa kluczowe: {post_text[:50]}...")
             
-            # Wyodrębnij cenę
-            import re
-            price_patterns = [
-                r'(\d+)\s*z[łl](?!\s*gb)',
-                r'(\d+)\s*pln(?!\s*gb)',
-                r'cena[:\s]+(\d+)(?!\s*gb)',
-                r'(\d+)\s*z[łl]ot[yey](?!\s*gb)'
-            ]
-            
-            price_val = 0
-            for pattern in price_patterns:
-                match = re.search(pattern, post_text.lower())
-                if match:
-                    price_text = match.group(0)
-                    if 'gb' not in price_text.lower():
-                        price_val = int(match.group(1))
-                        logger.info(f"💰 [FB] Wyodrębniono cenę: {price_val}zł (text: '{price_text}')")
-                        break
+            # Wyodrębnij cenę (wspólny parser: waluta, "cena:", 1,2k - bez pojemności w GB)
+            price = parse_price(post_text)
+            price_val = price['value'] or 0
+            if price_val:
+                logger.info(f"💰 [FB] Wyodrębniono cenę: {price_val}zł (text: '{price['match']}')")
             
             if price_val == 0:
                 logger.debug(f"⏭️ [FB] Post #{post_num} - brak ceny")
@@ -283,9 +326,11 @@ class FacebookScraper:
             
             # Generuj hash i sprawdź duplikaty
             group_name = f"Grupa FB #{post_num}"
-            content_hash = self.db.get_offer_hash(group_name, price_val, post_text, "Facebook")
-            
-            if not self.db.commit_or_abort(content_hash, group_name, price_val, f"grupa_fb_post_{post_num}"):
+            with metrics.span('dedup', source='facebook', group=group_url):
+                content_hash = self.db.get_offer_hash(group_name, price_val, post_text, "Facebook")
+                is_new = self.db.commit_or_abort(content_hash, group_name, price_val, f"grupa_fb_post_{post_num}", source='facebook')
+            self.db.mark_seen('facebook', post_id, 0)
+            if not is_new:
                 logger.info(f"⏭️ [FB] Post #{post_num} - duplikat")
                 return
             
@@ -293,13 +338,25 @@ class FacebookScraper:
             
             # TODO: Tutaj można dodać wysyłanie do Discorda
             # await self._send_to_discord(channel, group_name, price_val, post_text, "Facebook")
+            return True
             
         except Exception as e:
             logger.error(f"❌ [FB] Błąd przetwarzania posta #{post_num}: {e}")
 
+    async def _post_id(self, element):
+        """ID posta FB z pierwszego linku do posta w elemencie (None gdy brak)"""
+        try:
+            links = element.locator('a[href*="/posts/"], a[href*="/permalink/"], a[href*="story_fbid"]')
+            if await links.count() == 0:
+                return None
+            return fb_post_id(await links.first.get_attribute('href', timeout=2000))
+        except Exception:
+            return None
+
     async def check_notifications(self, context, channel):
         """
         Główna funkcja sprawdzania powiadomień Facebook (legacy).
+        Zwraca statystyki ('new' - liczba nowych ofert) albo None gdy sesja/strona zawiodła.
         """
         logger.info("🔔 [FB] Rozpoczynam sprawdzanie powiadomień FB...")
         print("DEBUG: Rozpoczynam sprawdzanie powiadomień FB...")
@@ -315,7 +372,8 @@ class FacebookScraper:
         
         try:
             logger.info("🔔 [FB] Ładowanie strony powiadomień (mobile)...")
-            await page.goto(self.fb_notifications_url, timeout=60000)
+            with metrics.span('page_goto', source='facebook', group='notifications'):
+                await page.goto(self.fb_notifications_url, timeout=60000)
             logger.info("✅ [FB] Strona FB notifications załadowana")
             
             # Czekaj na pełne załadowanie sieci (daje czas na aktywację sesji)
@@ -336,17 +394,12 @@ class FacebookScraper:
             if login_check > 0 and password_check > 0:
                 logger.warning("⚠️ [FB] Wykryto formularz logowania - próbuję odzyskać sesję...")
                 
-                # FB SESSION RECOVERY - spróbuj ponownie wstrzyknąć ciasteczka
-                import os
-                import json
-                
-                if os.path.exists('fb_cookies.json'):
-                    logger.info("🔄 [FB] Próbuję ponownie wstrzyknąć ciasteczka...")
+                # FB SESSION RECOVERY - ciasteczka z ostatniej dobrej sesji (albo z fb_cookies.json)
+                if self.sessions.state_for('facebook') or self.sessions.seed_cookies():
+                    logger.info("🔄 [FB] Próbuję przywrócić zapisaną sesję...")
                     try:
-                        with open('fb_cookies.json', 'r') as f:
-                            cookies = json.load(f)
-                        await context.add_cookies(cookies)
-                        logger.info("✅ [FB] Ciasteczka ponownie wstrzyknięte")
+                        restored = await self.sessions.restore(context, 'facebook')
+                        logger.info(f"✅ [FB] Przywrócono {restored} ciasteczek")
                         
                         # Odśwież stronę
                         await page.reload(timeout=15000)
@@ -366,7 +419,7 @@ class FacebookScraper:
                         await page.close()
                         return
                 else:
-                    logger.error("❌ [FB] Brak fb_cookies.json - pomijam FB w tym cyklu")
+                    logger.error("❌ [FB] Brak zapisanej sesji i fb_cookies.json - pomijam FB w tym cyklu")
                     logger.error("❌ [FB] Uruchom: `docker exec -it janek_hunter python fb_login.py`")
                     await page.close()
                     return
@@ -378,18 +431,21 @@ class FacebookScraper:
             
             try:
                 # INCREASE TIMEOUTS - 60 sekund na polskie warunki sieciowe
-                await page.goto("https://m.facebook.com/notifications", timeout=60000, wait_until="domcontentloaded")
+                with metrics.span('page_goto', source='facebook', group='notifications'):
+                    await page.goto("https://m.facebook.com/notifications", timeout=60000, wait_until="domcontentloaded")
                 logger.info("✅ [FB] DOM załadowany, czekam na treść...")
                 
                 # FB LOADING FIX - czekaj na selektor z obsługą błędu i refresh
                 try:
-                    await page.wait_for_selector('text=Powiadomienia', timeout=20000)
+                    with metrics.span('wait_for_selector', source='facebook', group='notifications'):
+                        await page.wait_for_selector('text=Powiadomienia', timeout=20000)
                     logger.info("✅ [FB] Treść powiadomień załadowana")
                 except Exception as selector_error:
                     logger.warning(f"⚠️ [FB] Selektor nie znaleziony, próbuję refresh: {selector_error}")
                     await page.reload(timeout=30000, wait_until="domcontentloaded")
                     await asyncio.sleep(2)
-                    await page.wait_for_selector('text=Powiadomienia', timeout=20000)
+                    with metrics.span('wait_for_selector', source='facebook', group='notifications'):
+                        await page.wait_for_selector('text=Powiadomienia', timeout=20000)
                     logger.info("✅ [FB] Treść powiadomień załadowana po refresh")
                 
                 # Sztywne 3 sekundy na "odmrożenie" skryptów FB
@@ -420,8 +476,10 @@ class FacebookScraper:
             notifications_found = False
             stats = {
                 'checked': 0,
+                'new': 0,
                 'sent': 0,
                 'skipped_duplicate': 0,
+                'skipped_seen': 0,
                 'skipped_irrelevant': 0,
                 'skipped_model': 0,
                 'skipped_not_profitable': 0
@@ -444,8 +502,8 @@ class FacebookScraper:
                             text = await notif.inner_text(timeout=5000)
                             
                             # KROK 3: Sprawdź czy to powiadomienie o sprzedaży
-                            sales_keywords = ['dodał post', 'added a post', 'sprzedam', 'nowa oferta', 'for sale', 'na sprzedaż']
-                            is_sales_notification = any(keyword in text.lower() for keyword in sales_keywords)
+                            keywords = self.config.get_text_tagger().tag(text)['keywords']
+                            is_sales_notification = bool(keywords & SALES_KEYWORDS)
                             
                             if not is_sales_notification:
                                 stats['skipped_irrelevant'] += 1
@@ -453,7 +511,7 @@ class FacebookScraper:
                                 continue
                             
                             # Sprawdź czy zawiera "iphone"
-                            if "iphone" not in text.lower():
+                            if 'iphone' not in keywords:
                                 stats['skipped_irrelevant'] += 1
                                 continue
                             
@@ -469,6 +527,13 @@ class FacebookScraper:
                                 logger.debug(f"🚫 Model wyłączony: {text[:30]}")
                                 continue
                             
+                            # Znany post (ID z linku powiadomienia) - bez klikania i ładowania posta
+                            post_id = await self._post_id(notif)
+                            if self.db.filter_seen('facebook', [(post_id, 0)]):
+                                stats['skipped_seen'] += 1
+                                logger.debug(f"⏭️ [FB] Powiadomienie o znanym poście (ID {post_id})")
+                                continue
+                            
                             # KROK 4: Kliknij powiadomienie aby otworzyć post
                             try:
                                 # Przewiń element do widoku i kliknij
@@ -517,41 +582,29 @@ class FacebookScraper:
                                 except Exception as e:
                                     logger.warning(f"⚠️ [FB] Nie udało się pobrać pełnej treści: {e}")
                                 
-                                # KROK 5: Wyodrębnij cenę z treści - PARSOWANIE CENY
-                                import re
-                                # PARSOWANIE CENY - tylko 'zł', 'pln', 'cena', ignoruj 'GB'
-                                price_patterns = [
-                                    r'(\d+)\s*z[łl](?!\s*gb)',  # 1500 zł - ale nie 128 zł GB
-                                    r'(\d+)\s*pln(?!\s*gb)',  # 1500 PLN - ale nie 128 PLN GB
-                                    r'cena[:\s]+(\d+)(?!\s*gb)',  # cena: 1500 - ale nie cena: 128 GB
-                                    r'(\d+)\s*z[łl]ot[yey](?!\s*gb)',  # 1500 złoty - ale nie 128 złoty GB
-                                ]
-                                
-                                price_val = 0
-                                for pattern in price_patterns:
-                                    match = re.search(pattern, full_content.lower())
-                                    if match:
-                                        # Dodatkowa weryfikacja - upewnij się że nie ma 'gb' w pobliżu
-                                        price_text = match.group(0)
-                                        if 'gb' not in price_text.lower():
-                                            price_val = int(match.group(1))
-                                            logger.info(f"💰 [FB] Wyodrębniono cenę: {price_val}zł (text: '{price_text}')")
-                                            break
+                                # KROK 5: Wyodrębnij cenę z treści - PARSOWANIE CENY (wspólny parser, ignoruje 'GB')
+                                price = parse_price(full_content)
+                                price_val = price['value'] or 0
+                                if price_val:
+                                    logger.info(f"💰 [FB] Wyodrębniono cenę: {price_val}zł (text: '{price['match']}')")
                                 if price_val == 0:
                                     logger.info(f"⏭️  FB: Brak prawidłowej ceny w poście - pomijam: {group_name}")
                                     continue
                             
                             # KROK 6: ABSOLUTE DUPLICATE LOCK - użyj get_offer_hash i commit_or_abort
-                                content_hash = self.db.get_offer_hash(group_name, price_val, full_content, "Facebook")
-                                
-                                # COMMIT OR ABORT LOGIC - IMMEDIATE DB INSERT
-                                if not self.db.commit_or_abort(content_hash, group_name, price_val, post_url):
+                                with metrics.span('dedup', source='facebook', group='notifications'):
+                                    content_hash = self.db.get_offer_hash(group_name, price_val, full_content, "Facebook")
+                                    # COMMIT OR ABORT LOGIC - IMMEDIATE DB INSERT
+                                    is_new = self.db.commit_or_abort(content_hash, group_name, price_val, post_url, source='facebook')
+                                self.db.mark_seen('facebook', post_id or fb_post_id(post_url), 0)
+                                if not is_new:
                                     stats['skipped_duplicate'] += 1
                                     logger.info(f"� [FB] ABORT - Duplicate detected: {group_name}")
                                     # Wróć do listy powiadomień
                                     await page.goto(self.fb_notifications_url)
                                     await asyncio.sleep(2)
                                     continue  # NATYCHMIASTOWE ABORT
+                                stats['new'] += 1
                                 
                                 # Sprawdź budżet
                                 max_budget = self.config.get_max_budget()
@@ -567,21 +620,10 @@ class FacebookScraper:
                                 logger.warning(f"   ⚠️ Nie udało się otworzyć posta: {e}")
                                 full_content = preview
                             
-                            # Spróbuj wyciągnąć cenę z treści (różne formaty)
-                            import re
-                            price_patterns = [
-                                r'(\d+)\s*z[łl]',  # 1500 zł
-                                r'cena[:\s]+(\d+)',  # cena: 1500
-                                r'(\d+)\s*pln',  # 1500 PLN
-                                r'(\d{3,5})(?!\d)',  # same cyfry 3-5 (np. 1500)
-                            ]
-                            
-                            for pattern in price_patterns:
-                                price_match = re.search(pattern, full_content, re.IGNORECASE)
-                                if price_match:
-                                    price_val = int(price_match.group(1))
-                                    logger.debug(f"   💰 Znaleziono cenę: {price_val} zł")
-                                    break
+                            # Spróbuj wyciągnąć cenę z treści (różne formaty, także sama liczba)
+                            price_val = parse_price(full_content, strict=False)['value'] or 0
+                            if price_val:
+                                logger.debug(f"   💰 Znaleziono cenę: {price_val} zł")
                             
                             # POMIŃ JEŚLI BRAK CENY
                             if price_val == 0:
@@ -599,7 +641,16 @@ class FacebookScraper:
                             # KALKULACJA OPŁACALNOŚCI
                             profit_result = None
                             if price_val > 0:
-                                profit_result = self.profit_calc.calculate(full_content, price_val, full_content)
+                                with metrics.span('profit_calculate', source='facebook', group='notifications'):
+                                    profit_result = self.profit_calc.calculate(full_content, price_val, full_content)
+                                
+                                # SMART MATCHING - para z otwartą ofertą z inwentarza (inne cykle i źródła)
+                                if profit_result and post_url:
+                                    matches = await asyncio.to_thread(
+                                        self.inventory.offer, 'facebook', post_id or fb_post_id(post_url),
+                                        profit_result, post_url, f"{group_name}: {preview[:60]}"
+                                    )
+                                    await send_inventory_matches(channel, matches, self.config, 'facebook')
                                 
                                 # Sprawdź czy wysyłać
                                 discord_config = self.config.get_discord_config()
@@ -607,7 +658,7 @@ class FacebookScraper:
                                 
                                 if not should_send and profit_result:
                                     stats['skipped_not_profitable'] += 1
-                                    logger.info(f"💸 FB Nieopłacalne: {group_name} | {profit_result.get('recommendation', '')}")
+                                    logger.info(f"💸 FB Nieopłacalne: {group_name} | zysk {profit_result.get('potential_profit')}zł")
                                     continue
                             
                             logger.info(f"🎯 FB: Nowe powiadomienie! Grupa: {group_name}")
@@ -651,7 +702,8 @@ class FacebookScraper:
                             embed.set_footer(text="Facebook • Janek Hunter v6.0")
                             
                             try:
-                                await channel.send(embed=embed)
+                                with metrics.span('channel_send', source='facebook', group='notifications'):
+                                    await channel.send(embed=embed)
                                 stats['sent'] += 1
                                 logger.info(f"✅ Wysłano powiadomienie FB: {group_name}")
                             except Exception as de:
@@ -679,10 +731,12 @@ class FacebookScraper:
                     f"📈 PODSUMOWANIE FB: Sprawdzono={stats['checked']}, "
                     f"Wysłano={stats['sent']}, Pominięto: "
                     f"duplikaty={stats['skipped_duplicate']}, "
+                    f"znane={stats['skipped_seen']}, "
                     f"model={stats['skipped_model']}, "
                     f"nieopłacalne={stats['skipped_not_profitable']}, "
                     f"nieistotne={stats['skipped_irrelevant']}"
                 )
+            return stats
                 
         except Exception as e: 
             logger.error(f"❌ FB Error: {e}")
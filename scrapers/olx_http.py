@@ -0,0 +1,194 @@
+import asyncio
+import html
+import json
+import logging
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.config import USER_AGENT
+from utils.pagination import page_url
+
+logger = logging.getLogger('escraper.olx_http')
+
+# window.__PRERENDERED_STATE__= "<JSON zakodowany jako string JS>";
+PRERENDERED_STATE_RE = re.compile(r'window\.__PRERENDERED_STATE__\s*=\s*("(?:[^"\\]|\\.)*")\s*;', re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+BR_RE = re.compile(r'<br\s*/?>', re.I)
+
+STATE_FILTERS = {
+    'uszkodzony': 'damaged',
+    'na_czesci': 'damaged',
+    'uzywany': 'used',
+    'nowy': 'new'
+}
+
+
+def _strip_html(text):
+    if not text:
+        return ""
+    text = BR_RE.sub('\n', text)
+    return html.unescape(TAG_RE.sub('', text)).strip()
+
+
+def _photo_url(link):
+    # API zwraca szablon "...;s={width}x{height}"
+    return link.replace('{width}', '1000').replace('{height}', '1000') if link else None
+
+
+def _listing(ad_id, url, title, description, price, price_label, photos, city, promoted=False):
+    title = (title or "").strip()
+    description = _strip_html(description)
+    return {
+        'id': str(ad_id) if ad_id is not None else None,
+        'url': (url or "").split('#')[0],
+        'title': title,
+        'description': description,
+        # Odpowiednik inner_text karty z wersji Playwright (tytuł + cena + opis)
+        'full_text': "\n".join(part for part in (title, price_label, city, description) if part),
+        'price': int(price) if price else None,
+        'image_urls': [p for p in photos if p][:3],
+        # Promowane wiszą na górze każdej strony - nie wyznaczają znacznika stronicowania
+        'promoted': bool(promoted)
+    }
+
+
+def parse_prerendered_state(page_html):
+    """
+    Wyciąga ogłoszenia ze stanu osadzonego w HTML strony wyników.
+    Zwraca listę słowników ogłoszeń albo None gdy strony nie da się sparsować.
+    """
+    match = PRERENDERED_STATE_RE.search(page_html)
+    if not match:
+        return None
+    try:
+        state = json.loads(json.loads(match.group(1)))
+        ads = state['listing']['listing']['ads']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    listings = []
+    for ad in ads:
+        price = (ad.get('price') or {}).get('regularPrice') or {}
+        location = ad.get('location') or {}
+        listings.append(_listing(
+            ad.get('id'),
+            ad.get('url'),
+            ad.get('title'),
+            ad.get('description'),
+            price.get('value'),
+            (ad.get('price') or {}).get('displayValue'),
+            ad.get('photos') or [],
+            location.get('cityName'),
+            ad.get('isPromoted')
+        ))
+    return listings
+
+
+def parse_api_response(payload):
+    """Parsuje odpowiedź /api/v1/offers/ do tego samego formatu co parse_prerendered_state"""
+    try:
+        ads = payload['data']
+    except (KeyError, TypeError):
+        return None
+
+    listings = []
+    for ad in ads:
+        params = {p.get('key'): p.get('value') or {} for p in ad.get('params') or []}
+        price = params.get('price') or {}
+        city = ((ad.get('location') or {}).get('city') or {}).get('name')
+        listings.append(_listing(
+            ad.get('id'),
+            ad.get('url'),
+            ad.get('title'),
+            ad.get('description'),
+            price.get('value'),
+            price.get('label'),
+            [_photo_url(p.get('link')) for p in ad.get('photos') or []],
+            city,
+            (ad.get('promotion') or {}).get('top_ad')
+        ))
+    return listings
+
+
+class OLXHttpClient:
+    """
+    Pobiera listę ogłoszeń OLX zwykłym HTTP (bez Chromium): najpierw stan osadzony
+    w stronie wyników (te same filtry co URL przeglądarki), potem publiczne API ofert.
+    Jedna sesja requests na proces - pula połączeń, keep-alive, gzip.
+    Bazowe URL-e są konfigurowalne, więc można podstawić lokalny serwer z nagranymi odpowiedziami.
+    """
+
+    def __init__(self, config_loader):
+        self.config = config_loader
+        settings = self._settings()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=settings['pool_size'], max_retries=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Language': 'pl-PL,pl;q=0.9',
+            'Connection': 'keep-alive'
+        })
+
+    def _settings(self):
+        return self.config.get_olx_config()
+
+    def _api_params(self, limit, page_num=1):
+        params = {
+            'offset': (page_num - 1) * limit,
+            'limit': limit,
+            'query': 'iphone',
+            'sort_by': 'created_at:desc',
+            'owner_type': 'private'
+        }
+        states = []
+        for condition in self.config.get_enabled_conditions():
+            state = STATE_FILTERS.get(condition)
+            if state and state not in states:
+                states.append(state)
+        for i, state in enumerate(states):
+            params[f'filter_enum_state[{i}]'] = state
+        # Lokalizacja / kategoria (city_id, distance, category_id...) z config.yaml
+        params.update(self._settings()['api_params'] or {})
+        return params
+
+    def _get(self, url, **kwargs):
+        response = self.session.get(url, timeout=self._settings()['timeout'], **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _fetch_sync(self, search_url, page_num=1):
+        settings = self._settings()
+
+        try:
+            listings = parse_prerendered_state(self._get(page_url(search_url, page_num)).text)
+            if listings:
+                logger.info(f"⚡ [OLX-HTTP] {len(listings)} ogłoszeń ze stanu strony")
+                return listings
+            logger.warning("⚠️ [OLX-HTTP] Brak __PRERENDERED_STATE__ w stronie wyników")
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ [OLX-HTTP] Strona wyników niedostępna: {e}")
+
+        if not settings['api_base_url']:
+            return None
+        try:
+            payload = self._get(settings['api_base_url'], params=self._api_params(settings['limit'], page_num)).json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"⚠️ [OLX-HTTP] API ofert niedostępne: {e}")
+            return None
+        listings = parse_api_response(payload)
+        if listings is not None:
+            logger.info(f"⚡ [OLX-HTTP] {len(listings)} ogłoszeń z API")
+        return listings
+
+    async def fetch_listings(self, search_url, page_num=1):
+        """Lista ogłoszeń strony page_num (słowniki z tytułem, ceną i pełnym opisem) albo None - wtedy fallback na Playwright"""
+        return await asyncio.to_thread(self._fetch_sync, search_url, page_num)
+
+    def close(self):
+        self.session.close()
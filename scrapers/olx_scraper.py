@@ -3,6 +3,15 @@ from datetime import datetime
 import discord
 import logging
 
+from utils.metrics import metrics
+from utils.tab_pool import TabPool
+from utils.listing_ids import olx_listing_id
+from utils.pagination import PageFingerprints, WatermarkWalk, page_url
+from scrapers.olx_http import OLXHttpClient
+from scrapers.card_scripts import read_cards
+from scrapers.smart_match import send_inventory_matches
+from utils.inventory import OfferInventory
+
 logger = logging.getLogger('escraper.olx')
 
 class OLXScraper:
@@ -11,13 +20,17 @@ class OLXScraper:
         self.config = config_loader
         self.profit_calc = profit_calculator
         self.ai = ai_analyzer
+        self.http = OLXHttpClient(config_loader)
+        self.fingerprints = PageFingerprints('olx')
+        self.inventory = OfferInventory(database, config_loader, profit_calculator)
         
         # Buduj URL OLX na podstawie konfiguracji
         self.olx_url = self._build_olx_url()
     
     def _build_olx_url(self):
         """Buduje URL OLX na podstawie konfiguracji stanów"""
-        base_url = "https://www.olx.pl/elektronika/telefony/smartfony-telefony-komorkowe/warszawa/q-iphone/"
+        site_base_url = self.config.get_olx_config()['site_base_url']
+        base_url = f"{site_base_url}/elektronika/telefony/smartfony-telefony-komorkowe/warszawa/q-iphone/"
         params = [
             "search%5Bdist%5D=50",
             "search%5Bprivate_business%5D=private",
@@ -39,338 +52,391 @@ class OLXScraper:
         return base_url + "?" + "&".join(params)
     
     async def scrape(self, context, channel):
-        page = await context.new_page()
-        await page.route("**/*.{png,jpg,jpeg,webp,gif,svg}", lambda route: route.abort())
+        logger.info("🔍 Rozpoczynam skanowanie OLX...")
+        logger.info(f"🔗 URL: {self.olx_url}")
+        
+        # Statystyki
+        stats = {
+            'checked': 0,
+            'new': 0,
+            'sent': 0,
+            'skipped_no_price': 0,
+            'skipped_budget': 0,
+            'skipped_duplicate': 0,
+            'skipped_seen': 0,
+            'skipped_model': 0,
+            'skipped_not_profitable': 0,
+            'skipped_ai': 0,
+            'unchanged': False
+        }
         
+        max_budget = self.config.get_max_budget()
+        pagination = self.config.get_pagination_config()
+        walk = WatermarkWalk(self.db, 'olx', self.olx_url, pagination['max_pages'], pagination['watermark_size'])
+        page = None
         try:
-            logger.info("🔍 Rozpoczynam skanowanie OLX...")
-            logger.info(f"🔗 URL: {self.olx_url}")
-            
-            # INCREASE TIMEOUTS - 60 sekund na polskie warunki sieciowe
-            await page.goto(self.olx_url, wait_until="commit", timeout=60000)
-            logger.info("✅ Strona OLX załadowana")
+            # Strony wyników od najnowszych do znacznika z poprzedniego skanu (najwyżej max_pages).
+            # HTTP-FIRST - dane ogłoszeń (z pełnym opisem) bez Chromium; Playwright tylko gdy HTTP zawiedzie
+            use_browser = self.config.get_olx_config()['fetch_mode'] != 'http'
+            page_num = 1
+            while walk.more:
+                batch = None if use_browser else await self._fetch_http(page_num)
+                if batch is None and not use_browser:
+                    if page_num > 1:
+                        break  # dalsze strony niedostępne - przetwarzamy to, co już jest
+                    logger.warning("⚠️ [OLX] HTTP nie zwróciło ogłoszeń - fallback na Playwright")
+                    metrics.inc('olx_http_fallbacks')
+                    use_browser = True
+                if use_browser:
+                    page = page or await context.new_page()
+                    batch = await self._read_cards(page, page_num)
+                for listing in batch:
+                    listing['listing_id'] = olx_listing_id(listing['id'], listing['url'])
+                
+                # Pierwsza strona identyczna jak w poprzednim cyklu - nic do zrobienia
+                if page_num == 1:
+                    first_page = [(listing['listing_id'], listing['price']) for listing in batch]
+                    if self.fingerprints.unchanged(self.olx_url, first_page):
+                        stats['unchanged'] = True
+                        logger.info("⏭️ [OLX] Pierwsza strona bez zmian (odcisk ID) - pomijam cykl")
+                        return stats
+                walk.add(batch)
+                page_num += 1
             
-            await page.wait_for_selector('div[data-cy="l-card"]', timeout=30000)
-            offers = await page.locator('div[data-cy="l-card"]').all()
-            logger.info(f"📊 Znaleziono {len(offers)} ogłoszeń na stronie")
+            # Oferty zdjęte z listy albo przecenione wychodzą z inwentarza smart matchingu
+            self.inventory.sync_walk('olx', walk)
             
-            # Statystyki
-            stats = {
-                'checked': 0,
-                'sent': 0,
-                'skipped_no_price': 0,
-                'skipped_budget': 0,
-                'skipped_duplicate': 0,
-                'skipped_model': 0,
-                'skipped_not_profitable': 0,
-                'skipped_ai': 0
-            }
+            # Znane ogłoszenia (ID + cena) odpadają zanim cokolwiek zostanie pobrane
+            listings = self._skip_seen(walk.listings, stats)
             
-            max_budget = self.config.get_max_budget()
+            if use_browser:
+                # ZAWSZE pobieraj pełną stronę dla opisu - równolegle, tylko dla nieznanych ofert
+                await self._enrich_descriptions(context, listings, max_budget)
             
-            # Lista ofert do smart matching
-            all_offers = []
+            # Opłacalność całej listy jednym przeliczeniem (wynik czytany dopiero po deduplikacji)
+            self._calculate_profits(listings, max_budget)
             
-            for offer in offers[:25]:
+            for listing in listings:
                 try:
                     stats['checked'] += 1
-                    
-                    # Pobierz cenę
-                    price_el = offer.locator('p[data-testid="ad-price"]')
-                    if await price_el.count() == 0:
-                        stats['skipped_no_price'] += 1
-                        continue
-                    
-                    price_text = await price_el.inner_text()
-                    price_digits = ''.join(filter(str.isdigit, price_text.split(',')[0]))
-                    if not price_digits:
-                        stats['skipped_no_price'] += 1
-                        logger.debug(f"⚠️ Brak ceny w tekście: {price_text}")
-                        continue
-                    price_val = int(price_digits)
-                    
-                    # Sprawdź budżet
-                    if price_val > max_budget:
-                        stats['skipped_budget'] += 1
-                        logger.debug(f"💰 Poza budżetem: {price_val}zł > {max_budget}zł")
-                        continue
-                    
-                    # Pobierz URL
-                    link_el = offer.locator('a').first
-                    raw_href = await link_el.get_attribute('href')
-                    url = ("https://www.olx.pl" + raw_href if "olx.pl" not in raw_href else raw_href).split('#')[0]
-                    
-                    # ABSOLUTE DUPLICATE LOCK - FETCH DESCRIPTION FIRST
-                    full_text = await offer.inner_text()
-                    title = full_text.split('\n')[0]
-                    
-                    logger.debug(f"📄 [OLX] Pobieram pełny opis dla: {title[:30]}...")
-                    
-                    # ZAWSZE pobieraj pełną stronę dla opisu
-                    description = ""
-                    try:
-                        # Pobierz pełną stronę oferty - użyj poprawnego context
-                        page = await context.new_page()
-                        await page.goto(url, timeout=60000)
-                        await page.wait_for_load_state("domcontentloaded", timeout=20000)
-                        
-                        # Spróbuj wyciągnąć pełny opis
-                        desc_selectors = [
-                            'div[data-cy="ad_description"]',
-                            'div.description',
-                            '#description',
-                            '.description-content',
-                            'div[data-testid="ad-description"]'
-                        ]
-                        
-                        for desc_sel in desc_selectors:
-                            desc_el = page.locator(desc_sel)
-                            if await desc_el.count() > 0:
-                                try:
-                                    full_desc = await desc_el.first.inner_text(timeout=3000)
-                                    if full_desc and len(full_desc.strip()) > 20:
-                                        description = full_desc
-                                        logger.debug(f"✅ [OLX] Pobrano pełny opis ({len(description)} znaków)")
-                                        break
-                                except:
-                                    continue
-                        
-                        await page.close()
-                    except Exception as e:
-                        logger.warning(f"⚠️ [OLX] Nie udało się pobrać pełnego opisu: {e}")
-                        description = full_text  # Fallback do krótkiego opisu
-                    
-                    # GENERUJ HASH z pełnym opisem
-                    content_hash = self.db.get_offer_hash(title, price_val, description, "Warszawa")
-                    
-                    # COMMIT OR ABORT LOGIC - IMMEDIATE DB INSERT
-                    if not self.db.commit_or_abort(content_hash, title, price_val, url):
-                        stats['skipped_duplicate'] += 1
-                        logger.info(f"🔄 [OLX] ABORT - Duplicate detected: {title[:30]}")
-                        continue  # NATYCHMIASTOWE ABORT
-                    
-                    # Sprawdź czy model jest włączony
-                    if not self.config.is_model_enabled(title):
-                        stats['skipped_model'] += 1
-                        logger.debug(f"🚫 Model wyłączony: {title[:30]}")
-                        continue
-                    
-                    # KALKULACJA OPŁACALNOŚCI
-                    profit_result = self.profit_calc.calculate(title, price_val, full_text)
-                    
-                    if not profit_result.get('model'):
-                        stats['skipped_model'] += 1
-                        logger.debug(f"❓ Nieznany model: {title[:30]}")
-                        continue
-                    
-                    # Dodaj do listy dla smart matching
-                    profit_result['url'] = url
-                    profit_result['title'] = title
-                    profit_result['full_text'] = full_text
-                    all_offers.append(profit_result)
-                    
-                    # Wyciągnij URL-e zdjęć (jeśli AI ma analizować obrazy)
-                    image_urls = []
-                    if self.ai and self.ai.enabled and self.ai.ai_config['checks'].get('analyze_images', False):
-                        try:
-                            img_elements = await offer.locator('img').all()
-                            for img in img_elements[:3]:  # Max 3 zdjęcia
-                                img_src = await img.get_attribute('src')
-                                if img_src and 'http' in img_src:
-                                    image_urls.append(img_src)
-                            if image_urls:
-                                logger.debug(f"📸 Znaleziono {len(image_urls)} zdjęć dla AI")
-                        except Exception as e:
-                            logger.debug(f"⚠️ Nie udało się pobrać zdjęć: {e}")
-                    
-                    # AI Analiza (opcjonalne)
-                    ai_result = None
-                    if self.ai and self.ai.enabled:
-                        ai_result = self.ai.analyze_offer(
-                            profit_result['model'],
-                            price_val,
-                            title,
-                            full_text,
-                            image_urls=image_urls if image_urls else None
-                        )
-                        
-                        # Jeśli AI wykryło oszustwo, pomiń
-                        if ai_result and ai_result.get('is_scam'):
-                            stats['skipped_ai'] += 1
-                            logger.warning(f"⚠️ AI wykryło oszustwo: {title[:30]}")
-                            continue
-                    
-                    # Sprawdź czy wysyłać (tylko opłacalne lub wszystkie)
-                    discord_config = self.config.get_discord_config()
-                    should_send = discord_config['send_all'] or profit_result['is_profitable']
-                    
-                    if not should_send:
-                        stats['skipped_not_profitable'] += 1
-                        logger.info(f"💸 Nieopłacalne: {title[:30]} | {profit_result['recommendation']}")
-                        continue
-                    
-                    # WYŚLIJ NA DISCORD
-                    logger.info(f"🎯 ZNALEZIONO: {title[:40]} | {price_val}zł")
-                    logger.info(f"   {profit_result['recommendation']}")
-                    
-                    try:
-                        # Wybierz kolor embeda
-                        if profit_result['is_profitable']:
-                            if profit_result['potential_profit'] >= profit_result['min_profit'] * 2:
-                                color = discord_config['colors']['profitable']  # Zielony - super okazja
-                            else:
-                                color = discord_config['colors']['maybe']  # Żółty - ok
-                        else:
-                            color = discord_config['colors']['not_profitable']  # Czerwony
-                        
-                        logger.debug(f"   📝 Tworzę embed...")
-                        # PEŁNY OPIS (do 4000 znaków zgodnie z limitem Discord)
-                        full_description = full_text[:4000]
-                        
-                        embed = discord.Embed(
-                            title=f"📱 {profit_result['model'].upper()}", 
-                            url=url, 
-                            color=color,
-                            description=full_description
-                        )
-                    except Exception as embed_err:
-                        logger.error(f"❌ Błąd tworzenia embeda: {embed_err}")
-                        continue
-                    
-                    # Podstawowe info
-                    embed.add_field(name="💰 Cena", value=f"**{price_val} zł**", inline=True)
-                    embed.add_field(name="📊 Stan", value=profit_result['condition'], inline=True)
-                    
-                    # Kalkulacja zysku (jeśli włączone)
-                    if discord_config['send_profit_calc']:
-                        profit_text = (
-                            f"**Zakup:** {profit_result['buy_price']} zł\n"
-                            f"**Naprawa:** {profit_result['repair_cost']} zł\n"
-                            f"**Razem:** {profit_result['total_cost']} zł\n"
-                            f"**Sprzedaż:** {profit_result['market_price']} zł\n"
-                            f"**ZYSK:** {profit_result['potential_profit']} zł ({profit_result['profit_margin']:.1f}%)"
-                        )
-                        embed.add_field(name="📈 Kalkulacja", value=profit_text, inline=False)
-                    
-                    # Rekomendacja
-                    embed.add_field(name="✅ Ocena", value=profit_result['recommendation'], inline=False)
-                    
-                    # AI Analiza (jeśli włączone)
-                    if ai_result and discord_config['send_ai_analysis']:
-                        reasoning = str(ai_result.get('ai_reasoning', 'Brak szczegółów'))
-                        ai_text = (
-                            f"**Stan:** {ai_result.get('condition_score', 5)}/10\n"
-                            f"**Warto:** {'✅ TAK' if ai_result.get('worth_buying', False) else '❌ NIE'}\n"
-                            f"**Uwagi:** {reasoning[:100]}..."
-                        )
-                        
-                        # Dodaj analizę zdjęć jeśli jest
-                        if ai_result.get('image_analysis'):
-                            ai_text += f"\n\n**📸 Analiza zdjęć:**\n{ai_result['image_analysis'][:150]}..."
-                            if ai_result.get('visible_damages'):
-                                ai_text += f"\n**Uszkodzenia:** {', '.join(ai_result['visible_damages'])}"
-                            if not ai_result.get('photos_authentic', True):
-                                ai_text += "\n⚠️ **Zdjęcia mogą być stock photos!**"
-                        
-                        embed.add_field(name="🤖 AI Analiza", value=ai_text, inline=False)
-                    
-                    # Uszkodzenia (jeśli są)
-                    if profit_result['damages']:
-                        embed.add_field(
-                            name="⚠️ Uszkodzenia", 
-                            value=", ".join(profit_result['damages']), 
-                            inline=False
-                        )
-                    
-                    embed.set_footer(text=f"OLX • Janek Hunter v6.0")
-                    
-                    # JUŻ ZAPISANE W BAZIE PRZEZ commit_or_abort() - kontynuuj do Discord
-                    
-                    try:
-                        if channel:
-                            await channel.send(embed=embed)
-                            stats['sent'] += 1
-                            logger.info(f"✅ Wysłano na Discord: {title[:30]}")
-                        else:
-                            logger.error(f"❌ Channel is None - nie można wysłać!")
-                            stats['sent'] += 1  # Liczy jako wysłane żeby nie blokować
-                    except Exception as de:
-                        logger.error(f"❌ Błąd Discord: {de}")
-                        import traceback
-                        logger.error(traceback.format_exc())
-                    
+                    await self._process_listing(channel, listing, stats, max_budget)
                 except Exception as e:
                     logger.error(f"❌ Błąd przetwarzania oferty: {e}")
                     import traceback
                     logger.error(traceback.format_exc())
                     continue
             
-            # SMART MATCHING
-            if self.config.is_smart_matching_enabled() and len(all_offers) >= 2:
-                logger.info("💡 Szukam inteligentnych połączeń...")
-                matches = self.profit_calc.find_smart_matches(all_offers)
-                
-                if matches and discord_config['send_smart_matches']:
-                    for match in matches[:3]:  # Max 3 najlepsze
-                        await self._send_smart_match(channel, match, discord_config)
+            walk.finish()
+            self.fingerprints.remember(self.olx_url, first_page)
             
             # Podsumowanie
             logger.info(
-                f"📈 PODSUMOWANIE OLX: Sprawdzono={stats['checked']}, "
+                f"📈 PODSUMOWANIE OLX: Sprawdzono={stats['checked']}, Nowe={stats['new']}, "
                 f"Wysłano={stats['sent']}, Pominięto: "
                 f"budżet={stats['skipped_budget']}, "
                 f"duplikaty={stats['skipped_duplicate']}, "
+                f"znane={stats['skipped_seen']}, "
                 f"model={stats['skipped_model']}, "
                 f"nieopłacalne={stats['skipped_not_profitable']}, "
                 f"brak_ceny={stats['skipped_no_price']}"
             )
+            return stats
                     
         except Exception as e: 
             logger.error(f"❌ OLX Global Error: {e}")
         finally: 
-            if not page.is_closed():
+            if page and not page.is_closed():
                 await page.close()
     
-    async def _send_smart_match(self, channel, match, discord_config):
-        """Wysyła propozycję inteligentnego połączenia na Discord"""
+    async def _fetch_http(self, page_num):
+        """Strona wyników przez OLXHttpClient; None gdy HTTP zawiedzie"""
         try:
-            embed = discord.Embed(
-                title=f"💡 INTELIGENTNE POŁĄCZENIE - {match['model'].upper()}",
-                color=discord_config['colors']['smart_match'],
-                description=f"**Typ:** {match['combination_type']}"
-            )
+            with metrics.span('http_fetch', source='olx'):
+                return await self.http.fetch_listings(self.olx_url, page_num)
+        except Exception as e:
+            logger.warning(f"⚠️ [OLX] Błąd pobierania przez HTTP: {e}")
+            return None
+    
+    async def _read_cards(self, page, page_num=1):
+        """Fallback Playwright: lista ogłoszeń z kart strony wyników (opis dociągany później)"""
+        # INCREASE TIMEOUTS - 60 sekund na polskie warunki sieciowe
+        with metrics.span('page_goto', source='olx'):
+            await page.goto(page_url(self.olx_url, page_num), wait_until="commit", timeout=60000)
+        logger.info(f"✅ Strona OLX załadowana (strona {page_num})")
+        
+        try:
+            with metrics.span('wait_for_selector', source='olx'):
+                await page.wait_for_selector('div[data-cy="l-card"]', timeout=30000)
+        except Exception:
+            if page_num == 1:
+                raise
+            return []  # koniec wyników
+        with metrics.span('read_cards', source='olx'):
+            cards = await read_cards(page, 'olx', limit=25)
+        logger.info(f"📊 Znaleziono {len(cards)} ogłoszeń na stronie")
+        
+        analyze_images = bool(self.ai and self.ai.enabled and self.ai.ai_config['checks'].get('analyze_images', False))
+        return [self._card_listing(card, analyze_images) for card in cards]
+    
+    def _card_listing(self, card, analyze_images=False):
+        """Karta z read_cards -> słownik ogłoszenia w formacie OLXHttpClient (opis dociągany później)"""
+        price = card['price']
+        if card['price_text'] and price is None:
+            logger.debug(f"⚠️ Brak ceny w tekście: {card['price_text']}")
+        
+        # URL-e zdjęć tylko jeśli AI ma analizować obrazy (max 3 - ucięte już w skrypcie)
+        image_urls = card['image_urls'] if analyze_images else []
+        if image_urls:
+            logger.debug(f"📸 Znaleziono {len(image_urls)} zdjęć dla AI")
+        return {
+            'id': card['id'],
+            'url': card['url'],
+            'title': card['title'],
+            'description': None,
+            'full_text': card['full_text'],
+            'price': price,
+            'image_urls': image_urls,
+            'promoted': card['promoted']
+        }
+    
+    def _skip_seen(self, listings, stats):
+        """Odrzuca ogłoszenia widziane już z tą samą ceną (bez pobierania opisu i hashowania treści)"""
+        seen = self.db.filter_seen('olx', [(l['listing_id'], l['price']) for l in listings if l['price']])
+        
+        fresh = []
+        for listing in listings:
+            if listing['listing_id'] in seen:
+                stats['checked'] += 1
+                stats['skipped_seen'] += 1
+            else:
+                fresh.append(listing)
+        if seen:
+            logger.info(f"⏭️ [OLX] Pominięto {len(seen)} znanych ogłoszeń (ID + cena)")
+        return fresh
+    
+    async def _extract_description(self, page, url):
+        """Pełny opis ze strony oferty (karta z TabPool jest używana ponownie)"""
+        with metrics.span('detail_fetch', source='olx'):
+            await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        
+        # Spróbuj wyciągnąć pełny opis
+        desc_selectors = [
+            'div[data-cy="ad_description"]',
+            'div.description',
+            '#description',
+            '.description-content',
+            'div[data-testid="ad-description"]'
+        ]
+        
+        for desc_sel in desc_selectors:
+            desc_el = page.locator(desc_sel)
+            if await desc_el.count() > 0:
+                try:
+                    full_desc = await desc_el.first.inner_text(timeout=3000)
+                    if full_desc and len(full_desc.strip()) > 20:
+                        logger.debug(f"✅ [OLX] Pobrano pełny opis ({len(full_desc)} znaków)")
+                        return full_desc
+                except:
+                    continue
+        return ""
+    
+    async def _enrich_descriptions(self, context, listings, max_budget):
+        """
+        Fallback Playwright: pełne opisy ofert w budżecie pobierane równolegle
+        przez pulę kart (olx.detail_concurrency), wyniki w kolejności ogłoszeń.
+        """
+        pending = [l for l in listings if l['price'] and l['price'] <= max_budget and l['description'] is None]
+        if not pending:
+            return
+        
+        logger.debug(f"📄 [OLX] Pobieram pełne opisy dla {len(pending)} ofert...")
+        async with TabPool(context, self.config.get_olx_config()['detail_concurrency']) as tabs:
+            descriptions = await tabs.map([l['url'] for l in pending], self._extract_description)
+        
+        for listing, description in zip(pending, descriptions):
+            if isinstance(description, Exception):
+                logger.warning(f"⚠️ [OLX] Nie udało się pobrać pełnego opisu: {description}")
+                description = listing['full_text']  # Fallback do krótkiego opisu
+            listing['description'] = description
+    
+    def _calculate_profits(self, listings, max_budget):
+        """calculate_many dla ogłoszeń w budżecie - wynik w listing['profit']"""
+        candidates = [l for l in listings if l['price'] and l['price'] <= max_budget]
+        with metrics.span('profit_calculate', source='olx'):
+            results = self.profit_calc.calculate_many((l['title'], l['price'], l['full_text']) for l in candidates)
+        for listing, result in zip(candidates, results):
+            listing['profit'] = result
+    
+    async def _process_listing(self, channel, listing, stats, max_budget):
+        """Wspólna ścieżka ogłoszenia (HTTP i Playwright): budżet, dedup, kalkulacja, AI, Discord"""
+        price_val = listing['price']
+        if not price_val:
+            stats['skipped_no_price'] += 1
+            return
+        
+        # Sprawdź budżet
+        if price_val > max_budget:
+            stats['skipped_budget'] += 1
+            logger.debug(f"💰 Poza budżetem: {price_val}zł > {max_budget}zł")
+            return
+        
+        url = listing['url']
+        title = listing['title']
+        full_text = listing['full_text']
+        
+        # ABSOLUTE DUPLICATE LOCK - opis pobrany wcześniej (HTTP albo _enrich_descriptions)
+        description = listing['description'] or ""
+        
+        # GENERUJ HASH z pełnym opisem
+        with metrics.span('dedup', source='olx'):
+            content_hash = self.db.get_offer_hash(title, price_val, description, "Warszawa")
+            # COMMIT OR ABORT LOGIC - IMMEDIATE DB INSERT
+            is_new = self.db.commit_or_abort(content_hash, title, price_val, url, source='olx')
+        # Następne cykle pominą to ogłoszenie już na etapie listy (hash treści zostaje drugą warstwą)
+        self.db.mark_seen('olx', listing['listing_id'], price_val)
+        if not is_new:
+            stats['skipped_duplicate'] += 1
+            logger.info(f"🔄 [OLX] ABORT - Duplicate detected: {title[:30]}")
+            return  # NATYCHMIASTOWE ABORT
+        stats['new'] += 1
+        
+        # Sprawdź czy model jest włączony
+        if not self.config.is_model_enabled(title):
+            stats['skipped_model'] += 1
+            logger.debug(f"🚫 Model wyłączony: {title[:30]}")
+            return
+        
+        # KALKULACJA OPŁACALNOŚCI - policzona wsadowo w _calculate_profits
+        profit_result = listing['profit']
+        
+        if not profit_result.get('model'):
+            stats['skipped_model'] += 1
+            logger.debug(f"❓ Nieznany model: {title[:30]}")
+            return
+        
+        # URL-e zdjęć (jeśli AI ma analizować obrazy) - z danych ogłoszenia albo z karty w przeglądarce
+        image_urls = []
+        if self.ai and self.ai.enabled and self.ai.ai_config['checks'].get('analyze_images', False):
+            image_urls = listing['image_urls']
+        
+        # AI Analiza (opcjonalne)
+        ai_result = None
+        if self.ai and self.ai.enabled:
+            with metrics.span('ai_analyze', source='olx'):
+                ai_result = self.ai.analyze_offer(
+                    profit_result['model'],
+                    price_val,
+                    title,
+                    full_text,
+                    image_urls=image_urls if image_urls else None
+                )
             
-            # Oferta 1
-            offer1 = match['offer1']
-            embed.add_field(
-                name="📱 Oferta 1",
-                value=f"Cena: {offer1['buy_price']} zł\nStan: {offer1['condition']}\n[Link]({offer1['url']})",
-                inline=True
-            )
+            # Jeśli AI wykryło oszustwo, pomiń
+            if ai_result and ai_result.get('is_scam'):
+                stats['skipped_ai'] += 1
+                logger.warning(f"⚠️ AI wykryło oszustwo: {title[:30]}")
+                return
+        
+        # SMART MATCHING - para z otwartą ofertą z inwentarza (inne cykle i źródła)
+        matches = await asyncio.to_thread(self.inventory.offer, 'olx', listing['listing_id'], profit_result, url, title)
+        await send_inventory_matches(channel, matches, self.config, 'olx')
+        
+        # Sprawdź czy wysyłać (tylko opłacalne lub wszystkie)
+        discord_config = self.config.get_discord_config()
+        should_send = discord_config['send_all'] or profit_result['is_profitable']
+        
+        if not should_send:
+            stats['skipped_not_profitable'] += 1
+            logger.info(f"💸 Nieopłacalne: {title[:30]} | zysk {profit_result.get('potential_profit')}zł")
+            return
+        
+        # WYŚLIJ NA DISCORD
+        logger.info(f"🎯 ZNALEZIONO: {title[:40]} | {price_val}zł")
+        logger.info(f"   {profit_result['recommendation']}")
+        
+        try:
+            # Wybierz kolor embeda
+            if profit_result['is_profitable']:
+                if profit_result['potential_profit'] >= profit_result['min_profit'] * 2:
+                    color = discord_config['colors']['profitable']  # Zielony - super okazja
+                else:
+                    color = discord_config['colors']['maybe']  # Żółty - ok
+            else:
+                color = discord_config['colors']['not_profitable']  # Czerwony
             
-            # Oferta 2
-            offer2 = match['offer2']
-            embed.add_field(
-                name="📱 Oferta 2",
-                value=f"Cena: {offer2['buy_price']} zł\nStan: {offer2['condition']}\n[Link]({offer2['url']})",
-                inline=True
-            )
+            logger.debug(f"   📝 Tworzę embed...")
+            # PEŁNY OPIS (do 4000 znaków zgodnie z limitem Discord)
+            full_description = full_text[:4000]
             
-            # Kalkulacja
-            calc_text = (
-                f"**Zakup:** {offer1['buy_price']} + {offer2['buy_price']} = {offer1['buy_price'] + offer2['buy_price']} zł\n"
-                f"**Montaż:** ~{match['combined_cost'] - offer1['buy_price'] - offer2['buy_price']} zł\n"
-                f"**Razem:** {match['combined_cost']} zł\n"
-                f"**Sprzedaż:** {match['market_price']} zł\n"
-                f"**ZYSK:** {match['potential_profit']} zł ({match['profit_margin']:.1f}%)"
+            embed = discord.Embed(
+                title=f"📱 {profit_result['model'].upper()}", 
+                url=url, 
+                color=color,
+                description=full_description
+            )
+        except Exception as embed_err:
+            logger.error(f"❌ Błąd tworzenia embeda: {embed_err}")
+            return
+        
+        # Podstawowe info
+        embed.add_field(name="💰 Cena", value=f"**{price_val} zł**", inline=True)
+        embed.add_field(name="📊 Stan", value=profit_result['condition'], inline=True)
+        
+        # Kalkulacja zysku (jeśli włączone)
+        if discord_config['send_profit_calc']:
+            profit_text = (
+                f"**Zakup:** {profit_result['buy_price']} zł\n"
+                f"**Naprawa:** {profit_result['repair_cost']} zł\n"
+                f"**Razem:** {profit_result['total_cost']} zł\n"
+                f"**Sprzedaż:** {profit_result['market_price']} zł\n"
+                f"**ZYSK:** {profit_result['potential_profit']} zł ({profit_result['profit_margin']:.1f}%)"
+            )
+            embed.add_field(name="📈 Kalkulacja", value=profit_text, inline=False)
+        
+        # Rekomendacja
+        embed.add_field(name="✅ Ocena", value=profit_result['recommendation'], inline=False)
+        
+        # AI Analiza (jeśli włączone)
+        if ai_result and discord_config['send_ai_analysis']:
+            reasoning = str(ai_result.get('ai_reasoning', 'Brak szczegółów'))
+            ai_text = (
+                f"**Stan:** {ai_result.get('condition_score', 5)}/10\n"
+                f"**Warto:** {'✅ TAK' if ai_result.get('worth_buying', False) else '❌ NIE'}\n"
+                f"**Uwagi:** {reasoning[:100]}..."
             )
-            embed.add_field(name="📈 Kalkulacja", value=calc_text, inline=False)
-            embed.add_field(name="✅ Rekomendacja", value=match['recommendation'], inline=False)
-            
-            embed.set_footer(text="Smart Matching • Janek Hunter v6.0")
             
-            await channel.send(embed=embed)
-            logger.info(f"💡 Wysłano smart match: {match['model']} | Zysk: {match['potential_profit']}zł")
+            # Dodaj analizę zdjęć jeśli jest
+            if ai_result.get('image_analysis'):
+                ai_text += f"\n\n**📸 Analiza zdjęć:**\n{ai_result['image_analysis'][:150]}..."
+                if ai_result.get('visible_damages'):
+                    ai_text += f"\n**Uszkodzenia:** {', '.join(ai_result['visible_damages'])}"
+                if not ai_result.get('photos_authentic', True):
+                    ai_text += "\n⚠️ **Zdjęcia mogą być stock photos!**"
             
-        except Exception as e:
-            logger.error(f"❌ Błąd wysyłania smart match: {e}")
+            embed.add_field(name="🤖 AI Analiza", value=ai_text, inline=False)
+        
+        # Uszkodzenia (jeśli są)
+        if profit_result['damages']:
+            embed.add_field(
+                name="⚠️ Uszkodzenia", 
+                value=", ".join(profit_result['damages']), 
+                inline=False
+            )
+        
+        embed.set_footer(text=f"OLX • Janek Hunter v6.0")
+        
+        # JUŻ ZAPISANE W BAZIE PRZEZ commit_or_abort() - kontynuuj do Discord
+        
+        try:
+            if channel:
+                with metrics.span('channel_send', source='olx'):
+                    await channel.send(embed=embed)
+                stats['sent'] += 1
+                logger.info(f"✅ Wysłano na Discord: {title[:30]}")
+            else:
+                logger.error(f"❌ Channel is None - nie można wysłać!")
+                stats['sent'] += 1  # Liczy jako wysłane żeby nie blokować
+        except Exception as de:
+            logger.error(f"❌ Błąd Discord: {de}")
+            import traceback
+            logger.error(traceback.format_exc())
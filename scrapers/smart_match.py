@@ -0,0 +1,74 @@
+import logging
+
+import discord
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.smart_match')
+
+SOURCE_LABELS = {'olx': 'OLX', 'allegro': 'Allegro Lokalnie', 'facebook': 'Facebook'}
+
+
+def _offer_text(offer):
+    text = f"Cena: {offer['buy_price']} zł\nStan: {offer['condition']}\n"
+    # Oferty z inwentarza mogą pochodzić z różnych źródeł
+    if offer.get('source'):
+        text += f"Źródło: {SOURCE_LABELS.get(offer['source'], offer['source'])}\n"
+    return text + f"[Link]({offer['url']})"
+
+
+async def send_smart_match(channel, match, discord_config, source):
+    """Wysyła propozycję inteligentnego połączenia na Discord (wspólne dla wszystkich źródeł)"""
+    try:
+        embed = discord.Embed(
+            title=f"💡 INTELIGENTNE POŁĄCZENIE - {match['model'].upper()}",
+            color=discord_config['colors']['smart_match'],
+            description=f"**Typ:** {match['combination_type']}"
+        )
+        
+        # Oferta 1
+        offer1 = match['offer1']
+        embed.add_field(
+            name="📱 Oferta 1",
+            value=_offer_text(offer1),
+            inline=True
+        )
+        
+        # Oferta 2
+        offer2 = match['offer2']
+        embed.add_field(
+            name="📱 Oferta 2",
+            value=_offer_text(offer2),
+            inline=True
+        )
+        
+        # Kalkulacja
+        calc_text = (
+            f"**Zakup:** {offer1['buy_price']} + {offer2['buy_price']} = {offer1['buy_price'] + offer2['buy_price']} zł\n"
+            f"**Montaż:** ~{match['combined_cost'] - offer1['buy_price'] - offer2['buy_price']} zł\n"
+            f"**Razem:** {match['combined_cost']} zł\n"
+            f"**Sprzedaż:** {match['market_price']} zł\n"
+            f"**ZYSK:** {match['potential_profit']} zł ({match['profit_margin']:.1f}%)"
+        )
+        embed.add_field(name="📈 Kalkulacja", value=calc_text, inline=False)
+        embed.add_field(name="✅ Rekomendacja", value=match['recommendation'], inline=False)
+        
+        embed.set_footer(text="Smart Matching • Janek Hunter v6.0")
+        
+        with metrics.span('channel_send', source=source):
+            await channel.send(embed=embed)
+        logger.info(f"💡 Wysłano smart match: {match['model']} | Zysk: {match['potential_profit']}zł")
+        
+    except Exception as e:
+        logger.error(f"❌ Błąd wysyłania smart match: {e}")
+
+
+async def send_inventory_matches(channel, matches, config_loader, source):
+    """Najlepsze propozycje dla nowej oferty (smart_matching.max_matches_per_offer), jeśli wysyłka włączona"""
+    discord_config = config_loader.get_discord_config()
+    if not matches or not discord_config['send_smart_matches'] or channel is None:
+        return 0
+    limit = config_loader.get_smart_matching_config()['max_matches_per_offer']
+    for match in matches[:limit]:
+        await send_smart_match(channel, match, discord_config, source)
+    return min(len(matches), limit)
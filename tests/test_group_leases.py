@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from utils import database
+from utils.database import Database
+
+GROUP = 'https://www.facebook.com/groups/iphone-sprzedam'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'hunter.db')
+    Database(path, reset_offers=False)
+    return path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(database.time, 'time', lambda: now[0])
+    return now
+
+
+def test_concurrent_claims_have_one_winner(db_path):
+    workers = [Database(db_path, reset_offers=False) for _ in range(2)]
+    attempts = 8
+    barrier = threading.Barrier(len(workers) * attempts)
+    results = []
+    lock = threading.Lock()
+
+    def claim(db, worker_id):
+        barrier.wait()
+        url = db.claim_group(worker_id, [GROUP])
+        with lock:
+            results.append((worker_id, url))
+
+    threads = [
+        threading.Thread(target=claim, args=(db, f'worker-{n}-{attempt}'))
+        for n, db in enumerate(workers) for attempt in range(attempts)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [worker_id for worker_id, url in results if url == GROUP]
+    assert len(results) == len(threads)
+    assert len(winners) == 1
+
+
+def test_lease_expires_after_lease_until(db_path, clock):
+    first = Database(db_path, reset_offers=False)
+    second = Database(db_path, reset_offers=False)
+
+    assert first.claim_group('w1', [GROUP], lease_seconds=300) == GROUP
+    # Właściciel może odnowić dzierżawę, inny worker czeka do lease_until
+    assert first.claim_group('w1', [GROUP], lease_seconds=300) == GROUP
+    clock[0] += 299
+    assert second.claim_group('w2', [GROUP]) is None
+    assert second.get_next_group_run([GROUP]) == clock[0] + 1
+
+    # Crash w1 - po wygaśnięciu dzierżawy grupę przejmuje w2
+    clock[0] += 2
+    assert second.claim_group('w2', [GROUP], lease_seconds=300) == GROUP
+    assert first.claim_group('w1', [GROUP]) is None
+
+
+def test_release_sets_next_run(db_path, clock):
+    first = Database(db_path, reset_offers=False)
+    second = Database(db_path, reset_offers=False)
+    other = GROUP + '-2'
+
+    assert first.get_next_group_run([GROUP, other]) == 0
+    assert first.claim_group('w1', [GROUP, other]) in (GROUP, other)
+    claimed = second.claim_group('w2', [GROUP, other])
+    assert claimed in (GROUP, other)
+
+    # Zwolnić może tylko właściciel dzierżawy
+    second.release_group('w1', claimed, next_run=clock[0] + 600)
+    assert first.claim_group('w1', [claimed]) is None
+
+    second.release_group('w2', claimed, next_run=clock[0] + 600)
+    assert first.claim_group('w1', [claimed]) is None
+    clock[0] += 600
+    assert first.claim_group('w1', [claimed]) == claimed
@@ -0,0 +1,92 @@
+import pytest
+
+from utils.config_loader import ConfigSnapshot
+from utils.model_matcher import ModelMatcher, tokenize
+
+ENABLED = ['iphone 15 pro max', 'iphone 15 pro', 'iphone 14 pro', 'iphone 14', 'iphone 13 pro', 'iphone 13',
+           'iphone se 2020']
+EXCLUDED = ['iphone x', 'iphone se 2016']
+
+
+def _raw_config():
+    """Minimalny config.yaml - tylko sekcje wymagane przez ConfigSnapshot"""
+    return {
+        'general': {'max_budget': 3000, 'check_interval_min': 60, 'check_interval_max': 120},
+        'models': {'enabled': list(ENABLED), 'excluded': list(EXCLUDED), 'aliases': {'xs': 'x'}},
+        'conditions': {'uszkodzony': True},
+        'pricing': {},
+        'smart_matching': {},
+        'ai': {'enabled': False},
+        'discord': {},
+        'sources': {'olx': True}
+    }
+
+
+@pytest.fixture
+def matcher():
+    return ModelMatcher(ENABLED, EXCLUDED, {'xs': 'x'})
+
+
+@pytest.fixture
+def snapshot():
+    return ConfigSnapshot(_raw_config())
+
+
+@pytest.mark.parametrize('text, tokens', [
+    ('iPhone 13 Pro 128GB', ['13', 'pro']),
+    ('Apple iPhone14 pro 256 gb', ['14', 'pro']),
+    ('iphone 15 pro max 1 TB grafitowy', ['15', 'pro', 'max', 'grafitowy']),
+    ('iPhone 15+', ['15', '+'])
+])
+def test_tokenize_strips_noise_and_capacity(text, tokens):
+    assert tokenize(text) == tokens
+
+
+@pytest.mark.parametrize('title, model', [
+    # Najdłuższe dopasowanie niezależnie od kolejności w configu
+    ('iPhone 15 Pro Max 256GB zbity', 'iphone 15 pro max'),
+    ('iphone 15 pro 128 gb', 'iphone 15 pro'),
+    ('iphone14 pro', 'iphone 14 pro'),
+    ('IPHONE 14 128GB', 'iphone 14'),
+    # Pojemność nie jest numerem modelu
+    ('iPhone 64GB 13', 'iphone 13'),
+    # Skróty domyślne i z configu
+    ('iPhone 15 PM uszkodzony', 'iphone 15 pro max'),
+    ('iphone 15 promax', 'iphone 15 pro max'),
+    ('iPhone SE 2', 'iphone se 2020')
+])
+def test_match(matcher, title, model):
+    assert matcher.match(title) == model
+
+
+@pytest.mark.parametrize('title', [
+    # Wariant spoza listy - bez zgadywania krótszego modelu
+    'iphone 13 mini',
+    'iPhone 14 Plus 128GB',
+    # Wykluczone (także przez skrót: "se 1" -> "se 2016", "xs" -> "x")
+    'iPhone X 64GB',
+    'iphone xs',
+    'iPhone SE 1',
+    # Brak modelu
+    'Samsung Galaxy S21',
+    'iPhone 128GB'
+])
+def test_match_rejects(matcher, title):
+    assert matcher.match(title) is None
+
+
+def test_match_many(matcher):
+    assert matcher.match_many(['iphone 13', 'iphone 13 mini']) == ['iphone 13', None]
+
+
+@pytest.mark.parametrize('title', ['iphone14 pro', 'iPhone SE 2', 'iPhone 15 PM', 'iphone 13 mini', 'iPhone X',
+                                   'iPhone SE 1', 'iPhone 14 Plus', 'Samsung Galaxy S21'])
+def test_is_model_enabled_agrees_with_matcher(snapshot, title):
+    assert snapshot.is_model_enabled(title) == (snapshot.model_matcher.match(title) is not None)
+
+
+def test_is_model_enabled(snapshot):
+    assert snapshot.is_model_enabled('iphone14 pro')
+    assert snapshot.is_model_enabled('iPhone SE 2')
+    assert not snapshot.is_model_enabled('iphone 13 mini')
+    assert not snapshot.is_model_enabled('iPhone X 64GB')
@@ -0,0 +1,167 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scrapers.olx_http import OLXHttpClient, parse_prerendered_state
+
+STATE_AD = {
+    'id': 101,
+    'url': 'https://www.olx.pl/d/oferta/iphone-13-pro-CID99-ID101.html#abc',
+    'title': 'iPhone 13 Pro 128GB pęknięty ekran',
+    'description': 'Ekran pęknięty,<br/>reszta sprawna &amp; bateria 88%',
+    'price': {'regularPrice': {'value': 1500}, 'displayValue': '1 500 zł'},
+    'photos': ['https://img/1.jpg', 'https://img/2.jpg'],
+    'location': {'cityName': 'Warszawa'},
+    'isPromoted': True
+}
+
+API_AD = {
+    'id': 202,
+    'url': 'https://www.olx.pl/d/oferta/iphone-12-CID99-ID202.html',
+    'title': 'iPhone 12 na części',
+    'description': 'Nie włącza się',
+    'params': [{'key': 'price', 'value': {'value': 600, 'label': '600 zł'}}],
+    'photos': [{'link': 'https://img/3.jpg;s={width}x{height}'}],
+    'location': {'city': {'name': 'Warszawa'}},
+    'promotion': {'top_ad': False}
+}
+
+
+def _results_page(ads):
+    state = json.dumps({'listing': {'listing': {'ads': ads}}})
+    # Stan jest osadzony jako string JS (JSON w JSON-ie), jak na prawdziwej stronie wyników
+    return f'<html><script>window.__PRERENDERED_STATE__= {json.dumps(state)};</script></html>'
+
+
+class StubOLX:
+    """Lokalny serwer w miejsce OLX: /wyniki/ zwraca stronę ze stanem albo bez, /api/v1/offers/ - JSON"""
+
+    def __init__(self):
+        self.with_state = True
+        self.api_requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.startswith('/api/v1/offers'):
+                    stub.api_requests.append(parse_qs(url.query))
+                    self._send(200, 'application/json', json.dumps({'data': [API_AD]}))
+                elif url.path.startswith('/wyniki'):
+                    body = _results_page([STATE_AD]) if stub.with_state else '<html>bez stanu</html>'
+                    self._send(200, 'text/html; charset=utf-8', body)
+                else:
+                    self._send(404, 'text/plain', 'not found')
+
+            def _send(self, status, content_type, body):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubConfig:
+    """Minimalny odpowiednik ConfigLoader - tylko to, czego używa OLXHttpClient"""
+
+    def __init__(self, base_url):
+        self.olx = {
+            'api_base_url': f'{base_url}/api/v1/offers/',
+            'api_params': {'city_id': 17871},
+            'limit': 40,
+            'pool_size': 2,
+            'timeout': 5
+        }
+
+    def get_olx_config(self):
+        return self.olx
+
+    def get_enabled_conditions(self):
+        return ['uszkodzony', 'na_czesci']
+
+
+@pytest.fixture
+def stub():
+    server = StubOLX()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(stub):
+    http = OLXHttpClient(StubConfig(stub.base_url))
+    yield http
+    http.close()
+
+
+def test_parse_prerendered_state():
+    listings = parse_prerendered_state(_results_page([STATE_AD]))
+
+    assert listings == [{
+        'id': '101',
+        'url': 'https://www.olx.pl/d/oferta/iphone-13-pro-CID99-ID101.html',
+        'title': 'iPhone 13 Pro 128GB pęknięty ekran',
+        'description': 'Ekran pęknięty,\nreszta sprawna & bateria 88%',
+        'full_text': 'iPhone 13 Pro 128GB pęknięty ekran\n1 500 zł\nWarszawa\nEkran pęknięty,\nreszta sprawna & bateria 88%',
+        'price': 1500,
+        'image_urls': ['https://img/1.jpg', 'https://img/2.jpg'],
+        'promoted': True
+    }]
+
+
+@pytest.mark.parametrize('page_html', [
+    '<html>bez stanu</html>',
+    '<script>window.__PRERENDERED_STATE__= "{\\"listing\\": {}}";</script>',
+    '<script>window.__PRERENDERED_STATE__= "nie json";</script>'
+])
+def test_parse_prerendered_state_invalid(page_html):
+    assert parse_prerendered_state(page_html) is None
+
+
+def test_fetch_from_prerendered_state(stub, client):
+    listings = client._fetch_sync(f'{stub.base_url}/wyniki/')
+
+    assert [l['id'] for l in listings] == ['101']
+    assert stub.api_requests == []
+
+
+def test_fetch_falls_back_to_api(stub, client):
+    stub.with_state = False
+
+    listings = client._fetch_sync(f'{stub.base_url}/wyniki/', page_num=2)
+
+    assert len(listings) == 1
+    assert listings[0]['id'] == '202'
+    assert listings[0]['price'] == 600
+    assert listings[0]['image_urls'] == ['https://img/3.jpg;s=1000x1000']
+    assert listings[0]['promoted'] is False
+
+    params = stub.api_requests[0]
+    assert params['offset'] == ['40']
+    assert params['limit'] == ['40']
+    assert params['filter_enum_state[0]'] == ['damaged']
+    assert 'filter_enum_state[1]' not in params
+    assert params['city_id'] == ['17871']
+
+
+def test_fetch_returns_none_without_state_and_api(stub, client):
+    stub.with_state = False
+    client.config.olx['api_base_url'] = None
+
+    assert client._fetch_sync(f'{stub.base_url}/wyniki/') is None
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from utils.pair_matching import connected_component, matched_pairs, max_weight_matching
+
+
+def _brute_force(edges, nvertex):
+    """Największa suma wag po wszystkich skojarzeniach (pełne przeszukanie - tylko małe grafy)"""
+    best = 0
+    used = [False] * nvertex
+
+    def search(k, total):
+        nonlocal best
+        best = max(best, total)
+        for m in range(k, len(edges)):
+            i, j, wt = edges[m]
+            if i != j and not used[i] and not used[j]:
+                used[i] = used[j] = True
+                search(m + 1, total + wt)
+                used[i] = used[j] = False
+
+    search(0, 0)
+    return best
+
+
+def _random_graph(rng, nvertex, density, max_weight):
+    return [(i, j, rng.randint(1, max_weight))
+            for i in range(nvertex) for j in range(i + 1, nvertex) if rng.random() < density]
+
+
+def _matching_weight(edges, mate):
+    weight = {}
+    for i, j, wt in edges:
+        pair = (min(i, j), max(i, j))
+        weight[pair] = max(weight.get(pair, 0), wt)
+    return sum(weight[(v, mate[v])] for v in range(len(mate)) if v < mate[v])
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_max_weight_matching_against_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(25):
+        nvertex = rng.randint(1, 9)
+        # Małe wagi = dużo remisów (zdegenerowane kroki dualne), duże - kwiaty z różnymi zmiennymi
+        edges = _random_graph(rng, nvertex, rng.choice([0.3, 0.6, 1.0]), rng.choice([3, 20, 1000]))
+        mate = max_weight_matching(edges, nvertex)
+
+        assert len(mate) == nvertex
+        for v, w in enumerate(mate):
+            if w != -1:
+                assert mate[w] == v
+        assert _matching_weight(edges, mate) == _brute_force(edges, nvertex)
+
+
+def test_max_weight_matching_prefers_weight_over_cardinality():
+    # Dwie pary (1 + 1) przegrywają z jedną krawędzią środkową o wadze 3
+    assert max_weight_matching([(0, 1, 1), (1, 2, 3), (2, 3, 1)]) == [-1, 2, 1, -1]
+
+
+def test_max_weight_matching_blossom():
+    # Trójkąt 0-1-2 z ogonem 2-3: optimum wymaga skurczenia kwiatu
+    mate = max_weight_matching([(0, 1, 6), (0, 2, 10), (1, 2, 5), (2, 3, 7)])
+    assert mate == [1, 0, 3, 2]
+
+
+def test_max_weight_matching_empty():
+    assert max_weight_matching([], 3) == [-1, -1, -1]
+    assert max_weight_matching([]) == []
+
+
+def test_matched_pairs_duplicate_edges():
+    edges = [(0, 1, 5), (1, 2, 4), (1, 0, 9), (2, 3, 4), (0, 1, 7)]
+
+    chosen = matched_pairs(edges)
+
+    # Para 0-1 raz, przez krawędź o największej wadze
+    assert chosen == [2, 3]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_matched_pairs_duplicates_against_brute_force(seed):
+    rng = random.Random(seed)
+    nvertex = 7
+    edges = _random_graph(rng, nvertex, 0.7, 50)
+    edges += [(j, i, rng.randint(1, 50)) for i, j, _ in rng.sample(edges, len(edges) // 2)]
+
+    chosen = matched_pairs(edges, nvertex)
+
+    vertices = [v for k in chosen for v in edges[k][:2]]
+    assert len(vertices) == len(set(vertices))
+    assert sum(edges[k][2] for k in chosen) == _brute_force(edges, nvertex)
+
+
+def test_connected_component():
+    edges = [(0, 1, 'a'), (1, 2, 'b'), (3, 4, 'c'), (5, 5, 'd')]
+
+    assert connected_component(edges, 0) == {0, 1, 2}
+    assert connected_component(edges, 4) == {3, 4}
+    assert connected_component(edges, 5) == {5}
+    assert connected_component(edges, 6) == {6}
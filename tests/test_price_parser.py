@@ -0,0 +1,87 @@
+import pytest
+
+from utils.price_parser import parse_price, parse_prices, price_value
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Formaty z nagłówka modułu
+    ('1 200 zł', 1200),
+    ('1 200 zł', 1200),
+    ('1 200 PLN', 1200),
+    ('1.200,00 zł', 1200),
+    ('1200,-', 1200),
+    ('1200.-', 1200),
+    ('1,2k', 1200),
+    ('1.5k', 1500),
+    ('1,5 tys.', 1500),
+    ('2 tys zł', 2000),
+    ('cena: 1 500', 1500),
+    ('Cena 950', 950),
+    # Numer modelu to nie część ceny
+    ('iPhone 13 900 zł', 900),
+    ('Sprzedam iPhone 12 Pro, 1 100 zł do negocjacji', 1100),
+    # Pojemność / bateria przy cenie
+    ('iPhone 13 256GB 1500 zł', 1500),
+    ('800 zł, bateria 5000 mAh', 800)
+])
+def test_free_text_formats(text, expected):
+    assert price_value(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.200,00', 1200),
+    ('1 200', 1200),
+    ('1200', 1200),
+    ('999,99', 999),
+    ('iPhone 13 900', 900)
+])
+def test_price_field_formats(text, expected):
+    assert price_value(text, strict=False) == expected
+
+
+@pytest.mark.parametrize('text', [
+    '256GB',
+    '1 TB',
+    'iPhone 13 256GB',
+    'bateria 85%',
+    'bateria 85 procent',
+    'Apple 11 pro',
+    'nagrywa w 4k',
+    '',
+    None
+])
+@pytest.mark.parametrize('strict', [True, False])
+def test_not_a_price(text, strict):
+    assert price_value(text, strict) is None
+
+
+def test_bare_number_needs_price_field():
+    # Wolny tekst bez waluty / "cena" / mnożnika - liczba może być czymkolwiek
+    assert price_value('1200') is None
+    assert price_value('1.200,00') is None
+
+
+@pytest.mark.parametrize('text, negotiable, exchange', [
+    ('1200 zł do negocjacji', True, False),
+    ('1200 zł, lekka negocjacja', True, False),
+    ('1200 zł nego', True, False),
+    ('1200 zł do dogadania', True, False),
+    ('1200 zł lub zamiana', False, True),
+    ('Zamienię na iPhone 14', False, True),
+    ('wymienię na androida, cena do negocjacji', True, True),
+    ('1200 zł, cena ostateczna', False, False)
+])
+def test_flags(text, negotiable, exchange):
+    result = parse_price(text)
+
+    assert result['negotiable'] is negotiable
+    assert result['exchange'] is exchange
+
+
+def test_match_and_batch():
+    assert parse_price('Sprzedam, 1 200 zł, stan dobry')['match'] == '1 200 zł'
+    assert parse_prices(['900 zł', '256GB', '1200'], strict=False) == [
+        {'value': 900, 'negotiable': False, 'exchange': False, 'match': '900 zł'},
+        {'value': None, 'negotiable': False, 'exchange': False, 'match': None},
+        {'value': 1200, 'negotiable': False, 'exchange': False, 'match': '1200'}
+    ]
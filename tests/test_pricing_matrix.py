@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from utils.model_matcher import ModelMatcher
+from utils.pricing_matrix import CONDITION_CODES, PricingMatrix, np
+from utils.profitability import ProfitabilityCalculator, ProfitResult
+from utils.text_tagger import TextTagger
+
+PRICING = {
+    'iphone 13': {'buy_max_working': 1800, 'buy_max_broken': 1000, 'buy_max_locked': 600,
+                  'repair_cost': 400, 'unlock_cost': 100, 'market_price': 2200, 'min_profit': 300},
+    'iphone 12': {'buy_max_working': 1300, 'buy_max_broken': 700.4, 'buy_max_locked': 400,
+                  'repair_cost': 350, 'market_price': 1600, 'min_profit': 250},
+    # Bez ceny rynkowej - marża 0 zamiast dzielenia przez zero
+    'iphone 11': {'buy_max_working': 900, 'min_profit': 200}
+}
+
+
+def _python_matrix():
+    matrix = PricingMatrix(PRICING)
+    matrix.table = None
+    return matrix
+
+
+@pytest.mark.skipif(np is None, reason='NumPy niedostępny')
+@pytest.mark.parametrize('seed', range(5))
+def test_numpy_and_python_paths_agree(seed):
+    rng = random.Random(seed)
+    count = 200
+    rows = [rng.randrange(len(PRICING)) for _ in range(count)]
+    conditions = [rng.choice(list(CONDITION_CODES) + ['unknown']) for _ in range(count)]
+    # Ceny po obu stronach progów, także ułamkowe i dokładnie .5
+    prices = [rng.choice([rng.randint(0, 2500), rng.randint(0, 2500) + 0.5, rng.uniform(0, 2500)])
+              for _ in range(count)]
+
+    vectorized = PricingMatrix(PRICING).evaluate(rows, conditions, prices)
+    looped = _python_matrix().evaluate(rows, conditions, prices)
+
+    for column in ('max_buy_price', 'repair_cost', 'total_cost', 'market_price', 'potential_profit',
+                   'min_profit', 'is_profitable'):
+        assert vectorized[column] == looped[column], column
+    assert vectorized['profit_margin'] == pytest.approx(looped['profit_margin'])
+
+
+@pytest.mark.parametrize('make_matrix', [lambda: PricingMatrix(PRICING), _python_matrix])
+def test_evaluate_thresholds(make_matrix):
+    matrix = make_matrix()
+    row = matrix.row('iPhone 13 ')
+
+    columns = matrix.evaluate([row] * 4, ['broken', 'broken', 'locked', 'working'], [1000, 1000.6, 600, 1900])
+
+    # Cena równa limitowi jest jeszcze opłacalna, 1000.6 zaokrągla się do 1001
+    assert columns['total_cost'] == [1400, 1401, 700, 1900]
+    assert columns['potential_profit'] == [800, 799, 1500, 300]
+    assert columns['is_profitable'] == [True, False, True, False]
+
+
+def test_rows_round_config_prices():
+    matrix = PricingMatrix(PRICING)
+
+    assert matrix.rows[matrix.row('iphone 12')][1] == 700
+    assert matrix.row('iphone 15') is None
+    assert matrix.row(None) is None
+
+
+class StubConfig:
+    """Minimalny odpowiednik ConfigLoader - tylko to, czego używa calculate_many"""
+
+    def __init__(self):
+        self.matrix = PricingMatrix(PRICING)
+        self.matcher = ModelMatcher(list(PRICING))
+        self.tagger = TextTagger()
+
+    def get_pricing_matrix(self):
+        return self.matrix
+
+    def get_model_matcher(self):
+        return self.matcher
+
+    def get_text_tagger(self):
+        return self.tagger
+
+
+def test_recommendation_is_lazy():
+    results = ProfitabilityCalculator(StubConfig()).calculate_many([
+        ('iPhone 13 zbity ekran', 500, ''),
+        ('iPhone 13 pęknięty', 1200, ''),
+        ('iPhone 13 sprawny', 1800, '')
+    ])
+
+    assert all(isinstance(result, ProfitResult) for result in results)
+    assert all('recommendation' not in result for result in results)
+
+    assert results[0]['recommendation'].startswith('🔥 SUPER OKAZJA! Zysk: 1300zł')
+    assert 'recommendation' in results[0]
+    assert results[1].get('recommendation') == '❌ Za drogie. Max: 1000zł (jest: 1200zł)'
+    assert 'recommendation' not in results[2]
+    assert results[2]['recommendation'].startswith('✅ Opłacalne. Zysk: 400zł')
+
+
+def test_unknown_model_has_recommendation():
+    result = ProfitabilityCalculator(StubConfig()).calculate('Samsung Galaxy', 500)
+
+    assert result['recommendation'] == 'Nieznany model iPhone'
+    assert result.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        result['missing']
@@ -0,0 +1,77 @@
+import pytest
+
+from utils.text_tagger import TextTagger
+
+
+@pytest.fixture(scope='module')
+def tagger():
+    return TextTagger()
+
+
+@pytest.mark.parametrize('text, condition, negated', [
+    # Zaprzeczony stan nie liczy się jako trafienie
+    ('nie zbity', 'working', {'broken'}),
+    ('iPhone 13 nie zbity, działa', 'working', {'broken'}),
+    ('nie jest zablokowany', 'working', {'locked'}),
+    ('brak blokady icloud', 'working', {'locked'}),
+    # Bez zaprzeczenia
+    ('icloud zablokowany', 'locked', set()),
+    ('zbity, nie zablokowany', 'broken', {'locked'}),
+    # Zaprzeczenie kończy się na pierwszym słowie, które nie jest łącznikiem
+    ('bez rys, pęknięty', 'broken', {'scratches'}),
+    ('nie ma rys, ekran pęknięty', 'broken', {'scratches'}),
+    # Łączniki przedłużają zaprzeczenie na kolejne trafienia
+    ('bez rys i pęknięć', 'working', {'scratches', 'broken'}),
+    ('bez rys oraz pęknięć ani blokady', 'working', {'scratches', 'broken'}),
+    # Tag z trafieniem bez zaprzeczenia nie jest raportowany jako zaprzeczony
+    ('nie zbity ale nie włącza się', 'broken', set())
+])
+def test_condition_negation_scope(tagger, text, condition, negated):
+    result = tagger.tag(text)
+
+    assert result['condition'] == condition
+    assert result['negated'] == negated
+
+
+@pytest.mark.parametrize('text, keywords, negated', [
+    ('bez żadnych rys', set(), {'scratches'}),
+    ('sprzedam iphone bez rys', {'sale', 'iphone'}, {'scratches'}),
+    ('sprzedam, zarysowany', {'sale', 'scratches'}, set())
+])
+def test_keyword_negation_scope(tagger, text, keywords, negated):
+    result = tagger.tag(text)
+
+    assert result['keywords'] == keywords
+    assert result['negated'] == negated
+
+
+@pytest.mark.parametrize('text, condition, damages', [
+    # Części po zaprzeczeniu to brak / uszkodzenie części - nigdy zaprzeczone
+    ('brak face id', 'working', ['biometria']),
+    ('na części bez ekranu', 'parts', ['ekran']),
+    ('Bez rys ekran pęknięty', 'broken', ['ekran']),
+    ('pęknięte plecki i ekran, bateria 80%', 'broken', ['ekran', 'obudowa', 'bateria'])
+])
+def test_damages_are_never_negated(tagger, text, condition, damages):
+    result = tagger.tag(text)
+
+    assert result['condition'] == condition
+    assert result['damages'] == damages
+
+
+def test_condition_priority(tagger):
+    assert tagger.tag('zablokowany icloud, zbity ekran')['condition'] == 'locked'
+    assert tagger.tag('uszkodzony nie włącza się')['condition'] == 'parts'
+    assert tagger.tag('')['condition'] == 'working'
+
+
+def test_from_config_overrides_dictionaries():
+    tagger = TextTagger.from_config({'condition': {'locked': ['simlock']}, 'negations': ['bez']})
+
+    assert tagger.tag('simlock')['condition'] == 'locked'
+    assert tagger.tag('icloud')['condition'] == 'working'
+    assert tagger.tag('nie zbity')['condition'] == 'broken'
+    assert tagger.tag_many(['bez simlocka', 'zbity']) == [
+        {'condition': 'working', 'damages': [], 'keywords': set(), 'negated': {'locked'}},
+        {'condition': 'broken', 'damages': [], 'keywords': set(), 'negated': set()}
+    ]
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import os
+
+from playwright.async_api import async_playwright
+
+from utils.config import USER_AGENT
+from utils.resource_policy import ResourcePolicy
+from utils.response_cache import ResponseCache
+from utils.session_store import SessionStore
+
+logger = logging.getLogger('escraper.browser')
+
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-extensions',
+    '--disable-web-security',  # HEADLESS CHECK - łatwiejsze ładowanie dynamicznych treści FB
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-features=TranslateUI',
+    '--disable-ipc-flooding-protection',
+    '--max-old-space-size=512',
+    '--memory-pressure-off',
+    '--aggressive-cache-discard'
+]
+
+
+class PageLimitedContext:
+    """
+    Proxy na BrowserContext: new_page() czeka na wolny slot globalnego limitu
+    otwartych stron, slot wraca po zamknięciu strony. Reszta API bez zmian.
+    Karty TabPool (new_tab) mają osobny limit - źródło trzyma swoją stronę wyników, czekając na karty,
+    więc przy wspólnym limicie strony wyników kilku źródeł mogłyby zająć wszystkie sloty na zawsze.
+    """
+
+    def __init__(self, context, slots, tab_slots):
+        self._context = context
+        self._slots = slots
+        self._tab_slots = tab_slots
+
+    async def _open(self, slots, wait=True):
+        if not wait and slots.locked():
+            return None
+        await slots.acquire()
+        try:
+            page = await self._context.new_page()
+        except Exception:
+            slots.release()
+            raise
+        page.once("close", lambda _: slots.release())
+        return page
+
+    async def new_page(self):
+        return await self._open(self._slots)
+
+    async def new_tab(self, wait=True):
+        """Karta puli TabPool; wait=False - None, gdy żaden slot kart nie jest wolny od ręki"""
+        return await self._open(self._tab_slots, wait)
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+class BrowserPool:
+    """
+    Trzyma jedną ciepłą przeglądarkę między cyklami (jeden driver Playwright na cały proces).
+    Przeglądarka jest wymieniana tylko po triggerze (limit RSS z MemoryWatchdog, opcjonalnie
+    N cykli, crash), a następczyni startuje w tle zanim stara zostanie zamknięta (double-buffering).
+    """
+
+    def __init__(self, config_loader, cookies_path='fb_cookies.json', replay=None):
+        self.config = config_loader
+        self.sessions = SessionStore.from_config(config_loader, cookies_path)
+        self._playwright = None
+        self._active = None      # browser
+        self._contexts = {}      # źródło -> context aktywnej przeglądarki
+        self._standby = None     # asyncio.Task -> browser
+        self._page_slots = None
+        self._tab_slots = None
+        # Przeglądarka -> przełącznik w jej linii poleceń (MemoryWatchdog mierzy RSS tylko jej drzewa procesów)
+        self._markers = {}
+        self._launches = 0
+        self._cycles = 0
+        self._recycle_pending = False
+        self._lock = asyncio.Lock()
+        self.recycle_count = 0
+        # Nagrywanie/odtwarzanie (utils.replay) - bez cache, żeby HAR zawierał prawdziwe odpowiedzi
+        self.replay = replay
+        self.response_cache = None if replay else ResponseCache.from_config(config_loader)
+
+    def _settings(self):
+        return self.config.get_browser_config()
+
+    async def start(self):
+        """Uruchamia driver Playwright i pierwszą przeglądarkę (idempotentne)"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        if self._active is None:
+            self._new_slots()
+            self._active = await self._launch()
+            logger.info("✅ [BROWSER] Pula gotowa - przeglądarka uruchomiona")
+
+    def _new_slots(self):
+        settings = self._settings()
+        self._page_slots = asyncio.Semaphore(settings['max_open_pages'])
+        self._tab_slots = asyncio.Semaphore(settings['max_tab_pages'])
+
+    async def _launch(self):
+        """Uruchamia nową przeglądarkę (z unikalnym przełącznikiem - Chromium ignoruje nieznane)"""
+        self._launches += 1
+        marker = f'--escraper-browser={os.getpid()}.{self._launches}'
+        browser = await self._playwright.chromium.launch(
+            headless=self._settings()['headless'],
+            args=CHROMIUM_ARGS + [marker]
+        )
+        browser.on("disconnected", self._on_disconnected)
+        self._markers[browser] = marker
+        return browser
+
+    def process_markers(self):
+        """Przełączniki procesów (aktywna, zapasowa) - zapasowa dopiero po starcie, inaczej None"""
+        standby = None
+        if self._standby is not None and self._standby.done() and not self._standby.cancelled() \
+                and self._standby.exception() is None:
+            standby = self._markers.get(self._standby.result())
+        return self._markers.get(self._active), standby
+
+    async def _new_context(self, browser, source):
+        """Tworzy context dla źródła z zapisanym storage_state (albo z ciasteczkami z fb_cookies.json)"""
+        state = self.sessions.state_for(source)
+        extra = self.replay.context_options(source) if self.replay else {}
+        context = await browser.new_context(user_agent=USER_AGENT, storage_state=state, **extra)
+        # Blokada obrazów/fontów/trackerów dla wszystkich kart tego źródła
+        await ResourcePolicy.from_config(self.config, source).apply(context)
+        # Strony ofert z dyskowego cache (route zarejestrowany później ma pierwszeństwo)
+        if self.response_cache is not None:
+            await self.response_cache.apply(context, source)
+        if self.replay is not None:
+            await self.replay.apply(context, source)
+
+        if state is not None:
+            logger.info(f"💾 [BROWSER] Wczytano zapisaną sesję ({source}, {len(state['cookies'])} ciasteczek)")
+        else:
+            cookies = self.sessions.seed_cookies()
+            if cookies:
+                await context.add_cookies(cookies)
+                logger.info(f"🍪 [BROWSER] Wstrzyknięto {len(cookies)} ciasteczek ({source})")
+            else:
+                logger.warning(f"⚠️ [BROWSER] Brak zapisanej sesji i {self.sessions.cookies_path} - kontynuuję bez ciasteczek")
+
+        return PageLimitedContext(context, self._page_slots, self._tab_slots)
+
+    def _on_disconnected(self, browser):
+        """Crash przeglądarki - od razu rozgrzewamy następczynię w tle"""
+        if self._active is browser:
+            logger.warning("💥 [BROWSER] Aktywna przeglądarka rozłączona - uruchamiam zapasową w tle")
+            self.prelaunch()
+
+    def prelaunch(self):
+        """Startuje zapasową przeglądarkę w tle (jeśli jeszcze nie startuje)"""
+        if self._standby is None and self._playwright is not None:
+            self._standby = asyncio.create_task(self._launch())
+
+    def _is_alive(self):
+        return self._active is not None and self._active.is_connected()
+
+    async def get_context(self, source='default'):
+        """
+        Zwraca context aktywnej przeglądarki dla danego źródła (każde źródło ma własny).
+        Czeka na start przeglądarki tylko po crashu (gdy nie ma z czego wybierać).
+        """
+        async with self._lock:
+            if self._playwright is None:
+                await self.start()
+
+            if not self._is_alive():
+                logger.warning("⚠️ [BROWSER] Brak działającej przeglądarki - przełączam na zapasową")
+                self.prelaunch()
+                await self._swap()
+
+            if source not in self._contexts:
+                self._contexts[source] = await self._new_context(self._active, source)
+            return self._contexts[source]
+
+    async def begin_cycle(self):
+        """
+        Wołane przed cyklem (zanim źródła pobiorą contexty). Jeśli trigger recyklingu
+        zadziałał i następczyni jest już rozgrzana - podmienia przeglądarkę.
+        """
+        async with self._lock:
+            if self._recycle_pending and self._standby is not None and self._standby.done():
+                await self._swap()
+
+    async def _swap(self):
+        """Podmienia aktywną przeglądarkę na zapasową, starą zamyka w tle"""
+        standby, self._standby = self._standby, None
+        try:
+            new_active = await standby
+        except Exception as e:
+            logger.error(f"❌ [BROWSER] Nie udało się uruchomić zapasowej przeglądarki: {e}")
+            return
+
+        old, self._active = self._active, new_active
+        old_contexts, self._contexts = self._contexts, {}
+        # Nowy limit stron - strony starej przeglądarki zwalniają stary semafor
+        self._new_slots()
+        self._cycles = 0
+        self._recycle_pending = False
+        self.recycle_count += 1
+        logger.info(f"♻️ [BROWSER] Przełączono na nową przeglądarkę (recykling #{self.recycle_count})")
+
+        if old:
+            asyncio.create_task(self._close_browser(old, old_contexts))
+
+    async def save_session(self, source):
+        """Zapisuje stan contextu źródła po udanym skanie (SessionStore ogranicza częstotliwość)"""
+        context = self._contexts.get(source)
+        if context is not None:
+            await self.sessions.save(context, source)
+
+    async def _close_browser(self, browser, contexts=None):
+        self._markers.pop(browser, None)
+        for source, context in (contexts or {}).items():
+            try:
+                # Ostatni stan przed zamknięciem - następny context startuje od niego
+                await self.sessions.save(context, source, force=True)
+                await context.close()
+            except Exception:
+                pass
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.debug(f"🔍 [BROWSER] Błąd zamykania starej przeglądarki: {e}")
+
+    def open_pages(self):
+        """Liczba otwartych kart we wszystkich contextach aktywnej przeglądarki"""
+        return sum(len(context.pages) for context in self._contexts.values())
+
+    def request_recycle(self):
+        """Trigger z zewnątrz (np. MemoryWatchdog) - podmiana w begin_cycle() gdy zapasowa gotowa"""
+        self._recycle_pending = True
+        self.prelaunch()
+
+    async def recycle_context(self, source):
+        """Zamyka context źródła - następne get_context() utworzy świeży w tej samej przeglądarce"""
+        async with self._lock:
+            context = self._contexts.pop(source, None)
+        if context is not None:
+            try:
+                await self.sessions.save(context, source, force=True)
+                await context.close()
+            except Exception as e:
+                logger.debug(f"🔍 [BROWSER] Błąd zamykania contextu {source}: {e}")
+
+    async def end_cycle(self):
+        """
+        Wołane po każdym cyklu. Opcjonalny trigger co N cykli (recycle_after_cycles > 0);
+        triggery pamięciowe zgłasza MemoryWatchdog przez request_recycle().
+        """
+        self._cycles += 1
+        recycle_after = self._settings()['recycle_after_cycles']
+        if not recycle_after:
+            return
+
+        if self._cycles >= recycle_after:
+            logger.info(f"♻️ [BROWSER] Trigger: {self._cycles} cykli")
+            self.request_recycle()
+        elif self._cycles >= recycle_after - 1:
+            # Rozgrzej następczynię zanim trigger faktycznie zadziała
+            self.prelaunch()
+
+    async def close(self):
+        """Zamyka wszystkie przeglądarki i driver Playwright"""
+        if self._standby is not None:
+            try:
+                await self._close_browser(await self._standby)
+            except Exception:
+                pass
+            self._standby = None
+        if self._active:
+            await self._close_browser(self._active, self._contexts)
+            self._active = None
+            self._contexts = {}
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
@@ -1,86 +1,368 @@
-import yaml
+import copy
+import logging
 import os
-from pathlib import Path
+import threading
+from types import MappingProxyType
+
+import yaml
+
+from utils.model_matcher import ModelMatcher
+from utils.pricing_matrix import PricingMatrix
+from utils.text_tagger import TextTagger
+
+logger = logging.getLogger('escraper.config')
+
+# Domyślne wartości opcjonalnych sekcji (scalane z config.yaml przy budowie snapshotu)
+SECTION_DEFAULTS = {
+    # recycle_after_cycles: 0 = bez recyklingu co N cykli; max_tab_pages - osobny limit kart TabPool
+    'browser': {
+        'headless': True,
+        'max_open_pages': 6,
+        'max_tab_pages': 4,
+        'recycle_after_cycles': 0
+    },
+    # Progi watchdoga pamięci (RSS przeglądarki, przyrost per context, RSS Pythona)
+    'memory': {
+        'enabled': True,
+        'browser_max_rss_mb': 1500,
+        'prelaunch_ratio': 0.8,
+        'context_max_growth_mb': 300,
+        'python_max_rss_mb': 800
+    },
+    # Adaptacyjny harmonogram skanów (per źródło / grupa FB)
+    'scheduler': {
+        'enabled': True,
+        'min_interval': 60,
+        'max_interval': 900,
+        'min_sleep': 15,
+        'speedup_factor': 0.6,
+        'slowdown_factor': 1.3,
+        'profile_days': 14,
+        'profile_refresh_minutes': 60
+    },
+    # Samodzielne workery i dostarczanie z outbox
+    'worker': {
+        'output': 'jsonl',
+        'outbox_dir': 'outbox',
+        'relay_outbox': False
+    },
+    # Pobieranie OLX: 'http' (requests, fallback na Playwright) albo 'browser' (tylko Playwright).
+    # Bazowe URL-e można podmienić na lokalny serwer z nagranymi odpowiedziami.
+    'olx': {
+        'fetch_mode': 'http',
+        'site_base_url': 'https://www.olx.pl',
+        'api_base_url': 'https://www.olx.pl/api/v1/offers/',
+        'api_params': {},
+        'limit': 25,
+        'timeout': 20,
+        'pool_size': 4,
+        'detail_concurrency': 4
+    },
+    # Stronicowanie do znacznika (najnowsze ID z poprzedniego przejścia) z limitem głębokości
+    'pagination': {
+        'max_pages': 5,
+        'watermark_size': 5,
+        'fb_max_scrolls': 6,
+        'fb_max_posts': 40
+    },
+    # Dyskowy cache stron ofert (TTL + limit bajtów LRU); routes: źródło -> wzorce URL dokumentów
+    'cache': {
+        'enabled': True,
+        'directory': 'cache/responses',
+        'ttl_hours': 24,
+        'max_mb': 200,
+        'routes': {}
+    },
+    # Zapisany storage_state per źródło; required_cookies: źródło -> ciasteczka zalogowanej sesji
+    'sessions': {
+        'directory': 'sessions',
+        'save_interval_minutes': 10,
+        'required_cookies': {'facebook': ['c_user', 'xs']}
+    },
+    # Smart matching: jak długo oferta czeka w inwentarzu, ilu kandydatów z zapytania zakresowego,
+    # ile propozycji wysłać dla jednej nowej oferty (reszta sekcji - w config.yaml).
+    # mode: optimal - rozłączne pary o największym łącznym zysku (skojarzenie liczone na puli do matching_pool
+    # otwartych ofert modelu, premia complementary_bonus za uzupełniające się uszkodzenia), all - każda opłacalna para
+    'smart_matching': {
+        'inventory_ttl_hours': 72,
+        'inventory_candidates': 50,
+        'max_matches_per_offer': 3,
+        'mode': 'optimal',
+        'matching_pool': 150,
+        'complementary_bonus': 100
+    },
+    # Eksport metryk (endpoint Prometheus + podsumowanie JSON)
+    'metrics': {
+        'enabled': True,
+        'host': '0.0.0.0',
+        'port': 9100,
+        'summary_path': 'metrics_summary.json'
+    }
+}
+
+SMART_MATCHING_MODES = ('optimal', 'all')
+
+REQUIRED_SECTIONS = ('general', 'models', 'conditions', 'pricing', 'smart_matching', 'ai', 'discord', 'sources')
+
+
+def _freeze(value):
+    """Rekurencyjnie: dict -> MappingProxyType, list -> tuple (snapshot tylko do odczytu)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ConfigSnapshot:
+    """
+    Zwalidowana, niezmienna konfiguracja zbudowana raz na wczytanie pliku.
+    Listy modeli, cennik i stany są przeliczone do struktur do szybkiego wyszukiwania.
+    """
+
+    def __init__(self, raw):
+        self._validate(raw)
+        self.data = _freeze(raw)
+
+        general = raw['general']
+        self.max_budget = general['max_budget']
+        self.check_interval = (general['check_interval_min'], general['check_interval_max'])
+
+        self.enabled_models = tuple(raw['models'].get('enabled') or ())
+        self.excluded_models = tuple(raw['models'].get('excluded') or ())
+        self.model_matcher = ModelMatcher(self.enabled_models, self.excluded_models, raw['models'].get('aliases'))
+        self.text_tagger = TextTagger.from_config(raw.get('tagger'))
+
+        self.enabled_conditions = tuple(k for k, v in raw['conditions'].items() if v)
+        self.pricing = MappingProxyType({
+            str(model).lower().strip(): _freeze(prices)
+            for model, prices in raw['pricing'].items()
+        })
+        self.pricing_matrix = PricingMatrix(self.pricing)
+        self.enabled_sources = tuple(k for k, v in raw['sources'].items() if v)
+
+        self.sections = {}
+        for section, defaults in SECTION_DEFAULTS.items():
+            merged = dict(defaults)
+            merged.update(raw.get(section) or {})
+            self.sections[section] = MappingProxyType(merged)
+
+    @staticmethod
+    def _validate(raw):
+        if not isinstance(raw, dict):
+            raise ValueError("Konfiguracja musi być słownikiem YAML")
+        missing = [s for s in REQUIRED_SECTIONS if s not in raw]
+        if missing:
+            raise ValueError(f"Brak sekcji w konfiguracji: {', '.join(missing)}")
+
+        general = raw['general']
+        for key in ('max_budget', 'check_interval_min', 'check_interval_max'):
+            if not isinstance(general.get(key), (int, float)):
+                raise ValueError(f"general.{key} musi być liczbą")
+        if general['max_budget'] < 0:
+            raise ValueError("general.max_budget musi być liczbą dodatnią")
+        if general['check_interval_min'] > general['check_interval_max']:
+            raise ValueError("general.check_interval_min > check_interval_max")
+
+        if not isinstance(raw['models'].get('enabled') or [], list):
+            raise ValueError("models.enabled musi być listą")
+        if not isinstance(raw['models'].get('aliases') or {}, dict):
+            raise ValueError("models.aliases musi być słownikiem skrót -> nazwa")
+        if not isinstance(raw.get('tagger') or {}, dict):
+            raise ValueError("tagger musi być słownikiem (condition / damage / keyword / negations)")
+        if not isinstance(raw['pricing'], dict):
+            raise ValueError("pricing musi być słownikiem model -> ceny")
+        if (raw['smart_matching'] or {}).get('mode', 'optimal') not in SMART_MATCHING_MODES:
+            raise ValueError(f"smart_matching.mode musi być jednym z: {', '.join(SMART_MATCHING_MODES)}")
+
+    def is_model_enabled(self, title):
+        """Tytuł zawiera włączony model - ta sama decyzja co ModelMatcher (skróty, wykluczone, obce warianty)"""
+        return self.model_matcher.match(title) is not None
+
 
 class ConfigLoader:
+    """
+    Trzyma aktualny ConfigSnapshot. Przeładowanie (zmiana mtime pliku) i zapisy
+    (!set_budget, odświeżenie grup) budują nowy snapshot i podmieniają go atomowo,
+    więc równoległe odczyty zawsze widzą spójną konfigurację.
+    """
+
     def __init__(self, config_path='config.yaml'):
         self.config_path = config_path
-        self.config = self._load_config()
-    
+        self._lock = threading.Lock()
+        self._raw, self._mtime = self._load_config()
+        self._snapshot = ConfigSnapshot(self._raw)
+
+    def _file_mtime(self):
+        return os.stat(self.config_path).st_mtime_ns
+
     def _load_config(self):
         """Wczytaj konfigurację z pliku YAML"""
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"Plik konfiguracyjny {self.config_path} nie istnieje!")
-        
+
+        mtime = self._file_mtime()
         with open(self.config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    
+            return yaml.safe_load(f), mtime
+
+    @property
+    def config(self):
+        """Surowa konfiguracja (tylko do odczytu) z bieżącego snapshotu"""
+        return self._snapshot.data
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
     def reload(self):
-        """Przeładuj konfigurację (bez restartowania bota)"""
-        self.config = self._load_config()
-    
+        """Przeładuj konfigurację (bez restartowania bota). Błędny plik zostawia poprzedni snapshot."""
+        with self._lock:
+            raw, mtime = self._load_config()
+            snapshot = ConfigSnapshot(raw)
+            self._raw, self._mtime, self._snapshot = raw, mtime, snapshot
+
+    def reload_if_changed(self):
+        """Przeładuj tylko gdy plik zmienił się na dysku (mtime). Zwraca True po przeładowaniu."""
+        try:
+            if self._file_mtime() == self._mtime:
+                return False
+            self.reload()
+            logger.info("🔄 [CONFIG] Wykryto zmianę config.yaml - konfiguracja przeładowana")
+            return True
+        except Exception as e:
+            logger.error(f"❌ [CONFIG] Nie można przeładować konfiguracji (zostaje poprzednia): {e}")
+            # Nie próbuj co cykl tej samej błędnej wersji pliku
+            try:
+                self._mtime = self._file_mtime()
+            except OSError:
+                pass
+            return False
+
+    def set_value(self, section, key, value):
+        """Zmienia jedną wartość, zapisuje plik i podmienia snapshot (zmiany z dysku nie giną)"""
+        with self._lock:
+            raw = self._raw
+            if self._file_mtime() != self._mtime:
+                raw, _ = self._load_config()
+            raw = copy.deepcopy(raw)
+            raw.setdefault(section, {})[key] = value
+            snapshot = ConfigSnapshot(raw)
+            self._write(raw)
+            self._raw, self._mtime, self._snapshot = raw, self._file_mtime(), snapshot
+
+    def set_max_budget(self, budget):
+        self.set_value('general', 'max_budget', budget)
+
     # Gettery dla łatwego dostępu
-    
+
     def get_max_budget(self):
-        return self.config['general']['max_budget']
-    
+        return self._snapshot.max_budget
+
     def get_check_interval(self):
-        return (
-            self.config['general']['check_interval_min'],
-            self.config['general']['check_interval_max']
-        )
-    
+        return self._snapshot.check_interval
+
     def get_enabled_models(self):
-        return self.config['models']['enabled']
-    
+        return self._snapshot.enabled_models
+
     def get_excluded_models(self):
-        return self.config['models']['excluded']
-    
+        return self._snapshot.excluded_models
+
+    def get_model_matcher(self):
+        """Trie modeli (włączone, wykluczone, skróty) zbudowane przy wczytaniu configu"""
+        return self._snapshot.model_matcher
+
+    def get_text_tagger(self):
+        """Tagger stanu / uszkodzeń / słów kluczowych (słowniki domyślne + sekcja tagger:)"""
+        return self._snapshot.text_tagger
+
     def get_enabled_conditions(self):
         """Zwraca listę włączonych stanów (uszkodzony, zablokowany, etc.)"""
-        return [k for k, v in self.config['conditions'].items() if v]
-    
+        return self._snapshot.enabled_conditions
+
     def get_pricing(self, model):
         """Pobierz cennik dla konkretnego modelu"""
-        model_lower = model.lower().strip()
-        return self.config['pricing'].get(model_lower)
-    
-    def is_model_enabled(self, model):
-        """Sprawdź czy model jest na liście do wyszukiwania"""
-        model_lower = model.lower().strip()
-        
-        # Sprawdź czy nie jest wykluczony
-        for excluded in self.get_excluded_models():
-            if excluded in model_lower:
-                return False
-        
-        # Sprawdź czy jest włączony
-        for enabled in self.get_enabled_models():
-            if enabled in model_lower:
-                return True
-        
-        return False
-    
+        return self._snapshot.pricing.get(model.lower().strip())
+
+    def get_pricing_matrix(self):
+        """Cennik jako macierz model x pole (do calculate_many)"""
+        return self._snapshot.pricing_matrix
+
+    def is_model_enabled(self, title):
+        """Sprawdź czy tytuł dotyczy modelu z listy do wyszukiwania (przez get_model_matcher)"""
+        return self._snapshot.is_model_enabled(title)
+
     def is_smart_matching_enabled(self):
-        return self.config['smart_matching']['enabled']
-    
+        return self._snapshot.sections['smart_matching']['enabled']
+
     def get_smart_matching_config(self):
-        return self.config['smart_matching']
-    
+        return self._snapshot.sections['smart_matching']
+
     def is_ai_enabled(self):
         return self.config['ai']['enabled']
-    
+
     def get_ai_config(self):
         return self.config['ai']
-    
+
     def get_discord_config(self):
         return self.config['discord']
-    
+
+    def get_browser_config(self):
+        """Ustawienia puli przeglądarek (recycle_after_cycles: 0 = bez recyklingu co N cykli)"""
+        return self._snapshot.sections['browser']
+
+    def get_memory_config(self):
+        """Progi watchdoga pamięci (RSS przeglądarki, przyrost per context, RSS Pythona)"""
+        return self._snapshot.sections['memory']
+
+    def get_scheduler_config(self):
+        """Ustawienia adaptacyjnego harmonogramu skanów (per źródło / grupa FB)"""
+        return self._snapshot.sections['scheduler']
+
+    def get_worker_config(self):
+        """Ustawienia samodzielnych workerów i dostarczania z outbox"""
+        return self._snapshot.sections['worker']
+
+    def get_olx_config(self):
+        """Tryb pobierania OLX (HTTP-first / przeglądarka) i bazowe URL-e"""
+        return self._snapshot.sections['olx']
+
+    def get_cache_config(self):
+        """Dyskowy cache stron ofert (TTL, limit MB, wzorce URL per źródło)"""
+        return self._snapshot.sections['cache']
+
+    def get_pagination_config(self):
+        """Limity stronicowania do znacznika (strony OLX/Allegro, przewinięcia feedu FB)"""
+        return self._snapshot.sections['pagination']
+
+    def get_sessions_config(self):
+        """Zapis storage_state per źródło (katalog, częstotliwość, ciasteczka logowania)"""
+        return self._snapshot.sections['sessions']
+
+    def get_resource_policy(self, source):
+        """Polityka blokowania zasobów dla źródła: resources.default nadpisane przez resources.<źródło>"""
+        resources = self.config.get('resources') or {}
+        policy = {'block_types': (), 'block_domains': ()}
+        policy.update(resources.get('default') or {})
+        policy.update(resources.get(source) or {})
+        return policy
+
+    def get_metrics_config(self):
+        """Ustawienia eksportu metryk (endpoint Prometheus + podsumowanie JSON)"""
+        return self._snapshot.sections['metrics']
+
     def get_enabled_sources(self):
         """Zwraca listę włączonych źródeł (olx, facebook, etc.)"""
-        return [k for k, v in self.config['sources'].items() if v]
-    
+        return self._snapshot.enabled_sources
+
+    def _write(self, raw):
+        # Plik tymczasowy + rename - czytelnik nigdy nie zobaczy połowy pliku
+        tmp_path = f"{self.config_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            yaml.dump(raw, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        os.replace(tmp_path, self.config_path)
+
     def save(self):
         """Zapisz aktualną konfigurację do pliku YAML"""
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        with self._lock:
+            self._write(self._raw)
+            self._mtime = self._file_mtime()
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import traceback
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.cycle')
+
+
+class CycleExecutor:
+    """
+    Uruchamia źródła (FB, OLX, Allegro) równolegle w ramach jednego cyklu.
+    Każde źródło dostaje własny context z puli przeglądarek, błąd jednego
+    źródła nie przerywa pozostałych (ASYNC ISOLATION).
+    """
+
+    def __init__(self, browser_pool, memory_watchdog=None):
+        self.pool = browser_pool
+        self.watchdog = memory_watchdog
+
+    async def _run_source(self, name, label, scrape, channel):
+        try:
+            context = await self.pool.get_context(name)
+            if self.watchdog:
+                self.watchdog.source_started(name)
+            try:
+                with metrics.span('source_total', source=name):
+                    await scrape(context, channel)
+            finally:
+                if self.watchdog:
+                    self.watchdog.source_finished(name)
+            logger.info(f"✅ [{label}] Scraper zakończony sukcesem")
+            metrics.inc('source_runs', source=name, result='ok')
+            # Udana sesja - zapisz storage_state (następny context/restart startuje z ciepłym stanem)
+            await self.pool.save_session(name)
+            return True
+        except Exception as e:
+            metrics.inc('source_runs', source=name, result='error')
+            logger.error(f"❌ [{label}] Błąd scrapera: {e}")
+            logger.error(f"❌ [{label}] Traceback: {traceback.format_exc()}")
+            return False
+
+    async def run(self, sources, channel):
+        """
+        Args:
+            sources: Lista krotek (nazwa, etykieta, scrape), gdzie scrape(context, channel) to coroutine
+
+        Returns:
+            dict: nazwa źródła -> True (sukces) / False (błąd)
+        """
+        await self.pool.begin_cycle()
+
+        results = await asyncio.gather(*(
+            self._run_source(name, label, scrape, channel)
+            for name, label, scrape in sources
+        ))
+        return {name: ok for (name, _, _), ok in zip(sources, results)}
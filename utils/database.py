@@ -1,22 +1,51 @@
 import sqlite3
 from datetime import datetime
 import hashlib
+import json
+import time
 
 class Database:
-    def __init__(self, db_path='hunter_final.db'):
+    def __init__(self, db_path='hunter_final.db', reset_offers=True):
         self.db_path = db_path
+        self.reset_offers = reset_offers
         self.init_db()
     
     def init_db(self):
         conn = sqlite3.connect(self.db_path)
         # ABSOLUTE DUPLICATE LOCK - content_hash jako PRIMARY KEY
-        conn.execute('''DROP TABLE IF EXISTS offers''')  # Wyczyść starą tabelę
-        conn.execute('''CREATE TABLE offers 
+        if self.reset_offers:
+            conn.execute('''DROP TABLE IF EXISTS offers''')  # Wyczyść starą tabelę
+        conn.execute('''CREATE TABLE IF NOT EXISTS offers 
                        (content_hash TEXT PRIMARY KEY, title TEXT, price REAL, url TEXT, 
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+                        source TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+        # Baza sprzed kolumny source (worker bez resetu tabeli) - dopisz kolumnę zamiast wywracać INSERT-y
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(offers)")}
+        if 'source' not in columns:
+            conn.execute("ALTER TABLE offers ADD COLUMN source TEXT")
         conn.execute('''CREATE TABLE IF NOT EXISTS fb_notifications 
                        (notification_id TEXT PRIMARY KEY, group_name TEXT, content TEXT, 
                         post_url TEXT, date_added TEXT)''')
+        # Widziane ogłoszenia (źródło + stabilne ID + cena) - test przed pobraniem strony oferty
+        conn.execute('''CREATE TABLE IF NOT EXISTS seen_listings 
+                       (source TEXT, listing_id TEXT, price REAL, first_seen REAL, last_seen REAL, 
+                        PRIMARY KEY (source, listing_id))''')
+        # Znacznik najnowszych ogłoszeń per źródło + zapytanie (URL wyszukiwania / grupy) - granica stronicowania
+        conn.execute('''CREATE TABLE IF NOT EXISTS watermarks 
+                       (source TEXT, query TEXT, listing_ids TEXT, updated_at REAL, 
+                        PRIMARY KEY (source, query))''')
+        # Otwarte uszkodzone / zablokowane oferty wszystkich źródeł - kandydaci do smart matchingu
+        conn.execute('''CREATE TABLE IF NOT EXISTS inventory 
+                       (source TEXT, listing_id TEXT, model TEXT, condition TEXT, damages TEXT, price REAL, 
+                        url TEXT, title TEXT, added_at REAL, anchor TEXT, PRIMARY KEY (source, listing_id))''')
+        # anchor - starszy sąsiad oferty na liście wyników z ostatniego przejścia (wykrywanie zniknięcia)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(inventory)")}
+        if 'anchor' not in columns:
+            conn.execute("ALTER TABLE inventory ADD COLUMN anchor TEXT")
+        conn.execute('''CREATE INDEX IF NOT EXISTS inventory_model_price ON inventory (model, price)''')
+        # Dzierżawy grup FB - kilku workerów skanuje rozłączne grupy
+        conn.execute('''CREATE TABLE IF NOT EXISTS group_leases 
+                       (group_url TEXT PRIMARY KEY, worker_id TEXT, lease_until REAL DEFAULT 0, 
+                        last_scanned REAL DEFAULT 0, next_run REAL DEFAULT 0)''')
         conn.commit()
         conn.close()
     
@@ -43,7 +72,7 @@ class Database:
         
         return content_hash
     
-    def commit_or_abort(self, content_hash, title, price, url):
+    def commit_or_abort(self, content_hash, title, price, url, source=None):
         """
         COMMIT OR ABORT LOGIC - ABSOLUTE DUPLICATE LOCK
         Zwraca True jeśli sukces, False jeśli duplikat
@@ -51,8 +80,8 @@ class Database:
         conn = sqlite3.connect(self.db_path)
         try:
             # Próba wstawienia - jeśli content_hash istnieje, IntegrityError
-            conn.execute("INSERT INTO offers (content_hash, title, price, url) VALUES (?, ?, ?, ?)", 
-                        (content_hash, title, float(price), url))
+            conn.execute("INSERT INTO offers (content_hash, title, price, url, source) VALUES (?, ?, ?, ?, ?)", 
+                        (content_hash, title, float(price), url, source))
             conn.commit()
             print(f"DEBUG: COMMIT SUCCESS - {content_hash[:12]}...")
             return True
@@ -65,6 +94,234 @@ class Database:
         finally:
             conn.close()
     
+    def filter_seen(self, source, listings):
+        """
+        Zwraca zbiór ID ogłoszeń już widzianych z tą samą ceną.
+        Zmiana ceny traktowana jest jak nowe ogłoszenie (pełna ścieżka z hashem treści).
+        
+        Args:
+            listings: lista krotek (listing_id, cena)
+        """
+        listings = [(listing_id, price) for listing_id, price in listings if listing_id]
+        if not listings:
+            return set()
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            placeholders = ','.join('?' * len(listings))
+            rows = conn.execute(
+                f"SELECT listing_id, price FROM seen_listings WHERE source = ? AND listing_id IN ({placeholders})",
+                (source, *[listing_id for listing_id, _ in listings])
+            ).fetchall()
+        finally:
+            conn.close()
+        known = dict(rows)
+        return {listing_id for listing_id, price in listings
+                if listing_id in known and known[listing_id] == float(price or 0)}
+    
+    def mark_seen(self, source, listing_id, price):
+        """Zapamiętuje ogłoszenie po przejściu przez deduplikację treści"""
+        if not listing_id:
+            return
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute(
+                "INSERT INTO seen_listings (source, listing_id, price, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(source, listing_id) DO UPDATE SET price = excluded.price, last_seen = excluded.last_seen",
+                (source, listing_id, float(price or 0), now, now)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_watermark(self, source, query):
+        """ID najnowszych ogłoszeń z poprzedniego przejścia (od najnowszego), pusta lista przy zimnym starcie"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            row = conn.execute(
+                "SELECT listing_ids FROM watermarks WHERE source = ? AND query = ?", (source, query)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else []
+    
+    def set_watermark(self, source, query, listing_ids):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute(
+                "INSERT INTO watermarks (source, query, listing_ids, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(source, query) DO UPDATE SET listing_ids = excluded.listing_ids, "
+                "updated_at = excluded.updated_at",
+                (source, query, json.dumps(list(listing_ids)), time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def add_inventory(self, offer):
+        """Zapisuje otwartą ofertę (dict: source, listing_id, model, condition, damages, price, url, title)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute(
+                "INSERT INTO inventory (source, listing_id, model, condition, damages, price, url, title, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(source, listing_id) DO UPDATE SET model = excluded.model, condition = excluded.condition, "
+                "damages = excluded.damages, price = excluded.price, url = excluded.url, title = excluded.title, "
+                "added_at = excluded.added_at",
+                (offer['source'], offer['listing_id'], offer['model'], offer['condition'],
+                 json.dumps(list(offer['damages'])), float(offer['price']), offer['url'], offer['title'], time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def find_inventory(self, model, max_price, since, exclude=None, limit=50):
+        """
+        Otwarte oferty modelu z ceną <= max_price, dodane po `since`, od najtańszej
+        (zapytanie zakresowe po indeksie model + cena). exclude: (source, listing_id) pomijanej oferty.
+        """
+        source, listing_id = exclude or (None, None)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            rows = conn.execute(
+                "SELECT source, listing_id, model, condition, damages, price, url, title FROM inventory "
+                "WHERE model = ? AND price <= ? AND added_at >= ? AND NOT (source IS ? AND listing_id IS ?) "
+                "ORDER BY price LIMIT ?",
+                (model, float(max_price), since, source, listing_id, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        keys = ('source', 'listing_id', 'model', 'condition', 'damages', 'price', 'url', 'title')
+        offers = [dict(zip(keys, row)) for row in rows]
+        for offer in offers:
+            offer['damages'] = json.loads(offer['damages'] or '[]')
+        return offers
+    
+    def get_inventory_listings(self, source):
+        """Oferty źródła w inwentarzu: lista krotek (listing_id, cena, kotwica)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            return conn.execute("SELECT listing_id, price, anchor FROM inventory WHERE source = ?", (source,)).fetchall()
+        finally:
+            conn.close()
+    
+    def set_inventory_anchors(self, source, anchors):
+        """Zapisuje kotwice ofert (słownik listing_id -> ID starszego sąsiada na liście wyników)"""
+        if not anchors:
+            return
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.executemany("UPDATE inventory SET anchor = ? WHERE source = ? AND listing_id = ?",
+                             [(anchor, source, listing_id) for listing_id, anchor in anchors.items()])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def remove_inventory(self, offers):
+        """Usuwa oferty (krotki (source, listing_id)) - sparowane albo zdjęte z serwisu; zwraca liczbę usuniętych"""
+        if not offers:
+            return 0
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            deleted = conn.executemany("DELETE FROM inventory WHERE source = ? AND listing_id = ?", offers).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
+    
+    def evict_inventory(self, older_than):
+        """Usuwa oferty dodane przed `older_than` (już nieaktualne); zwraca liczbę usuniętych"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            deleted = conn.execute("DELETE FROM inventory WHERE added_at < ?", (older_than,)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
+    
+    def get_hourly_activity(self, source=None, days=14):
+        """
+        Liczba nowych ofert w każdej godzinie doby (czas lokalny) z ostatnich N dni.
+        Zwraca listę 24 liczb (indeks = godzina).
+        """
+        query = ("SELECT CAST(strftime('%H', timestamp, 'localtime') AS INTEGER), COUNT(*) FROM offers "
+                 "WHERE timestamp >= datetime('now', ?)")
+        params = [f'-{int(days)} days']
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        query += " GROUP BY 1"
+        
+        counts = [0] * 24
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for hour, count in conn.execute(query, params):
+                if hour is not None:
+                    counts[hour] = count
+        finally:
+            conn.close()
+        return counts
+    
+    def claim_group(self, worker_id, group_urls, lease_seconds=300):
+        """
+        Atomowo dzierżawi jedną grupę FB dla workera: tę z najstarszym terminem,
+        której nikt nie trzyma (albo której dzierżawa wygasła po crashu workera).
+        Zwraca URL grupy albo None gdy żadna nie czeka.
+        """
+        if not group_urls:
+            return None
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT OR IGNORE INTO group_leases (group_url) VALUES (?)",
+                             [(url,) for url in group_urls])
+            placeholders = ','.join('?' * len(group_urls))
+            row = conn.execute(
+                f"SELECT group_url FROM group_leases WHERE group_url IN ({placeholders}) "
+                "AND next_run <= ? AND (lease_until < ? OR worker_id = ?) "
+                "ORDER BY next_run, last_scanned LIMIT 1",
+                (*group_urls, now, now, worker_id)
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE group_leases SET worker_id = ?, lease_until = ? WHERE group_url = ?",
+                             (worker_id, now + lease_seconds, row[0]))
+            conn.execute("COMMIT")
+            return row[0] if row else None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def release_group(self, worker_id, group_url, next_run=0):
+        """Zwalnia dzierżawę po skanie i zapisuje termin następnego skanu (wspólny dla workerów)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("UPDATE group_leases SET lease_until = 0, last_scanned = ?, next_run = ? "
+                         "WHERE group_url = ? AND worker_id = ?",
+                         (time.time(), next_run, group_url, worker_id))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_next_group_run(self, group_urls):
+        """Najbliższy termin skanu spośród grup (0 gdy jakaś grupa nie była jeszcze skanowana)"""
+        if not group_urls:
+            return None
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            placeholders = ','.join('?' * len(group_urls))
+            rows = conn.execute(
+                f"SELECT group_url, MAX(next_run, lease_until) FROM group_leases WHERE group_url IN ({placeholders})",
+                group_urls
+            ).fetchall()
+        finally:
+            conn.close()
+        if len(rows) < len(set(group_urls)):
+            return 0
+        return min(next_run for _, next_run in rows)
+    
     def fb_notification_exists(self, description, price=0, title=None):
         """Sprawdź czy powiadomienie FB istnieje na podstawie opisu + cena + tytuł"""
         content_hash = self._create_content_hash(description, price, title)
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+
+from utils.metrics import metrics
+from utils.pair_matching import connected_component
+
+logger = logging.getLogger('escraper.inventory')
+
+MATCHABLE_CONDITIONS = ('broken', 'parts', 'locked')
+# offer() działa w wątku (asyncio.to_thread) - oferty ze źródeł równoległych parowane po kolei,
+# żeby dwie nowe połówki pary nie minęły się między odczytem puli a zapisem
+_offer_lock = threading.Lock()
+
+
+class OfferInventory:
+    """
+    Trwały inwentarz otwartych ofert uszkodzonych / zablokowanych ze wszystkich źródeł (tabela inventory).
+    Każda nowa oferta jest od razu parowana z inwentarzem zapytaniem zakresowym (model + cena <= limit),
+    więc para z drugą ofertą z innego cyklu albo innego źródła wychodzi w chwili pojawienia się drugiej.
+    Oferty starsze niż inventory_ttl_hours są traktowane jako nieaktualne i usuwane; wcześniej wypadają
+    oferty zdjęte z serwisu albo ze zmienioną ceną (sync_walk po przejściu listy wyników).
+    W trybie optimal nowa oferta dostaje tylko parę z optymalnego skojarzenia całej puli modelu,
+    a obie oferty zaproponowanej pary wychodzą z inwentarza.
+    """
+
+    def __init__(self, db, config_loader, profit_calculator, evict_interval=300):
+        self.db = db
+        self.config = config_loader
+        self.profit_calc = profit_calculator
+        self.evict_interval = evict_interval
+        self._evicted_at = 0
+
+    def _ttl_seconds(self):
+        return self.config.get_smart_matching_config()['inventory_ttl_hours'] * 3600
+
+    def evict(self, force=False):
+        """Usuwa oferty po TTL (najwyżej co evict_interval, chyba że force)"""
+        now = time.time()
+        if not force and now - self._evicted_at < self.evict_interval:
+            return 0
+        self._evicted_at = now
+        deleted = self.db.evict_inventory(now - self._ttl_seconds())
+        if deleted:
+            metrics.inc('inventory_evicted', deleted)
+            logger.debug(f"🧹 [INVENTORY] Usunięto {deleted} nieaktualnych ofert")
+        return deleted
+
+    def sync_walk(self, source, walk):
+        """
+        Porównuje inwentarz źródła z kartami przejrzanych stron wyników (walk.visible, od najnowszej).
+        Usuwa oferty widoczne ze zmienioną ceną (dla filter_seen to nowe ogłoszenie - przejdzie ścieżkę od nowa)
+        i niewidoczne, których kotwica jest widoczna: nowsze od kotwicy ogłoszenie powinno stać nad nią na liście,
+        więc zniknęło (sprzedane / usunięte). Widocznym ofertom ustawia kotwicę na kolejną widoczną kartę.
+        Ogłoszenia starsze niż przejrzane strony zostają - tych przejście nie obejmuje.
+        """
+        order = list(walk.visible)
+        if not order:
+            return 0
+        older = dict(zip(order, order[1:]))
+        stale = []
+        anchors = {}
+        for listing_id, price, anchor in self.db.get_inventory_listings(source):
+            if listing_id in walk.visible:
+                visible_price = walk.visible[listing_id]
+                if visible_price and float(visible_price) != price:
+                    stale.append((source, listing_id))
+                elif listing_id in older:
+                    anchors[listing_id] = older[listing_id]
+            elif anchor in walk.visible:
+                stale.append((source, listing_id))
+
+        self.db.set_inventory_anchors(source, anchors)
+        removed = self.db.remove_inventory(stale)
+        if removed:
+            metrics.inc('inventory_removed', removed, source=source, reason='listing')
+            logger.debug(f"🧹 [INVENTORY] {source}: usunięto {removed} zdjętych / przecenionych ofert")
+        return removed
+
+    def offer(self, source, listing_id, result, url, title):
+        """
+        Nowa oferta po deduplikacji (wynik calculate). Zwraca propozycje połączeń z ofertami
+        z inwentarza (od największego zysku); oferta uszkodzona / zablokowana trafia do inwentarza.
+        Skojarzenie O(n^3) - scrapery wołają przez asyncio.to_thread, żeby nie blokować pętli zdarzeń.
+        """
+        with _offer_lock:
+            return self._offer(source, listing_id, result, url, title)
+
+    def _offer(self, source, listing_id, result, url, title):
+        if not self.config.is_smart_matching_enabled():
+            return []
+        model = result.get('model')
+        if not model or result.get('condition') not in MATCHABLE_CONDITIONS:
+            return []
+        pricing = self.config.get_pricing(model)
+        if not pricing:
+            return []
+
+        self.evict()
+        smart_config = self.config.get_smart_matching_config()
+        offer = {
+            'source': source,
+            'listing_id': listing_id or url,
+            'model': model,
+            'condition': result['condition'],
+            'damages': list(result.get('damages') or ()),
+            'buy_price': result['buy_price'],
+            'url': url,
+            'title': title
+        }
+
+        if smart_config['mode'] == 'optimal':
+            matches = self._optimal_match(offer, pricing, smart_config)
+        else:
+            matches = self._partner_matches(offer, pricing, smart_config)
+
+        if matches and smart_config['mode'] == 'optimal':
+            # Para zaproponowana - partner wychodzi z puli, nowa oferta do niej nie trafia (bez powtórek w parach)
+            partners = [m['offer2'] if m['offer1'] is offer else m['offer1'] for m in matches]
+            removed = self.db.remove_inventory([(p['source'], p['listing_id']) for p in partners])
+            metrics.inc('inventory_removed', removed, source=source, reason='paired')
+        else:
+            self.db.add_inventory({**offer, 'price': offer['buy_price']})
+            metrics.inc('inventory_added', source=source)
+        if matches:
+            metrics.inc('inventory_matches', len(matches), source=source)
+            matches.sort(key=lambda m: m['potential_profit'], reverse=True)
+            logger.info(f"💡 [INVENTORY] {model}: {len(matches)} połączeń dla nowej oferty ({source})")
+        return matches
+
+    def _candidates(self, offer, max_price, limit):
+        with metrics.span('inventory_match', source=offer['source']):
+            candidates = self.db.find_inventory(
+                offer['model'], max_price, time.time() - self._ttl_seconds(),
+                exclude=(offer['source'], offer['listing_id']), limit=limit
+            )
+        for candidate in candidates:
+            candidate['buy_price'] = int(candidate.pop('price'))
+        return candidates
+
+    def _partner_matches(self, offer, pricing, smart_config):
+        """Tryb all: każda opłacalna para nowej oferty z ofertą z inwentarza"""
+        model = offer['model']
+        max_price = self.profit_calc.max_partner_price(model, offer['buy_price'], pricing, smart_config)
+        if max_price is None or max_price <= 0:
+            return []
+        matches = []
+        for candidate in self._candidates(offer, max_price, smart_config['inventory_candidates']):
+            match = self.profit_calc.smart_pair(model, candidate, offer, pricing, smart_config)
+            if match:
+                matches.append(match)
+        return matches
+
+    def _optimal_match(self, offer, pricing, smart_config):
+        """
+        Tryb optimal: para nowej oferty w optymalnym skojarzeniu otwartych ofert modelu (najwyżej jedna).
+        Partner, którego najlepszy plan zakupów łączy z inną ofertą, nie jest proponowany.
+        """
+        model = offer['model']
+        max_price = self.profit_calc.max_partner_price(model, offer['buy_price'], pricing, smart_config)
+        if max_price is None or max_price <= 0:
+            return []
+        # Pula: wszystko, co może wejść w jakąkolwiek parę (partner za 0 zł), nie tylko partnerzy nowej oferty
+        pool_price = self.profit_calc.max_partner_price(model, 0, pricing, smart_config)
+        offers = [offer] + self._candidates(offer, pool_price, smart_config['matching_pool'])
+
+        with metrics.span('pair_matching', source=offer['source']):
+            pairs = self.profit_calc.pair_candidates(model, offers, pricing, smart_config)
+            component = connected_component(pairs, 0)
+            if len(component) < 2:
+                return []
+            pairs = [pair for pair in pairs if pair[0] in component]
+            chosen = self.profit_calc.select_pairs(pairs, smart_config)
+        return [match for i, j, match in chosen if 0 in (i, j)]
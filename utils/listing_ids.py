@@ -0,0 +1,47 @@
+import re
+from urllib.parse import urlsplit
+
+# Stabilne identyfikatory ogłoszeń - szybki test "już widziane" zanim otworzymy stronę oferty
+
+OLX_ID_RE = re.compile(r'-ID([0-9A-Za-z]+)\.html')
+FB_POST_ID_RES = (
+    re.compile(r'/posts/(\d+)'),
+    re.compile(r'/permalink/(\d+)'),
+    re.compile(r'[?&]story_fbid=(\d+)'),
+    re.compile(r'[?&]multi_permalinks=(\d+)'),
+)
+
+
+def normalize_url(url):
+    """Host + ścieżka bez query i fragmentu (parametry śledzące zmieniają się między cyklami)"""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}" or None
+
+
+def olx_listing_id(ad_id=None, url=None):
+    """ID ogłoszenia OLX: z danych/atrybutu karty, z URL (...-IDabc123.html) albo znormalizowany URL"""
+    if ad_id:
+        return str(ad_id)
+    match = OLX_ID_RE.search(url or "")
+    if match:
+        return match.group(1)
+    return normalize_url(url)
+
+
+def allegro_listing_id(url):
+    """Allegro Lokalnie: ostatni segment ścieżki /oferta/<slug-z-id>"""
+    path = urlsplit(url or "").path.rstrip('/')
+    if '/oferta/' in path:
+        return path.rsplit('/', 1)[-1]
+    return normalize_url(url)
+
+
+def fb_post_id(url):
+    """ID posta FB z linku (posts/permalink/story_fbid) albo None"""
+    for pattern in FB_POST_ID_RES:
+        match = pattern.search(url or "")
+        if match:
+            return match.group(1)
+    return None
@@ -0,0 +1,187 @@
+import gc
+import logging
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.memory')
+
+
+def _psutil():
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+class MemoryWatchdog:
+    """
+    Mierzy RSS drzewa procesów aktywnej przeglądarki i procesu Pythona, przypisuje przyrosty
+    do źródeł (pomiar przed/po każdym źródle) i recyklinguje tylko po przekroczeniu progów:
+    - przyrost RSS przeglądarki w trakcie pracy źródła -> nowy context tego źródła
+    - RSS całej przeglądarki -> podmiana przeglądarki (zapasowa rozgrzewa się wcześniej)
+    - RSS Pythona -> gc.collect()
+
+    Przy równoległych źródłach przyrost per źródło jest przybliżony (nakładające się pomiary).
+    Rozgrzana zapasowa i zamykane stare przeglądarki nie wchodzą do pomiaru (zapasowa - osobny gauge),
+    inaczej sam prelaunch podbijałby RSS ponad próg recyklingu.
+    """
+
+    def __init__(self, config_loader, browser_pool):
+        self.config = config_loader
+        self.pool = browser_pool
+        self._growth = {}        # źródło -> przyrost RSS przeglądarki od utworzenia contextu (MB)
+        self._baseline = {}      # źródło -> (RSS przeglądarki, RSS Pythona) na starcie źródła
+        self._warned = False
+        self._roots = {}         # przełącznik przeglądarki -> PID jej głównego procesu
+
+    def _settings(self):
+        return self.config.get_memory_config()
+
+    def _browser_root(self, psutil, marker):
+        """Główny proces przeglądarki z przełącznikiem `marker` (PID zapamiętany, sprawdzany przy reużyciu)"""
+        pid = self._roots.get(marker)
+        if pid is not None:
+            try:
+                process = psutil.Process(pid)
+                if marker in process.cmdline():
+                    return process
+            except psutil.Error:
+                pass
+            self._roots.pop(marker, None)
+
+        for child in psutil.Process().children(recursive=True):
+            try:
+                parent = child.parent()
+                if marker in child.cmdline() and (parent is None or marker not in parent.cmdline()):
+                    self._roots[marker] = child.pid
+                    return child
+            except psutil.Error:
+                continue
+        return None
+
+    def _tree_rss_mb(self, marker):
+        """RSS drzewa procesów jednej przeglądarki (0 gdy jej nie ma, None bez psutil)"""
+        psutil = _psutil()
+        if psutil is None:
+            return None
+        if marker is None:
+            return 0.0
+        root = self._browser_root(psutil, marker)
+        if root is None:
+            return 0.0
+
+        total = 0
+        try:
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0.0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1024 / 1024
+
+    def browser_rss_mb(self):
+        """RSS drzewa procesów aktywnej przeglądarki (bez zapasowej i zamykanych)"""
+        return self._tree_rss_mb(self.pool.process_markers()[0])
+
+    def standby_rss_mb(self):
+        """RSS rozgrzanej zapasowej przeglądarki (0 gdy jej nie ma)"""
+        return self._tree_rss_mb(self.pool.process_markers()[1])
+
+    def python_rss_mb(self):
+        psutil = _psutil()
+        if psutil is None:
+            return None
+        return psutil.Process().memory_info().rss / 1024 / 1024
+
+    def sample(self):
+        """Odczyt obu RSS + gauge do /metrics (zapasowa przeglądarka - osobny gauge, poza progami)"""
+        browser_rss = self.browser_rss_mb()
+        python_rss = self.python_rss_mb()
+        if browser_rss is not None:
+            metrics.set_gauge('browser_rss_mb', browser_rss)
+            metrics.set_gauge('standby_browser_rss_mb', self.standby_rss_mb())
+        if python_rss is not None:
+            metrics.set_gauge('python_rss_mb', python_rss)
+        return browser_rss, python_rss
+
+    def source_started(self, source):
+        if not self._settings()['enabled']:
+            return
+        self._baseline[source] = self.sample()
+
+    def source_finished(self, source):
+        """Przypisuje przyrost RSS do źródła (gauge per source)"""
+        baseline = self._baseline.pop(source, None)
+        if baseline is None:
+            return
+        browser_rss, python_rss = self.sample()
+        browser_before, python_before = baseline
+
+        if browser_rss is not None and browser_before is not None:
+            delta = browser_rss - browser_before
+            # Ujemne przyrosty (zamknięte karty) zmniejszają licznik, ale nie poniżej zera
+            self._growth[source] = max(self._growth.get(source, 0) + delta, 0)
+            metrics.set_gauge('source_browser_rss_delta_mb', delta, source=source)
+            metrics.set_gauge('source_context_growth_mb', self._growth[source], source=source)
+        if python_rss is not None and python_before is not None:
+            metrics.set_gauge('source_python_rss_delta_mb', python_rss - python_before, source=source)
+
+    async def check(self):
+        """
+        Wołane po cyklu, gdy żadne źródło nie używa contextów.
+        Zwraca listę wykonanych akcji (do logów / testów).
+        """
+        settings = self._settings()
+        if not settings['enabled']:
+            return []
+
+        actions = []
+        browser_rss, python_rss = self.sample()
+        if browser_rss is None and not self._warned:
+            logger.warning("⚠️ [MEMORY] Brak psutil - watchdog pamięci nieaktywny")
+            self._warned = True
+
+        if browser_rss is not None:
+            logger.info(
+                f"💾 [MEMORY] RSS przeglądarki: {browser_rss:.0f}MB / {settings['browser_max_rss_mb']}MB, "
+                f"Python: {python_rss:.0f}MB / {settings['python_max_rss_mb']}MB"
+            )
+
+        # 1. Contexty, które urosły ponad próg - tańsze niż wymiana całej przeglądarki
+        for source, growth in list(self._growth.items()):
+            if growth >= settings['context_max_growth_mb']:
+                logger.info(f"♻️ [MEMORY] Context {source} urósł o {growth:.0f}MB - tworzę nowy")
+                await self.pool.recycle_context(source)
+                self._growth[source] = 0
+                metrics.set_gauge('source_context_growth_mb', 0, source=source)
+                metrics.inc('memory_recycles', kind='context', source=source)
+                actions.append(('context', source))
+
+        # 2. Cała przeglądarka - zapasowa startuje już przy prelaunch_ratio progu
+        max_rss = settings['browser_max_rss_mb']
+        if max_rss and browser_rss is not None:
+            if browser_rss >= max_rss:
+                logger.info(f"♻️ [MEMORY] Trigger: RSS {browser_rss:.0f}MB >= {max_rss}MB")
+                self.pool.request_recycle()
+                self._growth.clear()
+                metrics.inc('memory_recycles', kind='browser')
+                actions.append(('browser', None))
+            elif browser_rss >= max_rss * settings['prelaunch_ratio']:
+                self.pool.prelaunch()
+
+        # 3. Proces Pythona - GC tylko gdy faktycznie rośnie
+        max_python = settings['python_max_rss_mb']
+        if max_python and python_rss is not None and python_rss >= max_python:
+            collected = gc.collect()
+            logger.info(
+                f"🧹 [MEMORY] RSS Pythona {python_rss:.0f}MB >= {max_python}MB - "
+                f"gc.collect() zwolnił {collected} obiektów (teraz {self.python_rss_mb():.0f}MB)"
+            )
+            metrics.inc('memory_recycles', kind='gc')
+            actions.append(('gc', None))
+
+        return actions
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger('escraper.metrics')
+
+# Granice kubełków histogramu (sekundy) - od szybkich zapytań do SQLite po 60s timeouty Playwright
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = [(k, v.replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs]
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class Metrics:
+    """
+    Rejestr metryk procesu: histogramy czasów etapów (spany), liczniki i gauge.
+    Eksport: tekst Prometheus + kroczące podsumowanie JSON (p50/p95 z ostatnich N pomiarów).
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self._histograms = {}                  # (etap, etykiety) -> [kubełki, suma, liczba]
+        self._recent = {}                      # (etap, etykiety) -> deque ostatnich pomiarów
+        self._counters = defaultdict(float)    # (nazwa, etykiety) -> wartość
+        self._gauges = {}                      # (nazwa, etykiety) -> wartość
+
+    def observe(self, stage, seconds, **labels):
+        key = (stage, _label_key(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+            self._recent[key] = deque(maxlen=self.window)
+        buckets = histogram[0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+        self._recent[key].append(seconds)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Mierzy czas bloku (działa też wokół await): with metrics.span('page_goto', source='olx'):"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def inc(self, name, value=1, **labels):
+        self._counters[(name, _label_key(labels))] += value
+
+    def set_gauge(self, name, value, **labels):
+        self._gauges[(name, _label_key(labels))] = value
+
+    def get_counter(self, name, **labels):
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def prometheus_text(self):
+        """Eksport w formacie tekstowym Prometheus"""
+        lines = []
+
+        if self._histograms:
+            lines.append('# TYPE escraper_stage_seconds histogram')
+        for (stage, label_key), (buckets, total, count) in sorted(self._histograms.items()):
+            labels = (('stage', stage),) + label_key
+            for bound, value in zip(BUCKETS, buckets):
+                lines.append(f'escraper_stage_seconds_bucket{_format_labels(labels, [("le", str(bound))])} {value}')
+            lines.append(f'escraper_stage_seconds_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'escraper_stage_seconds_sum{_format_labels(labels)} {total:.6f}')
+            lines.append(f'escraper_stage_seconds_count{_format_labels(labels)} {count}')
+
+        declared = set()
+        for (name, label_key), value in sorted(self._counters.items()):
+            if name not in declared:
+                lines.append(f'# TYPE escraper_{name}_total counter')
+                declared.add(name)
+            lines.append(f'escraper_{name}_total{_format_labels(label_key)} {value:g}')
+
+        for (name, label_key), value in sorted(self._gauges.items()):
+            if name not in declared:
+                lines.append(f'# TYPE escraper_{name} gauge')
+                declared.add(name)
+            lines.append(f'escraper_{name}{_format_labels(label_key)} {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Kroczące podsumowanie: p50/p95/max z ostatnich pomiarów każdego etapu"""
+        stages = []
+        for (stage, label_key), recent in sorted(self._recent.items()):
+            values = sorted(recent)
+            buckets, total, count = self._histograms[(stage, label_key)]
+            stages.append({
+                'stage': stage,
+                'labels': dict(label_key),
+                'count': count,
+                'total_seconds': round(total, 3),
+                'p50': round(_percentile(values, 0.5), 3),
+                'p95': round(_percentile(values, 0.95), 3),
+                'max': round(values[-1], 3) if values else 0.0
+            })
+        return {
+            'generated_at': time.time(),
+            'stages': stages,
+            'counters': [
+                {'name': name, 'labels': dict(label_key), 'value': value}
+                for (name, label_key), value in sorted(self._counters.items())
+            ],
+            'gauges': [
+                {'name': name, 'labels': dict(label_key), 'value': value}
+                for (name, label_key), value in sorted(self._gauges.items())
+            ]
+        }
+
+    def write_summary(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+
+# Globalny rejestr procesu (jak logger) - scrapery importują go bezpośrednio
+metrics = Metrics()
+
+
+async def _handle_request(reader, writer):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Reszta nagłówków nie jest potrzebna
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+            pass
+        parts = request_line.decode('latin-1').split()
+        path = parts[1] if len(parts) > 1 else '/'
+
+        if path.startswith('/metrics.json'):
+            body = json.dumps(metrics.summary(), ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json'
+            status = '200 OK'
+        elif path.startswith('/metrics'):
+            body = metrics.prometheus_text().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4'
+            status = '200 OK'
+        else:
+            body = b'not found\n'
+            content_type = 'text/plain'
+            status = '404 Not Found'
+
+        writer.write(
+            f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.debug(f"🔍 [METRICS] Błąd obsługi zapytania: {e}")
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host='0.0.0.0', port=9100):
+    """Endpoint HTTP: /metrics (Prometheus) i /metrics.json (podsumowanie)"""
+    server = await asyncio.start_server(_handle_request, host, port)
+    logger.info(f"📊 [METRICS] Endpoint metryk: http://{host}:{port}/metrics")
+    return server
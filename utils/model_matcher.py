@@ -0,0 +1,113 @@
+import re
+
+# Wykrywanie modelu iPhone: drzewo (trie) po tokenach budowane raz na wczytanie configu,
+# najdłuższe dopasowanie od lewej - "15 pro max" wygrywa z "15 pro" niezależnie od kolejności w configu.
+
+TOKEN_RE = re.compile(r'\d+|[^\W\d_]+|\+')
+CAPACITY_UNITS = frozenset({'gb', 'tb'})
+NOISE_TOKENS = frozenset({'iphone', 'apple'})
+# Token zaraz po dopasowaniu, który oznacza inny wariant ("13 mini" to nie "13", "13 pro max" to nie "13 pro")
+VARIANT_TOKENS = frozenset({'pro', 'max', 'plus', 'mini'})
+
+# Skróty z ogłoszeń -> tokeny nazw z configu (models.aliases w config.yaml dopisuje własne)
+DEFAULT_ALIASES = {
+    'pm': 'pro max',
+    'promax': 'pro max',
+    '+': 'plus',
+    'se 1': 'se 2016',
+    'se 2': 'se 2020',
+    'se 3': 'se 2022'
+}
+
+
+def tokenize(text):
+    """Tekst -> tokeny bez "iphone"/"apple" i bez pojemności ("128gb", "1 TB")"""
+    raw = TOKEN_RE.findall((text or "").lower())
+    tokens = []
+    i = 0
+    while i < len(raw):
+        token = raw[i]
+        if token.isdigit() and i + 1 < len(raw) and raw[i + 1] in CAPACITY_UNITS:
+            i += 2
+            continue
+        if token not in NOISE_TOKENS:
+            tokens.append(token)
+        i += 1
+    return tokens
+
+
+class ModelMatcher:
+    """
+    Trie po tokenach dla modeli włączonych i wykluczonych.
+
+    Args:
+        enabled: nazwy modeli z models.enabled (zwracane w tej postaci)
+        excluded: models.excluded - dopasowanie wykluczonego modelu daje None
+        aliases: dodatkowe skróty (tekst -> tekst), dopisywane do DEFAULT_ALIASES
+    """
+
+    def __init__(self, enabled, excluded=(), aliases=None):
+        merged = dict(DEFAULT_ALIASES)
+        merged.update(aliases or {})
+        self._aliases = {tuple(TOKEN_RE.findall(k.lower())): TOKEN_RE.findall(v.lower()) for k, v in merged.items()}
+        self._alias_len = max((len(key) for key in self._aliases), default=0)
+
+        self._root = {}
+        # Najpierw wykluczone - model na obu listach zostaje wykluczony
+        for model in excluded:
+            self._insert(model, excluded=True)
+        for model in enabled:
+            self._insert(model, excluded=False)
+
+    def _expand(self, tokens):
+        """Podmienia skróty na tokeny nazw (najdłuższy skrót od lewej)"""
+        if not self._aliases:
+            return tokens
+        expanded = []
+        i = 0
+        while i < len(tokens):
+            for length in range(min(self._alias_len, len(tokens) - i), 0, -1):
+                replacement = self._aliases.get(tuple(tokens[i:i + length]))
+                if replacement is not None:
+                    expanded.extend(replacement)
+                    i += length
+                    break
+            else:
+                expanded.append(tokens[i])
+                i += 1
+        return expanded
+
+    def _insert(self, model, excluded):
+        tokens = self._expand(tokenize(model))
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(None, (model, excluded))
+
+    def match(self, text):
+        """Model z tekstu (najdłuższe dopasowanie od lewej) albo None (brak / model wykluczony)"""
+        tokens = self._expand(tokenize(text))
+        n = len(tokens)
+        for start in range(n):
+            node = self._root
+            found = None
+            end = start
+            while end < n and tokens[end] in node:
+                node = node[tokens[end]]
+                end += 1
+                if None in node:
+                    found = (node[None], end)
+            if found is None:
+                continue
+            (model, excluded), end = found
+            if end < n and tokens[end] in VARIANT_TOKENS:
+                # Dłuższy wariant spoza list (np. "13 mini" przy samym "13") - nie zgadujemy
+                continue
+            return None if excluded else model
+        return None
+
+    def match_many(self, texts):
+        """Wsadowo: lista tytułów -> lista modeli (None gdy brak)"""
+        return [self.match(text) for text in texts]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+
+import discord
+
+logger = logging.getLogger('escraper.outputs')
+
+
+class LogOutput:
+    """Wyjście tylko do logów (np. do testów workera bez Discorda)"""
+
+    async def send(self, content=None, *, embed=None):
+        if embed is not None:
+            logger.info(f"📤 [OUTPUT] {embed.title} | {embed.url}")
+        if content:
+            logger.info(f"📤 [OUTPUT] {content}")
+
+
+class JsonlOutput:
+    """
+    Zapisuje wiadomości do pliku JSONL w katalogu outbox (jeden plik na workera).
+    Proces bota dostarcza je na Discord przez SpoolRelay.
+    """
+
+    def __init__(self, outbox_dir='outbox', worker_id='worker'):
+        os.makedirs(outbox_dir, exist_ok=True)
+        self.path = os.path.join(outbox_dir, f"{worker_id}.jsonl")
+
+    async def send(self, content=None, *, embed=None):
+        record = {
+            'created_at': datetime.now().isoformat(),
+            'content': content,
+            'embed': embed.to_dict() if embed is not None else None
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class WebhookOutput:
+    """Wysyła bezpośrednio przez Discord webhook (bez połączenia z gateway)"""
+
+    def __init__(self, webhook_url):
+        self.webhook_url = webhook_url
+        self._session = None
+        self._webhook = None
+
+    async def send(self, content=None, *, embed=None):
+        if self._webhook is None:
+            import aiohttp
+            self._session = aiohttp.ClientSession()
+            self._webhook = discord.Webhook.from_url(self.webhook_url, session=self._session)
+        kwargs = {'embed': embed} if embed is not None else {}
+        await self._webhook.send(content=content, **kwargs)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+def create_output(kind, outbox_dir='outbox', worker_id='worker'):
+    """Tworzy wyjście workera na podstawie nazwy: jsonl / webhook / log"""
+    if kind == 'jsonl':
+        return JsonlOutput(outbox_dir, worker_id)
+    if kind == 'webhook':
+        webhook_url = os.getenv('DISCORD_WEBHOOK_URL')
+        if not webhook_url:
+            raise ValueError("Brak DISCORD_WEBHOOK_URL w .env")
+        return WebhookOutput(webhook_url)
+    if kind == 'log':
+        return LogOutput()
+    raise ValueError(f"Nieznane wyjście workera: {kind}")
+
+
+class SpoolRelay:
+    """
+    Strona bota: czyta pliki JSONL z outbox (od zapamiętanego offsetu)
+    i dostarcza wiadomości na kanał Discord.
+    """
+
+    def __init__(self, outbox_dir, channel, poll_seconds=2):
+        self.outbox_dir = outbox_dir
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+
+    def _read_offset(self, path):
+        try:
+            with open(path + '.offset', 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, path, offset):
+        with open(path + '.offset', 'w') as f:
+            f.write(str(offset))
+
+    async def _deliver_file(self, path):
+        offset = self._read_offset(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            f.seek(offset)
+            while True:
+                line = f.readline()
+                # Niepełna linia - worker jeszcze pisze, wrócimy w następnym przebiegu
+                if not line or not line.endswith('\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                    embed = discord.Embed.from_dict(record['embed']) if record.get('embed') else None
+                except Exception as e:
+                    # Uszkodzony wpis nie da się dostarczyć nigdy - pomijamy go
+                    logger.error(f"❌ [RELAY] Nieczytelna wiadomość w {path}: {e}")
+                else:
+                    try:
+                        await self.channel.send(content=record.get('content'), embed=embed)
+                    except Exception as e:
+                        # Offset zostaje przed tą wiadomością - ponowimy w następnym przebiegu
+                        logger.error(f"❌ [RELAY] Błąd dostarczania wiadomości: {e}")
+                        break
+                offset = f.tell()
+                self._write_offset(path, offset)
+
+    async def run(self):
+        logger.info(f"📬 [RELAY] Dostarczam wiadomości z {self.outbox_dir}")
+        while True:
+            try:
+                if os.path.isdir(self.outbox_dir):
+                    for name in sorted(os.listdir(self.outbox_dir)):
+                        if name.endswith('.jsonl'):
+                            await self._deliver_file(os.path.join(self.outbox_dir, name))
+            except Exception as e:
+                logger.error(f"❌ [RELAY] Błąd: {e}")
+            await asyncio.sleep(self.poll_seconds)
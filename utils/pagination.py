@@ -0,0 +1,126 @@
+import hashlib
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.pagination')
+
+
+def page_url(url, page_num, param='page'):
+    """URL kolejnej strony wyników (strona 1 = URL bez zmian)"""
+    if page_num <= 1:
+        return url
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != param]
+    query.append((param, str(page_num)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class WatermarkWalk:
+    """
+    Przejście listy wyników (od najnowszych) do znacznika z poprzedniego skanu.
+    Znacznik to kilka ID najnowszych ogłoszeń (odporny na usunięcie pojedynczego ogłoszenia);
+    promowane karty są pomijane przy wyznaczaniu i sprawdzaniu znacznika, bo wiszą na górze każdej strony.
+    Zimny start (brak znacznika) = tylko pierwsza strona.
+
+    Użycie:
+        walk = WatermarkWalk(db, 'olx', url, max_pages=5)
+        page_num = 1
+        while walk.more:
+            walk.add(await fetch(page_num))   # pozycje z kluczem 'listing_id' (+ opcjonalnie 'promoted')
+            page_num += 1
+        ... przetwarzanie walk.listings ...
+        walk.finish()
+    """
+
+    def __init__(self, db, source, query, max_pages, keep=5):
+        self.db = db
+        self.source = source
+        self.query = query
+        self.keep = keep
+        self.previous = db.get_watermark(source, query)
+        self._known = set(self.previous)
+        self.max_pages = max(1, max_pages) if self._known else 1
+        self.listings = []
+        self.pages = 0
+        self.reached = False
+        self.exhausted = False
+        self._ids = set()
+        self._newest = []
+        # Wszystkie niepromowane karty pobranych stron (także poniżej znacznika): ID -> cena, od najnowszej
+        self.visible = {}
+
+    @property
+    def more(self):
+        return not (self.reached or self.exhausted) and self.pages < self.max_pages
+
+    def add(self, batch):
+        """Dokłada kolejną stronę; zwraca pozycje nowsze od znacznika (bez powtórek z poprzednich stron)"""
+        self.pages += 1
+        if not batch:
+            self.exhausted = True
+            return []
+
+        for item in batch:
+            if item.get('listing_id') and not item.get('promoted'):
+                self.visible.setdefault(item['listing_id'], item.get('price'))
+
+        fresh = []
+        for item in batch:
+            listing_id = item.get('listing_id')
+            if listing_id and listing_id in self._ids:
+                continue  # ogłoszenie przesunięte na kolejną stronę przez nowe wpisy
+            if not item.get('promoted') and listing_id:
+                if listing_id in self._known:
+                    self.reached = True
+                    break
+                if len(self._newest) < self.keep:
+                    self._newest.append(listing_id)
+            if listing_id:
+                self._ids.add(listing_id)
+            fresh.append(item)
+        self.listings.extend(fresh)
+        return fresh
+
+    def finish(self):
+        """Zapisuje nowy znacznik (po przetworzeniu) i metryki głębokości przejścia"""
+        metrics.inc('pages_walked', self.pages, source=self.source)
+        if self._known and not self.reached and not self.exhausted:
+            metrics.inc('watermark_depth_capped', source=self.source)
+            logger.warning(
+                f"⚠️ [PAGINATION] {self.source}: znacznik nie osiągnięty po {self.pages} stronach "
+                f"- starsze ogłoszenia poza limitem"
+            )
+        else:
+            logger.debug(f"🔍 [PAGINATION] {self.source}: {len(self.listings)} nowych z {self.pages} stron")
+
+        if self._newest:
+            newest = self._newest + [i for i in self.previous if i not in self._newest]
+            self.db.set_watermark(self.source, self.query, newest[:self.keep])
+
+
+class PageFingerprints:
+    """
+    Odcisk pierwszej strony wyników: uporządkowane pary (ID, cena) per zapytanie.
+    Ten sam odcisk co w poprzednim udanym cyklu = strona bez zmian, cały skan można pominąć.
+    Cena jest w odcisku, bo zmiana ceny to dla filter_seen nowe ogłoszenie.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._last = {}
+
+    @staticmethod
+    def _digest(pairs):
+        joined = '\n'.join(f"{listing_id}:{price}" for listing_id, price in pairs)
+        return hashlib.blake2b(joined.encode('utf-8'), digest_size=16).digest()
+
+    def unchanged(self, query, pairs):
+        same = self._last.get(query) == self._digest(pairs)
+        metrics.inc('page_fingerprint', source=self.source, result='unchanged' if same else 'changed')
+        return same
+
+    def remember(self, query, pairs):
+        """Zapamiętuje odcisk dopiero po przetworzeniu strony (przerwany skan nie zostanie pominięty)"""
+        self._last[query] = self._digest(pairs)
@@ -0,0 +1,388 @@
+# Skojarzenie o maksymalnej wadze w grafie ogólnym (algorytm kwiatów Edmondsa, wersja ważona wg Galila, O(n^3)).
+# Wierzchołki = oferty, krawędzie = opłacalne pary, waga = zysk pary (int). Wynik: zbiór par bez wspólnych ofert
+# o największej sumie wag. Struktura za implementacją mwmatching.py J. van Rantwijka (domena publiczna);
+# przy wagach całkowitych wszystkie zmienne dualne zostają całkowite (slack liczony z 2 * waga).
+
+
+def max_weight_matching(edges, nvertex=None):
+    """
+    Args:
+        edges: lista (i, j, waga) - i, j to indeksy wierzchołków 0..n-1, waga int > 0
+        nvertex: liczba wierzchołków (domyślnie max indeks + 1)
+
+    Returns:
+        list: mate[v] = wierzchołek skojarzony z v albo -1
+    """
+    if nvertex is None:
+        nvertex = max((max(i, j) + 1 for i, j, _ in edges), default=0)
+    if not edges:
+        return [-1] * nvertex
+
+    nedge = len(edges)
+    maxweight = max(0, max(wt for _, _, wt in edges))
+
+    # Końce krawędzi: endpoint[2k] = i, endpoint[2k+1] = j; p ^ 1 to drugi koniec tej samej krawędzi
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * nedge)]
+    neighbend = [[] for _ in range(nvertex)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    # mate[v] = koniec krawędzi skojarzenia prowadzący do partnera (na końcu zamieniany na wierzchołek)
+    mate = [-1] * nvertex
+    # Etykiety wierzchołków i kwiatów (indeksy >= nvertex): 0 brak, 1 = S, 2 = T; bit 4 - znacznik w scan_blossom
+    label = [0] * (2 * nvertex)
+    labelend = [-1] * (2 * nvertex)
+    inblossom = list(range(nvertex))
+    blossomparent = [-1] * (2 * nvertex)
+    blossomchilds = [None] * (2 * nvertex)
+    blossombase = list(range(nvertex)) + [-1] * nvertex
+    blossomendps = [None] * (2 * nvertex)
+    bestedge = [-1] * (2 * nvertex)
+    blossombestedges = [None] * (2 * nvertex)
+    unusedblossoms = list(range(nvertex, 2 * nvertex))
+    dualvar = [maxweight] * nvertex + [0] * nvertex
+    allowedge = [False] * nedge
+    queue = []
+
+    weights2 = [2 * wt for _, _, wt in edges]
+    # Liście (wierzchołki) każdego kwiatu w kolejności dzieci - liczone przy tworzeniu i obrocie kwiatu
+    leaves = [[v] for v in range(nvertex)] + [None] * nvertex
+
+    def slack(k):
+        return dualvar[endpoint[2 * k]] + dualvar[endpoint[2 * k + 1]] - weights2[k]
+
+    def assign_label(w, t, p):
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(leaves[b])
+        else:
+            # T-kwiat: jego baza jest skojarzona, partner bazy dostaje S
+            base = blossombase[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        """Wspólny przodek v i w w lesie (baza nowego kwiatu) albo -1 (ścieżka powiększająca)"""
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        leaves[b] = [v for t in path for v in leaves[t]]
+        for v in leaves[b]:
+            if label[inblossom[v]] == 2:
+                # Dawne T-wierzchołki stają się S - do skanowania
+                queue.append(v)
+            inblossom[v] = b
+
+        # Najlepsze krawędzie do innych S-kwiatów (dla kroku dualnego typu 3)
+        bestedgeto = [-1] * (2 * nvertex)
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]] for v in leaves[bv]]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    i, j, _ = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if bj != b and label[bj] == 1 and (bestedgeto[bj] == -1 or slack(k) < slack(bestedgeto[bj])):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [k for k in bestedgeto if k != -1]
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(k) < slack(bestedge[b]):
+                bestedge[b] = k
+
+    def expand_blossom(b, endstage):
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in leaves[s]:
+                    inblossom[v] = s
+
+        if not endstage and label[b] == 2:
+            # Rozwinięty T-kwiat: ścieżka parzysta od wejścia do bazy zostaje w lesie z naprzemiennymi etykietami
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                jstep = -1
+                endptrick = 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            # Pozostałe dzieci: poza lasem, chyba że któryś liść był już osiągnięty krawędzią z S
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                reached = next((v for v in leaves[bv] if label[v] != 0), None)
+                if reached is not None:
+                    label[reached] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(reached, 2, labelend[reached])
+                j += jstep
+
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = leaves[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b, v):
+        """Zamiana skojarzenia wzdłuż ścieżki w kwiecie b od v do bazy; v zostaje nową bazą"""
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+        leaves[b] = [v for t in blossomchilds[b] for v in leaves[t]]
+
+    def augment_matching(k):
+        """Powiększa skojarzenie ścieżką przez krawędź k między dwoma S-wierzchołkami"""
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    # Korzeń drzewa (wolny wierzchołek)
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in range(nvertex):
+        # Etap: budowa lasu od wolnych wierzchołków aż do ścieżki powiększającej albo optimum dualnego
+        label[:] = [0] * (2 * nvertex)
+        bestedge[:] = [-1] * (2 * nvertex)
+        blossombestedges[nvertex:] = [None] * nvertex
+        allowedge[:] = [False] * nedge
+        queue[:] = []
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = dualvar[v] + dualvar[w] - weights2[k]
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+            if augmented:
+                break
+
+            # Krok dualny: najmniejsza zmiana, która odblokuje krawędź albo rozwinie kwiat
+            deltatype = 1
+            delta = min(dualvar[:nvertex])
+            deltaedge = deltablossom = None
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if d < delta:
+                        delta, deltatype, deltaedge = d, 2, bestedge[v]
+            for b in range(2 * nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if d < delta:
+                        delta, deltatype, deltaedge = d, 3, bestedge[b]
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2 and dualvar[b] < delta:
+                    delta, deltatype, deltablossom = dualvar[b], 4, b
+
+            for v in range(nvertex):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                # Duale wierzchołków S doszły do zera - skojarzenie jest optymalne
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            else:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+        # Koniec etapu: rozwiń S-kwiaty z zerowym dualem
+        for b in range(nvertex, 2 * nvertex):
+            if blossomparent[b] == -1 and blossombase[b] >= 0 and label[b] == 1 and dualvar[b] == 0:
+                expand_blossom(b, True)
+
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
+
+
+def matched_pairs(edges, nvertex=None):
+    """Skojarzone krawędzie jako indeksy w `edges` (krawędź o największej wadze przy dublach tej samej pary)"""
+    mate = max_weight_matching(edges, nvertex)
+    chosen = {}
+    for k, (i, j, wt) in enumerate(edges):
+        pair = (min(i, j), max(i, j))
+        if mate[i] == j and (pair not in chosen or wt > edges[chosen[pair]][2]):
+            chosen[pair] = k
+    return sorted(chosen.values())
+
+
+def connected_component(edges, start):
+    """Wierzchołki osiągalne ze `start` (skojarzenie optymalne liczy się osobno dla każdej składowej)"""
+    neighbours = {}
+    for i, j, *_ in edges:
+        neighbours.setdefault(i, []).append(j)
+        neighbours.setdefault(j, []).append(i)
+    seen = {start}
+    stack = [start]
+    while stack:
+        for w in neighbours.get(stack.pop(), ()):
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return seen
@@ -0,0 +1,100 @@
+import re
+
+# Jeden parser cen dla wszystkich źródeł: wzorce kompilowane raz przy imporcie, polskie formaty liczb
+# ("1 200 zł", "1.200,00", "1200,-", "1,2k", "1,5 tys."), flagi negocjacji i zamiany.
+
+# Liczba: grupy tysięcy (spacja / twarda spacja / kropka) z groszami po przecinku albo zwykła liczba z częścią ułamkową.
+# Nie zaczyna się w środku słowa/liczby ani zaraz po "iPhone" ("iPhone 13 900 zł" to 900, nie 13900).
+_NUMBER = (
+    r'(?<![\w.,])(?<!iphone\s)'
+    r'(?P<number>\d{1,3}(?:[ \u00a0\u202f.]\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d+)?)(?![.,]?\d)'
+)
+_MULTIPLIER = r'\s*(?P<multiplier>k\b|tys\w*\.?)'
+# Liczba tuż przed jednostką to pojemność / bateria / okres, nie cena
+_NOT_UNIT = r'(?!\s*(?:gb|tb|mah|%|szt|mies|lat|dni|h\b))'
+
+# Kolejność = priorytet: z walutą (albo "1200,-"), po słowie "cena", z mnożnikiem, goła liczba (tylko pola ceny)
+CURRENCY_RE = re.compile(_NUMBER + rf'(?:{_MULTIPLIER})?(?:\s*(?:,-|\.-)?\s*(?:zł|zl|pln)|[.,]-)', re.IGNORECASE)
+LABEL_RE = re.compile(r'\bcen[aęy]\w*\s*[:=\-]?\s*' + _NUMBER + rf'(?:{_MULTIPLIER})?' + _NOT_UNIT, re.IGNORECASE)
+# "1,2k" tylko z częścią ułamkową (samo "4k" to zwykle rozdzielczość nagrywania)
+THOUSANDS_RE = re.compile(r'(?<![\w.,])(?P<number>\d+[.,]\d+)\s*(?P<multiplier>k)\b', re.IGNORECASE)
+TYS_RE = re.compile(_NUMBER + r'\s*(?P<multiplier>tys\w*\.?)', re.IGNORECASE)
+# Goła liczba (bez waluty / słowa "cena") dopiero od 3 cyfr - "Apple 11 pro", "bateria 85 procent" to nie ceny
+BARE_RE = re.compile(r'(?=\d{3}|\d{1,3}[ \u00a0\u202f.]\d{3})' + _NUMBER + _NOT_UNIT, re.IGNORECASE)
+
+STRICT_PATTERNS = (CURRENCY_RE, LABEL_RE, THOUSANDS_RE, TYS_RE)
+FIELD_PATTERNS = STRICT_PATTERNS + (BARE_RE,)
+
+NEGOTIABLE_RE = re.compile(r'negocj|\bdo neg\b|\bnego\b|\bdo (?:dogadania|ugadania)\b', re.IGNORECASE)
+EXCHANGE_RE = re.compile(r'zamian|zamieni|\bswap\b|\bwymieni[eę] na\b', re.IGNORECASE)
+_SPACES_RE = re.compile(r'[ \u00a0\u202f]')
+
+
+def _to_int(number, multiplier=None):
+    """'1 200,50' / '1.200' / '1,2' (+ mnożnik tysięcy) -> int (grosze obcięte), None gdy format niejasny"""
+    raw = _SPACES_RE.sub('', number)
+    if ',' in raw and '.' in raw:
+        # 1.200,00 - kropka tysiące, przecinek grosze
+        raw = raw.replace('.', '').replace(',', '.')
+    else:
+        for separator in (',', '.'):
+            if separator not in raw:
+                continue
+            parts = raw.split(separator)
+            if not multiplier and all(len(part) == 3 for part in parts[1:]):
+                raw = ''.join(parts)            # 1,200 / 1.200 - separator tysięcy
+            elif len(parts) == 2:
+                raw = '.'.join(parts)           # 1,5 / 1.5 - część ułamkowa
+            else:
+                return None
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    if multiplier:
+        value *= 1000
+    return int(value)
+
+
+def parse_price(text, strict=True):
+    """
+    Cena z tekstu ogłoszenia.
+
+    Args:
+        text: treść (post FB, opis) albo pole ceny z karty
+        strict: True dla wolnego tekstu - liczba musi mieć walutę, słowo "cena" albo mnożnik (1,2k / 2 tys.);
+                False dla pól ceny - wystarczy sama liczba
+
+    Returns:
+        dict: {'value': int albo None, 'negotiable': bool, 'exchange': bool, 'match': dopasowany fragment}
+    """
+    text = text or ""
+    value = None
+    matched = None
+    for pattern in (STRICT_PATTERNS if strict else FIELD_PATTERNS):
+        for match in pattern.finditer(text):
+            groups = match.groupdict()
+            number = groups['number']
+            value = _to_int(number, groups.get('multiplier'))
+            if value is not None:
+                matched = match.group(0).strip()
+                break
+        if value is not None:
+            break
+
+    return {
+        'value': value,
+        'negotiable': bool(NEGOTIABLE_RE.search(text)),
+        'exchange': bool(EXCHANGE_RE.search(text)),
+        'match': matched
+    }
+
+
+def parse_prices(texts, strict=True):
+    """Wsadowo: lista tekstów -> lista wyników parse_price (jedno wywołanie na stronę wyników)"""
+    return [parse_price(text, strict) for text in texts]
+
+
+def price_value(text, strict=True):
+    """Sama wartość ceny (int) albo None"""
+    return parse_price(text, strict)['value']
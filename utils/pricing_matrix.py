@@ -0,0 +1,94 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Kolumny macierzy cennika (wiersz = model z sekcji pricing:)
+PRICE_FIELDS = ('buy_max_working', 'buy_max_broken', 'buy_max_locked',
+                'repair_cost', 'unlock_cost', 'market_price', 'min_profit')
+BUY_WORKING, BUY_BROKEN, BUY_LOCKED, REPAIR, UNLOCK, MARKET, MIN_PROFIT = range(len(PRICE_FIELDS))
+
+# Stan -> kolumna limitu zakupu (części liczą się jak uszkodzony)
+CONDITION_CODES = {'working': 0, 'broken': 1, 'parts': 1, 'locked': 2}
+
+
+class PricingMatrix:
+    """
+    Cennik jako macierz int (model x pole) budowana raz na wczytanie configu.
+    evaluate() liczy limity, koszty, zysk i marżę dla całej listy ofert naraz -
+    wektorowo przez NumPy, a bez NumPy tą samą formułą w pętli.
+    """
+
+    def __init__(self, pricing):
+        self.models = tuple(pricing)
+        self.index = {model: i for i, model in enumerate(self.models)}
+        self.rows = [
+            tuple(int(round(prices.get(field) or 0)) for field in PRICE_FIELDS)
+            for prices in pricing.values()
+        ]
+        self.table = None
+        if np is not None and self.rows:
+            self.table = np.array(self.rows, dtype=np.int64)
+
+    def row(self, model):
+        """Indeks wiersza modelu albo None (brak cennika)"""
+        return self.index.get(model.lower().strip()) if model else None
+
+    def evaluate(self, rows, conditions, prices):
+        """
+        Args:
+            rows: indeksy wierszy (row()) - po jednym na ofertę
+            conditions: stany ofert ('working' / 'broken' / 'parts' / 'locked')
+            prices: ceny ofert (float zaokrąglane do pełnych złotych, jak cennik)
+
+        Returns:
+            dict kolumn (listy długości len(rows)): max_buy_price, repair_cost, total_cost,
+            market_price, potential_profit, profit_margin, min_profit, is_profitable
+        """
+        codes = [CONDITION_CODES.get(c, 0) for c in conditions]
+        if self.table is None:
+            return self._evaluate_python(rows, codes, prices)
+
+        table = self.table[np.asarray(rows, dtype=np.intp)]
+        codes = np.asarray(codes, dtype=np.intp)
+        prices = np.rint(np.asarray(prices, dtype=np.float64)).astype(np.int64)
+
+        # Limit zakupu: kolumna 0/1/2 wg stanu; naprawa: 0 / repair_cost / unlock_cost
+        max_buy = np.take_along_axis(table[:, BUY_WORKING:BUY_LOCKED + 1], codes[:, None], axis=1)[:, 0]
+        repair = np.select([codes == 1, codes == 2], [table[:, REPAIR], table[:, UNLOCK]], 0)
+        total = prices + repair
+        market = table[:, MARKET]
+        profit = market - total
+        margin = np.divide(profit * 100.0, market, out=np.zeros(len(rows)), where=market > 0)
+        profitable = (prices <= max_buy) & (profit >= table[:, MIN_PROFIT])
+        return {
+            'max_buy_price': max_buy.tolist(),
+            'repair_cost': repair.tolist(),
+            'total_cost': total.tolist(),
+            'market_price': market.tolist(),
+            'potential_profit': profit.tolist(),
+            'profit_margin': margin.tolist(),
+            'min_profit': table[:, MIN_PROFIT].tolist(),
+            'is_profitable': profitable.tolist()
+        }
+
+    def _evaluate_python(self, rows, codes, prices):
+        columns = {key: [] for key in ('max_buy_price', 'repair_cost', 'total_cost', 'market_price',
+                                       'potential_profit', 'profit_margin', 'min_profit', 'is_profitable')}
+        for row, code, price in zip(rows, codes, prices):
+            price = int(round(price))
+            prices_row = self.rows[row]
+            max_buy = prices_row[BUY_WORKING + code]
+            repair = (0, prices_row[REPAIR], prices_row[UNLOCK])[code]
+            total = price + repair
+            market = prices_row[MARKET]
+            profit = market - total
+            columns['max_buy_price'].append(max_buy)
+            columns['repair_cost'].append(repair)
+            columns['total_cost'].append(total)
+            columns['market_price'].append(market)
+            columns['potential_profit'].append(profit)
+            columns['profit_margin'].append(profit * 100.0 / market if market > 0 else 0.0)
+            columns['min_profit'].append(prices_row[MIN_PROFIT])
+            columns['is_profitable'].append(price <= max_buy and profit >= prices_row[MIN_PROFIT])
+        return columns
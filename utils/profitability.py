@@ -1,79 +1,64 @@
 import re
 import logging
 
+from utils.pair_matching import matched_pairs
+
 logger = logging.getLogger('escraper.profitability')
 
+
+def _recommendation(result):
+    """Tekst oceny oferty (formatowany dopiero gdy ktoś go odczyta)"""
+    profit = result['potential_profit']
+    min_profit = result['min_profit']
+    if result['is_profitable']:
+        if profit >= min_profit * 2:
+            return f"🔥 SUPER OKAZJA! Zysk: {profit}zł ({result['profit_margin']:.1f}%)"
+        return f"✅ Opłacalne. Zysk: {profit}zł ({result['profit_margin']:.1f}%)"
+    if result['buy_price'] > result['max_buy_price']:
+        return f"❌ Za drogie. Max: {result['max_buy_price']}zł (jest: {result['buy_price']}zł)"
+    return f"⚠️ Mały zysk. Tylko {profit}zł (min: {min_profit}zł)"
+
+
+class ProfitResult(dict):
+    """Wynik kalkulacji (zwykły dict); 'recommendation' liczona leniwie przy pierwszym odczycie"""
+
+    def __missing__(self, key):
+        if key != 'recommendation':
+            raise KeyError(key)
+        self[key] = _recommendation(self)
+        return self[key]
+
+    def get(self, key, default=None):
+        if key == 'recommendation' and key not in self:
+            return self[key]
+        return super().get(key, default)
+
+
 class ProfitabilityCalculator:
     def __init__(self, config_loader):
         self.config = config_loader
     
     def _detect_model(self, title):
         """
-        Wykrywa model iPhone z tytułu/opisu.
-        Zwraca znormalizowaną nazwę modelu.
+        Wykrywa model iPhone z tytułu/opisu (najdłuższe dopasowanie, skróty typu "14pm", bez pojemności).
+        Zwraca nazwę modelu z configu albo None (brak / model wykluczony).
         """
-        title_lower = title.lower()
-        
-        # Sprawdź wszystkie włączone modele
-        for model in self.config.get_enabled_models():
-            # Usuń "iphone" z modelu żeby łatwiej matchować
-            model_parts = model.replace("iphone", "").strip()
-            
-            if model_parts in title_lower:
-                return model
-        
-        return None
+        return self.config.get_model_matcher().match(title)
     
-    def _detect_condition(self, title, description=""):
-        """
-        Wykrywa stan urządzenia z tytułu/opisu.
-        Zwraca: 'working', 'broken', 'locked', 'parts'
-        """
-        text = (title + " " + description).lower()
-        
-        # Zablokowany iCloud
-        if any(word in text for word in ['icloud', 'zablokowany', 'locked', 'activation lock']):
-            return 'locked'
-        
-        # Na części
-        if any(word in text for word in ['na części', 'na czesci', 'parts', 'uszkodzony nie włącza']):
-            return 'parts'
-        
-        # Uszkodzony
-        if any(word in text for word in ['uszkodzony', 'pęknięty', 'rozbity', 'broken', 'cracked', 
-                                          'zbity', 'damaged', 'nie działa', 'nie włącza']):
-            return 'broken'
-        
-        # Sprawny (domyślnie)
-        return 'working'
+    def detect_models(self, titles):
+        """Modele dla listy tytułów jednym wywołaniem (jeden snapshot configu na całą listę)"""
+        return self.config.get_model_matcher().match_many(titles)
     
-    def _extract_damage_details(self, title, description=""):
+    def _tag(self, title, description=""):
         """
-        Wyciąga szczegóły uszkodzeń (ekran, obudowa, bateria, etc.)
+        Stan ('working', 'broken', 'locked', 'parts'), uszkodzone części i zaprzeczenia
+        z tytułu i opisu - jeden przebieg wspólnego taggera.
         """
-        text = (title + " " + description).lower()
-        damages = []
-        
-        if any(word in text for word in ['ekran', 'wyświetlacz', 'screen', 'display']):
-            damages.append('ekran')
-        
-        if any(word in text for word in ['obudowa', 'tył', 'plecki', 'back', 'housing']):
-            damages.append('obudowa')
-        
-        if any(word in text for word in ['bateria', 'battery', 'akumulator']):
-            damages.append('bateria')
-        
-        if any(word in text for word in ['aparat', 'camera', 'kamera']):
-            damages.append('aparat')
-        
-        if any(word in text for word in ['face id', 'faceid', 'touch id']):
-            damages.append('biometria')
-        
-        return damages
+        return self.config.get_text_tagger().tag(f"{title} {description}")
     
     def calculate(self, title, price, description=""):
         """
-        Główna funkcja kalkulująca opłacalność oferty.
+        Główna funkcja kalkulująca opłacalność oferty (jednoelementowe calculate_many).
         
         Returns:
             dict: {
@@ -90,152 +75,150 @@ class ProfitabilityCalculator:
                 'recommendation': str
             }
         """
-        # Wykryj model
-        model = self._detect_model(title)
-        if not model:
-            return {
-                'is_profitable': False,
-                'recommendation': 'Nieznany model iPhone',
-                'model': None
-            }
-        
-        # Pobierz cennik
-        pricing = self.config.get_pricing(model)
-        if not pricing:
-            return {
-                'is_profitable': False,
-                'recommendation': f'Brak cennika dla {model}',
-                'model': model
-            }
+        return self.calculate_many([(title, price, description)])[0]
+    
+    def calculate_many(self, offers):
+        """
+        Opłacalność całej strony / cyklu ofert naraz: modele i stany wsadowo,
+        limity, koszty i zysk jednym przeliczeniem na macierzy cennika.
+        Tekst rekomendacji powstaje dopiero przy odczycie (tylko dla ofert, które idą dalej).
         
-        # Wykryj stan
-        condition = self._detect_condition(title, description)
-        damages = self._extract_damage_details(title, description)
+        Args:
+            offers: lista krotek (tytuł, cena, opis)
         
-        # Pobierz odpowiednią cenę zakupu
-        if condition == 'locked':
-            max_buy_price = pricing['buy_max_locked']
-            repair_cost = pricing['unlock_cost']  # Zwykle 0 (niemożliwe)
-        elif condition == 'broken' or condition == 'parts':
-            max_buy_price = pricing['buy_max_broken']
-            repair_cost = pricing['repair_cost']
-        else:  # working
-            max_buy_price = pricing['buy_max_working']
-            repair_cost = 0
+        Returns:
+            list: wyniki w formacie calculate(), w kolejności ofert
+        """
+        offers = list(offers)
+        matrix = self.config.get_pricing_matrix()
+        models = self.detect_models([title for title, _, _ in offers])
+        
+        results = [None] * len(offers)
+        priced = []
+        for i, ((title, price, description), model) in enumerate(zip(offers, models)):
+            if not model:
+                results[i] = ProfitResult(is_profitable=False, recommendation='Nieznany model iPhone', model=None)
+                continue
+            row = matrix.row(model)
+            if row is None:
+                results[i] = ProfitResult(is_profitable=False, recommendation=f'Brak cennika dla {model}', model=model)
+                continue
+            priced.append((i, row, self._tag(title, description)))
         
-        # Oblicz koszty i zysk
-        total_cost = price + repair_cost
-        market_price = pricing['market_price']
-        potential_profit = market_price - total_cost
-        profit_margin = (potential_profit / market_price * 100) if market_price > 0 else 0
-        min_profit = pricing['min_profit']
+        if not priced:
+            return results
         
-        # Oceń opłacalność
-        is_profitable = (
-            price <= max_buy_price and 
-            potential_profit >= min_profit
+        columns = matrix.evaluate(
+            [row for _, row, _ in priced],
+            [tags['condition'] for _, _, tags in priced],
+            [offers[i][1] for i, _, _ in priced]
         )
+        for k, (i, _, tags) in enumerate(priced):
+            results[i] = ProfitResult(
+                model=models[i],
+                condition=tags['condition'],
+                damages=tags['damages'],
+                buy_price=offers[i][1],
+                market_price=columns['market_price'][k],
+                repair_cost=columns['repair_cost'][k],
+                total_cost=columns['total_cost'][k],
+                potential_profit=columns['potential_profit'][k],
+                profit_margin=columns['profit_margin'][k],
+                is_profitable=columns['is_profitable'][k],
+                max_buy_price=columns['max_buy_price'][k],
+                min_profit=columns['min_profit'][k]
+            )
+        return results
+    
+    def smart_pair(self, model, offer1, offer2, pricing=None, smart_config=None):
+        """
+        Ocena połączenia dwóch ofert tego samego modelu (2 uszkodzone = 1 sprawny).
+        Zwraca propozycję (dict) albo None gdy koszt lub zysk nie mieszczą się w progach.
+        """
+        pricing = pricing or self.config.get_pricing(model)
+        smart_config = smart_config or self.config.get_smart_matching_config()
+        if not pricing:
+            return None
         
-        # Rekomendacja
-        if is_profitable:
-            if potential_profit >= min_profit * 2:
-                recommendation = f"🔥 SUPER OKAZJA! Zysk: {potential_profit}zł ({profit_margin:.1f}%)"
-            else:
-                recommendation = f"✅ Opłacalne. Zysk: {potential_profit}zł ({profit_margin:.1f}%)"
-        else:
-            if price > max_buy_price:
-                recommendation = f"❌ Za drogie. Max: {max_buy_price}zł (jest: {price}zł)"
-            else:
-                recommendation = f"⚠️ Mały zysk. Tylko {potential_profit}zł (min: {min_profit}zł)"
+        # Oblicz koszt połączenia
+        combined_cost = offer1['buy_price'] + offer2['buy_price'] + pricing['repair_cost']
+        market_price = pricing['market_price']
+        max_combined = market_price * smart_config['max_combined_cost']
+        if combined_cost > max_combined:
+            return None
+        
+        potential_profit = market_price - combined_cost
+        if potential_profit < smart_config['min_profit_combined']:
+            return None
+        
+        # Określ typ kombinacji
+        damages1 = set(offer1.get('damages', []))
+        damages2 = set(offer2.get('damages', []))
+        
+        combination_type = "2x uszkodzone"
+        if 'ekran' in damages1 and 'obudowa' in damages2:
+            combination_type = "ekran + obudowa"
+        elif 'obudowa' in damages1 and 'ekran' in damages2:
+            combination_type = "ekran + obudowa"
+        elif offer1['condition'] == 'locked' or offer2['condition'] == 'locked':
+            combination_type = "icloud + uszkodzony"
         
         return {
             'model': model,
-            'condition': condition,
-            'damages': damages,
-            'buy_price': price,
+            'offer1': offer1,
+            'offer2': offer2,
+            'combination_type': combination_type,
+            # Uszkodzenia się uzupełniają - każdy telefon ma sprawne to, co w drugim jest zepsute
+            'complementary': bool(damages1 and damages2 and damages1.isdisjoint(damages2)),
+            'combined_cost': combined_cost,
             'market_price': market_price,
-            'repair_cost': repair_cost,
-            'total_cost': total_cost,
             'potential_profit': potential_profit,
-            'profit_margin': profit_margin,
-            'is_profitable': is_profitable,
-            'recommendation': recommendation,
-            'max_buy_price': max_buy_price,
-            'min_profit': min_profit
+            'profit_margin': (potential_profit / market_price * 100),
+            'recommendation': f"💡 Połącz 2 oferty! Zysk: {potential_profit}zł"
         }
     
-    def find_smart_matches(self, offers_list):
+    def max_partner_price(self, model, price, pricing=None, smart_config=None):
+        """Najwyższa cena drugiej oferty, przy której połączenie z ofertą za `price` mieści się w progach"""
+        pricing = pricing or self.config.get_pricing(model)
+        smart_config = smart_config or self.config.get_smart_matching_config()
+        if not pricing:
+            return None
+        market_price = pricing['market_price']
+        by_cost = market_price * smart_config['max_combined_cost'] - pricing['repair_cost'] - price
+        by_profit = market_price - smart_config['min_profit_combined'] - pricing['repair_cost'] - price
+        return min(by_cost, by_profit)
+    
+    def pair_candidates(self, model, offers, pricing=None, smart_config=None):
         """
-        Znajduje inteligentne połączenia ofert (2 uszkodzone = 1 sprawny).
-        
-        Args:
-            offers_list: Lista ofert z kalkulacjami
-            
-        Returns:
-            list: Lista możliwych połączeń
+        Wszystkie opłacalne pary ofert jednego modelu jako (i, j, propozycja), i/j - indeksy w `offers`.
+        Oferty przeglądane od najtańszej; partnerzy drożsi niż max_partner_price są odcinani bez liczenia.
         """
-        if not self.config.is_smart_matching_enabled():
+        pricing = pricing or self.config.get_pricing(model)
+        smart_config = smart_config or self.config.get_smart_matching_config()
+        if not pricing:
             return []
         
-        matches = []
-        smart_config = self.config.get_smart_matching_config()
-        
-        # Grupuj oferty po modelu
-        by_model = {}
-        for offer in offers_list:
-            if offer.get('condition') in ['broken', 'parts', 'locked']:
-                model = offer.get('model')
-                if model:
-                    if model not in by_model:
-                        by_model[model] = []
-                    by_model[model].append(offer)
-        
-        # Szukaj możliwych kombinacji
-        for model, model_offers in by_model.items():
-            if len(model_offers) < 2:
-                continue
-            
-            pricing = self.config.get_pricing(model)
-            if not pricing:
-                continue
-            
-            # Sprawdź wszystkie pary
-            for i, offer1 in enumerate(model_offers):
-                for offer2 in model_offers[i+1:]:
-                    # Oblicz koszt połączenia
-                    combined_cost = offer1['buy_price'] + offer2['buy_price'] + pricing['repair_cost']
-                    market_price = pricing['market_price']
-                    max_combined = market_price * smart_config['max_combined_cost']
-                    
-                    if combined_cost <= max_combined:
-                        potential_profit = market_price - combined_cost
-                        
-                        if potential_profit >= smart_config['min_profit_combined']:
-                            # Określ typ kombinacji
-                            damages1 = set(offer1.get('damages', []))
-                            damages2 = set(offer2.get('damages', []))
-                            
-                            combination_type = "2x uszkodzone"
-                            if 'ekran' in damages1 and 'obudowa' in damages2:
-                                combination_type = "ekran + obudowa"
-                            elif 'obudowa' in damages1 and 'ekran' in damages2:
-                                combination_type = "ekran + obudowa"
-                            elif offer1['condition'] == 'locked' or offer2['condition'] == 'locked':
-                                combination_type = "icloud + uszkodzony"
-                            
-                            matches.append({
-                                'model': model,
-                                'offer1': offer1,
-                                'offer2': offer2,
-                                'combination_type': combination_type,
-                                'combined_cost': combined_cost,
-                                'market_price': market_price,
-                                'potential_profit': potential_profit,
-                                'profit_margin': (potential_profit / market_price * 100),
-                                'recommendation': f"💡 Połącz 2 oferty! Zysk: {potential_profit}zł"
-                            })
-        
-        # Sortuj po zyskowności
-        matches.sort(key=lambda x: x['potential_profit'], reverse=True)
-        
-        return matches
+        order = sorted(range(len(offers)), key=lambda i: offers[i]['buy_price'])
+        pairs = []
+        for position, i in enumerate(order):
+            max_price = self.max_partner_price(model, offers[i]['buy_price'], pricing, smart_config)
+            for j in order[position + 1:]:
+                if offers[j]['buy_price'] > max_price:
+                    break
+                match = self.smart_pair(model, offers[i], offers[j], pricing, smart_config)
+                if match:
+                    pairs.append((i, j, match))
+        return pairs
+    
+    def select_pairs(self, pairs, smart_config=None):
+        """
+        Tryb optimal: pary bez wspólnych ofert o największej sumie wag (skojarzenie o maksymalnej wadze).
+        Waga = zysk pary + complementary_bonus, gdy uszkodzenia się uzupełniają.
+        """
+        smart_config = smart_config or self.config.get_smart_matching_config()
+        bonus = smart_config['complementary_bonus']
+        edges = [
+            (i, j, int(match['potential_profit']) + (bonus if match['complementary'] else 0))
+            for i, j, match in pairs
+        ]
+        return [pairs[k] for k in matched_pairs(edges)]
@@ -0,0 +1,128 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger('escraper.replay')
+
+# Body w nagraniu jest już zdekodowane - nagłówki transportu nie mogą trafić do odtworzenia
+TRANSPORT_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+
+def _fixture_path(directory, method, url):
+    key = hashlib.sha256(f"{method} {url}".encode('utf-8')).hexdigest()
+    return os.path.join(directory, f"{key}.json")
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adapter requests: normalne zapytanie + zapis odpowiedzi do pliku (klucz: metoda + URL)"""
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        fixture = {
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in TRANSPORT_HEADERS},
+            'body': base64.b64encode(response.content).decode('ascii')
+        }
+        with open(_fixture_path(self.directory, request.method, request.url), 'w', encoding='utf-8') as f:
+            json.dump(fixture, f)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter requests bez sieci: odpowiedzi z nagranych plików, brak nagrania = ConnectionError"""
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    def send(self, request, **kwargs):
+        try:
+            with open(_fixture_path(self.directory, request.method, request.url), 'r', encoding='utf-8') as f:
+                fixture = json.load(f)
+        except (OSError, ValueError):
+            raise requests.ConnectionError(f"Brak nagrania dla {request.method} {request.url}", request=request)
+
+        response = requests.Response()
+        response.status_code = fixture['status']
+        response.reason = fixture.get('reason') or ''
+        response.headers = CaseInsensitiveDict(fixture['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(fixture['body'])
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class ReplayMode:
+    """
+    Nagrywanie / odtwarzanie ruchu sieciowego pełnego cyklu (bez żywych stron, Discorda i AI).
+
+    record: context każdego źródła zapisuje HAR (<katalog>/<źródło>.har, zapis przy zamknięciu contextu),
+            sesja requests (OLX HTTP) zapisuje odpowiedzi do <katalog>/http/.
+    replay: contexty odpowiadają z HAR (brak wpisu = abort, żadne żądanie nie wychodzi do sieci),
+            sesja requests czyta <katalog>/http/.
+    Oba tryby używają świeżej bazy w katalogu nagrania, więc każdy przebieg jest powtarzalny.
+    """
+
+    def __init__(self, mode, directory):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Nieznany tryb nagrania: {mode}")
+        self.mode = mode
+        self.directory = directory
+        self.http_dir = os.path.join(directory, 'http')
+        os.makedirs(self.http_dir, exist_ok=True)
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    def har_path(self, source):
+        return os.path.join(self.directory, f"{source}.har")
+
+    def database_path(self):
+        """Świeża baza dla przebiegu (stara usuwana - dedup i znaczniki nie zależą od poprzednich runów)"""
+        path = os.path.join(self.directory, f"{self.mode}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        return path
+
+    def context_options(self, source):
+        """Dodatkowe argumenty browser.new_context() dla źródła"""
+        if self.recording:
+            return {'record_har_path': self.har_path(source), 'record_har_mode': 'full'}
+        return {}
+
+    async def apply(self, context, source):
+        """W trybie replay podpina HAR źródła pod context (route ma pierwszeństwo przed ResourcePolicy)"""
+        if self.recording:
+            logger.info(f"⏺️ [REPLAY] {source}: nagrywam ruch do {self.har_path(source)}")
+            return
+        path = self.har_path(source)
+        if os.path.exists(path):
+            await context.route_from_har(path, not_found='abort')
+            logger.info(f"▶️ [REPLAY] {source}: odtwarzam {path}")
+        else:
+            await context.route("**/*", lambda route: route.abort())
+            logger.warning(f"⚠️ [REPLAY] {source}: brak {path} - wszystkie żądania przerwane")
+
+    def mount(self, session):
+        """Podmienia transport sesji requests (nagrywanie albo odtwarzanie z <katalog>/http/)"""
+        adapter = RecordingAdapter(self.http_dir) if self.recording else ReplayAdapter(self.http_dir)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
@@ -0,0 +1,81 @@
+import logging
+from urllib.parse import urlsplit
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.resources')
+
+# Szacunkowy rozmiar zablokowanego zasobu (bajty) zanim zobaczymy prawdziwe odpowiedzi tego typu
+DEFAULT_SIZES = {
+    'image': 60_000,
+    'media': 500_000,
+    'font': 40_000,
+    'stylesheet': 30_000,
+    'script': 80_000,
+    'xhr': 5_000,
+    'fetch': 5_000
+}
+
+
+class ResourcePolicy:
+    """
+    Przechwytywanie żądań na poziomie contextu (obejmuje wszystkie karty, także karty opisów):
+    blokuje typy zasobów i domeny trackerów ustawione per źródło w sekcji `resources:`.
+    Liczy bajty przepuszczone (rzeczywiste) i zablokowane (szacunek ze średniej danego typu).
+    """
+
+    def __init__(self, source, block_types=(), block_domains=()):
+        self.source = source
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(d.lower().lstrip('.') for d in block_domains)
+        self._avg_size = dict(DEFAULT_SIZES)     # typ -> średni rozmiar odpowiedzi (bajty)
+
+    @classmethod
+    def from_config(cls, config_loader, source):
+        settings = config_loader.get_resource_policy(source)
+        return cls(source, settings['block_types'], settings['block_domains'])
+
+    def _blocked_reason(self, request):
+        if request.resource_type in self.block_types:
+            return request.resource_type
+        host = (urlsplit(request.url).hostname or '').lower()
+        for domain in self.block_domains:
+            if host == domain or host.endswith('.' + domain):
+                return 'tracker'
+        return None
+
+    async def _handle(self, route):
+        request = route.request
+        reason = self._blocked_reason(request)
+        if reason is None:
+            await route.continue_()
+            return
+
+        await route.abort()
+        metrics.inc('requests_blocked', source=self.source, reason=reason)
+        metrics.inc('blocked_bytes_estimated', self._avg_size.get(request.resource_type, 10_000),
+                    source=self.source)
+
+    async def _on_request_finished(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = sizes.get('responseBodySize', 0) + sizes.get('responseHeadersSize', 0)
+        metrics.inc('requests_allowed', source=self.source)
+        metrics.inc('allowed_bytes', size, source=self.source)
+
+        # Średnia krocząca rozmiaru per typ - lepszy szacunek dla zablokowanych
+        resource_type = request.resource_type
+        previous = self._avg_size.get(resource_type)
+        self._avg_size[resource_type] = size if previous is None else previous * 0.9 + size * 0.1
+
+    async def apply(self, context):
+        """Podpina politykę pod context (route + licznik bajtów)"""
+        if self.block_types or self.block_domains:
+            await context.route("**/*", self._handle)
+        context.on("requestfinished", self._on_request_finished)
+        logger.debug(
+            f"🔍 [RESOURCES] {self.source}: blokuję typy {sorted(self.block_types)} "
+            f"i {len(self.block_domains)} domen trackerów"
+        )
@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.cache')
+
+# Nagłówki opisujące transport, nie treść (body w cache jest już zdekodowane)
+HOP_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'})
+
+
+class ResponseCache:
+    """
+    Dyskowy cache odpowiedzi stron ofert: plik na URL (sha256), TTL i limit bajtów z wyrzucaniem LRU.
+    Podpinany pod context Playwright (route na dokumenty pasujące do wzorców źródła)
+    albo używany bezpośrednio przez fetchery HTTP (fetch z sesją requests).
+    Znane ogłoszenie (podbite, po edycji ceny, po restarcie z pustą bazą) nie kosztuje zapytania sieciowego.
+
+    Format pliku: linia JSON (url, status, nagłówki, czas zapisu) + surowe body.
+    """
+
+    def __init__(self, directory, ttl_seconds, max_bytes, routes=None):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.routes = routes or {}          # źródło -> wzorce URL do cache'owania
+        self._lock = threading.Lock()
+        self._index = OrderedDict()         # klucz -> rozmiar pliku; od najdawniej używanego
+        self._bytes = 0
+        self._lookups = 0
+        self._hits = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, config_loader):
+        settings = config_loader.get_cache_config()
+        if not settings['enabled']:
+            return None
+        return cls(
+            settings['directory'],
+            settings['ttl_hours'] * 3600,
+            settings['max_mb'] * 1024 * 1024,
+            settings['routes']
+        )
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.split('#')[0].encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.entry")
+
+    def _load_index(self):
+        """Odtwarza kolejkę LRU z plików na dysku (mtime = ostatnie użycie)"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.entry'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len('.entry')], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+        metrics.set_gauge('response_cache_bytes', self._bytes)
+
+    def _record(self, result):
+        self._lookups += 1
+        if result == 'hit':
+            self._hits += 1
+        metrics.inc('response_cache', result=result)
+        metrics.set_gauge('response_cache_hit_ratio', self._hits / self._lookups)
+
+    def _discard(self, key):
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def get(self, url):
+        """Odpowiedź z cache ({'status', 'headers', 'body'}) albo None (brak / po TTL)"""
+        key = self.key(url)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            self._record('miss')
+            return None
+
+        if time.time() - header['stored_at'] > self.ttl_seconds:
+            self._discard(key)
+            self._record('expired')
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+            else:
+                # Wpis zapisany przez inny proces
+                size = os.path.getsize(path)
+                self._index[key] = size
+                self._bytes += size
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._record('hit')
+        return {'status': header['status'], 'headers': header['headers'], 'body': body}
+
+    def put(self, url, status, headers, body):
+        """Zapisuje odpowiedź 200; po przekroczeniu limitu wyrzuca najdawniej używane wpisy"""
+        if status != 200 or not body:
+            return
+        key = self.key(url)
+        header = json.dumps({
+            'url': url,
+            'status': status,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS},
+            'stored_at': time.time()
+        }).encode('utf-8') + b'\n'
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ [CACHE] Nie udało się zapisać odpowiedzi: {e}")
+            return
+
+        with self._lock:
+            self._bytes += len(header) + len(body) - self._index.pop(key, 0)
+            self._index[key] = len(header) + len(body)
+            evicted = self._evict()
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Pod lockiem: zdejmuje wpisy LRU ponad limit, zwraca klucze do usunięcia z dysku"""
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            evicted.append(key)
+        if evicted:
+            metrics.inc('response_cache_evictions', len(evicted))
+        metrics.set_gauge('response_cache_bytes', self._bytes)
+        return evicted
+
+    def fetch(self, session, url, **kwargs):
+        """GET przez sesję requests z cache (dla fetcherów HTTP); zwraca treść odpowiedzi (bytes)"""
+        cached = self.get(url)
+        if cached is not None:
+            return cached['body']
+        response = session.get(url, **kwargs)
+        response.raise_for_status()
+        self.put(url, response.status_code, dict(response.headers), response.content)
+        return response.content
+
+    async def _handle(self, route):
+        request = route.request
+        if request.method != 'GET' or request.resource_type != 'document':
+            await route.fallback()
+            return
+
+        cached = await asyncio.to_thread(self.get, request.url)
+        if cached is not None:
+            await route.fulfill(status=cached['status'], headers=cached['headers'], body=cached['body'])
+            return
+
+        response = await route.fetch()
+        body = await response.body()
+        await asyncio.to_thread(self.put, request.url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    async def apply(self, context, source):
+        """Podpina cache pod dokumenty źródła (wzorce z cache.routes); inne żądania idą dalej"""
+        patterns = self.routes.get(source) or ()
+        for pattern in patterns:
+            await context.route(pattern, self._handle)
+        if patterns:
+            logger.debug(f"🔍 [CACHE] {source}: cache dokumentów dla {list(patterns)}")
@@ -0,0 +1,137 @@
+import logging
+import random
+import time
+from datetime import datetime
+
+from utils.metrics import metrics
+
+logger = logging.getLogger('escraper.scheduler')
+
+
+class AdaptiveScheduler:
+    """
+    Osobny termin następnego skanu dla każdego źródła i każdej grupy FB.
+    Interwał skraca się gdy pojawiają się nowe oferty, wydłuża gdy strona stoi w miejscu,
+    a profil aktywności godzinowej (z timestampów ofert w bazie) skaluje go w ciągu doby.
+
+    Klucze: 'olx', 'allegro', 'facebook:notifications', 'facebook:<url grupy>'.
+    Źródło klucza (do profilu godzinowego) to część przed pierwszym ':'.
+    """
+
+    def __init__(self, config_loader, database):
+        self.config = config_loader
+        self.db = database
+        self._intervals = {}     # klucz -> bazowy interwał (s)
+        self._next_run = {}      # klucz -> time.time() następnego skanu
+        self._profiles = {}      # źródło -> 24 wagi aktywności
+        self._skip_rates = {}    # klucz -> średnia krocząca udziału cykli bez zmian na stronie
+        self._profiles_loaded_at = 0
+
+    def _settings(self):
+        return self.config.get_scheduler_config()
+
+    @property
+    def enabled(self):
+        return self._settings()['enabled']
+
+    def _initial_interval(self):
+        min_wait, max_wait = self.config.get_check_interval()
+        return random.randint(min_wait, max_wait)
+
+    def is_due(self, key, now=None):
+        if not self.enabled:
+            return True
+        now = now or time.time()
+        return self._next_run.get(key, 0) <= now
+
+    def due(self, keys):
+        """Zwraca klucze, których termin minął"""
+        now = time.time()
+        return [key for key in keys if self.is_due(key, now)]
+
+    def _refresh_profiles(self):
+        settings = self._settings()
+        if time.time() - self._profiles_loaded_at < settings['profile_refresh_minutes'] * 60:
+            return
+        self._profiles_loaded_at = time.time()
+
+        for source in ('olx', 'allegro', 'facebook'):
+            try:
+                counts = self.db.get_hourly_activity(source, days=settings['profile_days'])
+            except Exception as e:
+                logger.debug(f"🔍 [SCHEDULER] Brak profilu dla {source}: {e}")
+                continue
+            # Wygładzanie +1 żeby godziny bez danych nie dostały wagi 0
+            smoothed = [c + 1 for c in counts]
+            mean = sum(smoothed) / 24
+            self._profiles[source] = [c / mean for c in smoothed]
+
+    def _hour_factor(self, key):
+        """Mnożnik interwału dla bieżącej godziny (aktywna godzina -> krótszy interwał)"""
+        profile = self._profiles.get(key.split(':')[0])
+        if not profile:
+            return 1.0
+        weight = min(max(profile[datetime.now().hour], 0.5), 2.0)
+        return 1.0 / weight
+
+    def skip_rate(self, key):
+        """Udział (0-1) ostatnich cykli pominiętych przez niezmieniony odcisk strony"""
+        return self._skip_rates.get(key, 0.0)
+
+    def _record_skip(self, key, stats):
+        # Tylko źródła z odciskiem strony (OLX, Allegro) raportują 'unchanged' jawnie
+        if 'unchanged' not in stats:
+            return 0.0
+        previous = self._skip_rates.get(key)
+        skipped = 1.0 if stats['unchanged'] else 0.0
+        rate = skipped if previous is None else previous * 0.8 + skipped * 0.2
+        self._skip_rates[key] = rate
+        metrics.set_gauge('page_unchanged_rate', rate, source=key)
+        return rate
+
+    def record(self, key, stats=None):
+        """
+        Zapisuje wynik skanu i wyznacza następny termin.
+
+        Args:
+            stats: dict ze scrapera ('new' - liczba nowych ofert, 'unchanged' - strona bez zmian)
+                   albo None gdy skan się nie powiódł (interwał bez zmian)
+        """
+        settings = self._settings()
+        interval = self._intervals.get(key) or self._initial_interval()
+
+        if stats is not None:
+            skip_rate = self._record_skip(key, stats)
+            if stats.get('new', 0) > 0:
+                interval *= settings['speedup_factor']
+            elif stats.get('unchanged', True):
+                # Źródło, którego strona prawie zawsze stoi w miejscu, zwalnia szybciej
+                interval *= settings['slowdown_factor'] ** (1 + skip_rate)
+
+        interval = min(max(interval, settings['min_interval']), settings['max_interval'])
+        self._intervals[key] = interval
+
+        self._refresh_profiles()
+        effective = interval * self._hour_factor(key) * random.uniform(0.9, 1.1)
+        effective = min(max(effective, settings['min_interval']), settings['max_interval'])
+        self._next_run[key] = time.time() + effective
+
+        logger.info(
+            f"⏱️ [SCHEDULER] {key}: nowe={stats.get('new', 0) if stats else '-'} "
+            f"-> następny skan za {effective:.0f}s (bazowo {interval:.0f}s)"
+        )
+
+    def next_run_at(self, key):
+        """Termin następnego skanu (time.time()); 0 gdy harmonogram wyłączony - zawsze gotowy"""
+        if not self.enabled:
+            return 0
+        return self._next_run.get(key, 0)
+
+    def seconds_until_next(self, keys):
+        """Ile spać do najbliższego terminu spośród kluczy"""
+        if not self.enabled:
+            return self._initial_interval()
+        now = time.time()
+        pending = [self._next_run.get(key, 0) - now for key in keys]
+        wait = min(pending) if pending else self._settings()['min_interval']
+        return max(wait, self._settings()['min_sleep'])
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger('escraper.sessions')
+
+
+class SessionStore:
+    """
+    Stan przeglądarki (storage_state: ciasteczka + localStorage) zapisywany per źródło w sessions/<źródło>.json.
+    Nowy context źródła startuje z ostatniego stanu, więc restart i recykling przeglądarki nie gubią sesji.
+    fb_cookies.json zostaje tylko jako zasiew przy pierwszym uruchomieniu i ostatnia deska ratunku.
+
+    Stan jest zapisywany tylko gdy zawiera ciasteczka logowania źródła (required_cookies),
+    więc wylogowana sesja nigdy nie nadpisze dobrej.
+    """
+
+    def __init__(self, directory='sessions', cookies_path='fb_cookies.json',
+                 save_interval=600, required_cookies=None):
+        self.directory = directory
+        self.cookies_path = cookies_path
+        self.save_interval = save_interval
+        self.required_cookies = required_cookies or {}
+        self._saved_at = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config_loader, cookies_path='fb_cookies.json'):
+        settings = config_loader.get_sessions_config()
+        return cls(
+            settings['directory'],
+            cookies_path,
+            settings['save_interval_minutes'] * 60,
+            settings['required_cookies']
+        )
+
+    def _path(self, source):
+        return os.path.join(self.directory, f"{source}.json")
+
+    def _read_state(self, source):
+        try:
+            with open(self._path(source), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if isinstance(state, dict) and 'cookies' in state else None
+
+    def state_for(self, source):
+        """Zapisany storage_state źródła (dict dla new_context) albo None"""
+        return self._read_state(source)
+
+    def seed_cookies(self):
+        """Ciasteczka z fb_cookies.json (eksport z fb_login.py) albo None"""
+        if not os.path.exists(self.cookies_path):
+            return None
+        try:
+            with open(self.cookies_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ [SESSIONS] Nie można odczytać {self.cookies_path}: {e}")
+            return None
+
+    def _is_logged_in(self, source, state):
+        required = self.required_cookies.get(source) or ()
+        names = {cookie.get('name') for cookie in state.get('cookies', ())}
+        return all(name in names for name in required)
+
+    async def save(self, context, source, force=False):
+        """Zapisuje stan contextu (najwyżej co save_interval, chyba że force). Zwraca True po zapisie."""
+        if not force and time.time() - self._saved_at.get(source, 0) < self.save_interval:
+            return False
+        try:
+            state = await context.storage_state()
+        except Exception as e:
+            logger.debug(f"🔍 [SESSIONS] Nie można pobrać stanu {source}: {e}")
+            return False
+        if not self._is_logged_in(source, state):
+            logger.warning(f"⚠️ [SESSIONS] {source}: brak ciasteczek logowania - zostawiam poprzedni stan")
+            return False
+
+        path = self._path(source)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+        self._saved_at[source] = time.time()
+        logger.debug(f"💾 [SESSIONS] Zapisano stan {source} ({len(state.get('cookies', []))} ciasteczek)")
+        return True
+
+    async def restore(self, context, source):
+        """
+        Odzyskanie sesji w działającym contexcie (formularz logowania): ciasteczka z zapisanego stanu,
+        a gdy go brak - z fb_cookies.json. Zwraca liczbę wstrzykniętych ciasteczek.
+        """
+        state = self._read_state(source)
+        cookies = state['cookies'] if state and self._is_logged_in(source, state) else self.seed_cookies()
+        if not cookies:
+            return 0
+        await context.add_cookies(cookies)
+        return len(cookies)
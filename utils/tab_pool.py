@@ -0,0 +1,98 @@
+import asyncio
+import logging
+
+logger = logging.getLogger('escraper.tabs')
+
+
+class TabPool:
+    """
+    Pula wielokrotnie używanych kart w jednym contexcie: N kart otwieranych leniwie.
+    Zasoby blokuje ResourcePolicy contextu; `blocked` dodaje własny wzorzec route per karta
+    (dla contextów spoza puli przeglądarek). map() pobiera strony równolegle
+    (najwyżej N naraz) i zwraca wyniki w kolejności wejścia.
+
+    Użycie:
+        async with TabPool(context, size=4) as tabs:
+            results = await tabs.map(urls, extract)   # extract(page, url) -> wynik
+    """
+
+    def __init__(self, context, size=4, blocked=None):
+        self.context = context
+        self.size = max(1, size)
+        self.blocked = blocked
+        self._idle = asyncio.Queue()
+        self._tabs = []
+        self._opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _open_tab(self, wait=True):
+        """Nowa karta; None gdy wait=False, a context z limitem kart (PageLimitedContext) nie ma wolnego slotu"""
+        self._opened += 1
+        try:
+            new_tab = getattr(self.context, 'new_tab', None)
+            page = await new_tab(wait) if new_tab else await self.context.new_page()
+            if page is None:
+                self._opened -= 1
+                return None
+            if self.blocked:
+                await page.route(self.blocked, lambda route: route.abort())
+        except Exception:
+            self._opened -= 1
+            raise
+        self._tabs.append(page)
+        return page
+
+    async def _acquire(self):
+        # Na slot czeka tylko pierwsza karta; kolejne są otwierane, gdy slot jest wolny od ręki - inaczej
+        # czekamy na własne karty (pula czekająca na slot z kartami w ręku mogłaby zakleszczyć się z drugą)
+        if self._idle.empty() and self._opened < self.size:
+            page = await self._open_tab(wait=self._opened == 0)
+            if page is not None:
+                return page
+        while True:
+            page = await self._idle.get()
+            if page is not None:
+                return page
+            # Slot po karcie, która padła - otwórz nową w jej miejsce
+            try:
+                page = await self._open_tab(wait=self._opened == 0)
+            except Exception:
+                self._idle.put_nowait(None)
+                raise
+            if page is not None:
+                return page
+
+    def _release(self, page):
+        if page.is_closed():
+            self._tabs.remove(page)
+            self._opened -= 1
+            self._idle.put_nowait(None)
+        else:
+            self._idle.put_nowait(page)
+
+    async def run(self, url, extract):
+        """Nawigacja wolną kartą + extract(page, url); karta wraca do puli"""
+        page = await self._acquire()
+        try:
+            return await extract(page, url)
+        finally:
+            self._release(page)
+
+    async def map(self, urls, extract):
+        """Wyniki w kolejności urls; wyjątek z extract trafia na jego pozycję w liście"""
+        return await asyncio.gather(*(self.run(url, extract) for url in urls), return_exceptions=True)
+
+    async def close(self):
+        for page in self._tabs:
+            try:
+                if not page.is_closed():
+                    await page.close()
+            except Exception as e:
+                logger.debug(f"🔍 [TABS] Błąd zamykania karty: {e}")
+        self._tabs = []
+        self._opened = 0
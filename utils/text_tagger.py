@@ -0,0 +1,128 @@
+import re
+
+# Tagowanie treści ogłoszenia jednym przebiegiem regexa: stan, uszkodzenia, słowa kluczowe i zaprzeczenia.
+# Słowa w słownikach to prefiksy ostatniego wyrazu ("pęknię" łapie pęknięty / pęknięte / pęknięć),
+# wcześniejsze wyrazy frazy muszą pasować dokładnie ("na części").
+
+DEFAULT_DICTIONARIES = {
+    # Kolejność = priorytet stanu (pierwszy znaleziony wygrywa), brak trafień = 'working'
+    'condition': {
+        'locked': ['icloud', 'zablokowan', 'locked', 'activation lock'],
+        'parts': ['na części', 'na czesci', 'parts', 'uszkodzony nie włącza'],
+        'broken': ['uszkodzon', 'pęknię', 'rozbit', 'broken', 'cracked', 'zbit', 'damaged',
+                   'nie działa', 'nie włącza']
+    },
+    'damage': {
+        'ekran': ['ekran', 'wyświetlacz', 'screen', 'display'],
+        'obudowa': ['obudow', 'tył', 'plecki', 'back', 'housing'],
+        'bateria': ['bateri', 'battery', 'akumulator'],
+        'aparat': ['aparat', 'camera', 'kamer'],
+        'biometria': ['face id', 'faceid', 'touch id']
+    },
+    'keyword': {
+        'iphone': ['iphone'],
+        'apple': ['apple'],
+        'sale': ['sprzedam', 'na sprzedaż', 'for sale', 'nowa oferta'],
+        'buy': ['kupię', 'kupie'],
+        'new_post': ['dodał post', 'dodała post', 'added a post'],
+        'scratches': ['rys', 'zarysowan']
+    }
+}
+# Zaprzeczenie przed trafieniem ("nie ma rys", "bez pęknięć", "brak blokady icloud")
+DEFAULT_NEGATIONS = ['nie ma', 'bez', 'brak', 'zero', 'nie', 'no', 'without']
+# Słowa, które mogą stać między zaprzeczeniem a trafieniem ("bez żadnych rys", "nie jest zablokowany")
+NEGATION_FILLERS = ['żadnych', 'zadnych', 'jakichkolwiek', 'śladów', 'oznak', 'widocznych', 'blokady', 'jest', 'był']
+# Łączniki przedłużające zaprzeczenie na kolejne trafienie ("bez rys i pęknięć"); każde inne słowo kończy zaprzeczenie
+NEGATION_JOINERS = frozenset({'i', 'oraz', 'ani', 'czy', 'lub', 'ani też'})
+# Zaprzeczać można tylko stan / wady ("bez rys", "brak blokady"). Część po zaprzeczeniu to brak albo uszkodzenie
+# części ("brak face id", "bez ekranu"), więc tagi 'damage' zawsze liczą się jako trafienie
+NEGATABLE_CATEGORIES = frozenset({'condition', 'keyword'})
+
+
+def _phrase_pattern(phrase):
+    words = phrase.lower().split()
+    return r'\s+'.join(re.escape(w) for w in words) + r'\w*'
+
+
+class TextTagger:
+    """
+    Jeden skompilowany regex ze wszystkich słowników (grupa nazwana na słowo).
+
+    Args:
+        dictionaries: {'condition' | 'damage' | 'keyword': {tag: [słowa]}}
+        negations: słowa zaprzeczające trafieniu tuż za nimi
+    """
+
+    def __init__(self, dictionaries=None, negations=None):
+        self.dictionaries = dictionaries or DEFAULT_DICTIONARIES
+        self.conditions = tuple(self.dictionaries.get('condition', {}))
+        self.damage_order = tuple(self.dictionaries.get('damage', {}))
+
+        self._groups = {}
+        alternatives = []
+        for category, tags in self.dictionaries.items():
+            for tag, words in tags.items():
+                for word in words:
+                    name = f"k{len(self._groups)}"
+                    self._groups[name] = (category, tag)
+                    alternatives.append((_phrase_pattern(word), name))
+        # Dłuższe frazy pierwsze: "uszkodzony nie włącza" przed "uszkodzon"
+        alternatives.sort(key=lambda item: len(item[0]), reverse=True)
+        keywords = '|'.join(f"(?P<{name}>{pattern})" for pattern, name in alternatives)
+
+        negations = sorted(negations or DEFAULT_NEGATIONS, key=len, reverse=True)
+        negation = '|'.join(r'\s+'.join(re.escape(w) for w in n.split()) for n in negations)
+        fillers = '|'.join(re.escape(w) for w in NEGATION_FILLERS)
+        self._pattern = re.compile(
+            rf'(?<!\w)(?P<neg>(?:{negation})\s+(?:(?:{fillers})\s+)?)?(?:{keywords})',
+            re.IGNORECASE
+        )
+
+    @classmethod
+    def from_config(cls, section):
+        """Słowniki domyślne + sekcja tagger: z configu (tag z configu zastępuje domyślny)"""
+        section = section or {}
+        dictionaries = {category: dict(tags) for category, tags in DEFAULT_DICTIONARIES.items()}
+        for category in ('condition', 'damage', 'keyword'):
+            dictionaries[category].update(section.get(category) or {})
+        return cls(dictionaries, section.get('negations'))
+
+    def tag(self, text):
+        """
+        Returns:
+            dict: {
+                'condition': 'locked' | 'parts' | 'broken' | 'working',
+                'damages': lista części (kolejność słownika),
+                'keywords': zbiór tagów słów kluczowych,
+                'negated': zbiór tagów, które wystąpiły tylko z zaprzeczeniem
+            }
+        """
+        text = text or ""
+        hits = {'condition': set(), 'damage': set(), 'keyword': set()}
+        negated = set()
+        negation_end = None
+        for match in self._pattern.finditer(text):
+            category, tag = self._groups[match.lastgroup]
+            # Zaprzeczenie obejmuje trafienie i kolejne trafienia połączone "i" / "oraz" / "ani"
+            is_negated = category in NEGATABLE_CATEGORIES and (match.group('neg') is not None or (
+                negation_end is not None
+                and ' '.join(text[negation_end:match.start()].lower().split()) in NEGATION_JOINERS
+            ))
+            if is_negated:
+                negated.add(tag)
+                negation_end = match.end()
+            else:
+                hits.setdefault(category, set()).add(tag)
+                negation_end = None
+
+        condition = next((c for c in self.conditions if c in hits['condition']), 'working')
+        return {
+            'condition': condition,
+            'damages': [d for d in self.damage_order if d in hits['damage']],
+            'keywords': hits['keyword'],
+            'negated': negated - hits['condition'] - hits['damage'] - hits['keyword']
+        }
+
+    def tag_many(self, texts):
+        """Wsadowo: lista tekstów -> lista wyników tag()"""
+        return [self.tag(text) for text in texts]
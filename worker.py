@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Headless scrape worker - cykle scrapowania bez połączenia z Discord gateway.
+Oferty trafiają do wymiennego wyjścia (outbox JSONL / webhook / log),
+więc kilka workerów może działać w osobnych procesach lub kontenerach.
+
+Użycie:
+    python worker.py --worker-id w1 --output jsonl
+    python worker.py --record fixtures/cykl1 --cycles 1     # nagranie ruchu jednego cyklu
+    python worker.py --replay fixtures/cykl1 --cycles 1     # ten sam cykl bez sieci
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import datetime
+
+from utils.logger import setup_logger
+from utils.database import Database
+from utils.config_loader import ConfigLoader
+from utils.profitability import ProfitabilityCalculator
+from utils.ai_analyzer import AIAnalyzer
+from utils.browser_pool import BrowserPool
+from utils.cycle_executor import CycleExecutor
+from utils.memory_watchdog import MemoryWatchdog
+from utils.scheduler import AdaptiveScheduler
+from utils.outputs import create_output
+from utils.replay import ReplayMode
+from utils.metrics import metrics, start_metrics_server
+from scrapers.olx_scraper import OLXScraper
+from scrapers.fb_scraper import FacebookScraper
+from scrapers.allegro_scraper import AllegroScraper
+
+logger = logging.getLogger('escraper.worker')
+
+
+class ScrapeWorker:
+    """
+    Pętla cykli scrapowania niezależna od Discorda.
+    Wyjście (output) to dowolny obiekt z `async send(content=None, *, embed=None)` -
+    kanał Discord w procesie bota albo wyjście z utils.outputs w samodzielnym workerze.
+    """
+
+    def __init__(self, config, db, profit_calc, ai_analyzer=None, worker_id='main', replay=None):
+        self.config = config
+        self.db = db
+        self.worker_id = worker_id
+        self.replay = replay
+
+        self.olx_scraper = OLXScraper(db, config, profit_calc, ai_analyzer)
+        self.fb_scraper = FacebookScraper(db, config, profit_calc, ai_analyzer)
+        self.allegro_scraper = AllegroScraper(db, config, profit_calc, ai_analyzer)
+
+        # Jedna ciepła przeglądarka na cały proces (zamiast relaunchu co cykl)
+        self.browser_pool = BrowserPool(config, replay=replay)
+        if replay is not None:
+            replay.mount(self.olx_scraper.http.session)
+        # Recykling tylko po przekroczeniu progów pamięci (zamiast co N cykli)
+        self.memory_watchdog = MemoryWatchdog(config, self.browser_pool)
+        self.cycle_executor = CycleExecutor(self.browser_pool, self.memory_watchdog)
+        self.scheduler = AdaptiveScheduler(config, db)
+        self.metrics_server = None
+
+    def _allegro_enabled(self):
+        return self.config.config.get('sources', {}).get('allegro_lokalnie', {}).get('enabled', False)
+
+    def fb_group_urls(self):
+        return self.config.config.get('facebook', {}).get('priority_groups', [])
+
+    def _fb_groups_due(self):
+        next_run = self.db.get_next_group_run(self.fb_group_urls())
+        return next_run is not None and next_run <= time.time()
+
+    def scheduled(self, key, scrape):
+        """Opakowuje scraper tak, żeby wynik skanu trafił do harmonogramu"""
+        async def run(context, output):
+            stats = None
+            try:
+                stats = await scrape(context, output)
+                return stats
+            finally:
+                self.scheduler.record(key, stats)
+        return run
+
+    async def run_facebook(self, context, output):
+        """Facebook - OBA systemy: powiadomienia + grupa wybrana przez harmonogram"""
+        # 1. Najpierw sprawdź powiadomienia (szybkie)
+        if self.scheduler.is_due('facebook:notifications'):
+            stats = None
+            try:
+                stats = await self.fb_scraper.check_notifications(context, output)
+                logger.info("✅ [FB] Powiadomienia sprawdzone")
+            except Exception as e:
+                logger.warning(f"⚠️ [FB] Błąd powiadomień: {e}")
+                # Nie crashujemy całego FB z powodu powiadomień
+            finally:
+                self.scheduler.record('facebook:notifications', stats)
+
+        # 2. Potem najbardziej zaległa grupa (główny system)
+        # Dzierżawa w SQLite - kilka workerów bierze rozłączne grupy, wygasła dzierżawa wraca do puli
+        lease_seconds = self.config.config.get('facebook', {}).get('lease_seconds', 300)
+        group_url = self.db.claim_group(self.worker_id, self.fb_group_urls(), lease_seconds)
+        if group_url:
+            group_key = f"facebook:{group_url}"
+            scan = lambda ctx, out: self.fb_scraper.scan_group_feed(ctx, out, group_url)
+            try:
+                await self.scheduled(group_key, scan)(context, output)
+            finally:
+                self.db.release_group(self.worker_id, group_url, self.scheduler.next_run_at(group_key))
+
+    async def refresh_groups_if_needed(self):
+        """Automatyczne odświeżanie listy grup co 12 godzin"""
+        try:
+            # Snapshot z pamięci - plik czyta tylko reload_if_changed() po zmianie mtime
+            fb_config = self.config.config.get('facebook', {})
+            last_refresh = fb_config.get('last_groups_refresh')
+            refresh_hours = fb_config.get('refresh_groups_hours', 12)
+
+            now = datetime.now()
+            should_refresh = False
+
+            if not last_refresh:
+                should_refresh = True
+                logger.info("🔄 [GROUPS] Nigdy nie odświeżano grup - odświeżam...")
+            else:
+                if isinstance(last_refresh, str):
+                    last_refresh = datetime.fromisoformat(last_refresh)
+                time_diff = now - last_refresh
+                if time_diff.total_seconds() > refresh_hours * 3600:
+                    should_refresh = True
+                    logger.info(f"🔄 [GROUPS] Minęło {refresh_hours}h - odświeżam grupy...")
+
+            if should_refresh:
+                from extract_groups import extract_my_groups
+                groups_count = await extract_my_groups()
+
+                # Aktualizuj timestamp w configu (set_value dociąga grupy zapisane przez extract_groups)
+                self.config.set_value('facebook', 'last_groups_refresh', now.isoformat())
+
+                logger.info(f"✅ [GROUPS] Odświeżono {groups_count} grup")
+
+        except Exception as e:
+            logger.error(f"❌ [GROUPS] Błąd odświeżania grup: {e}")
+
+    async def start_metrics(self, port=None):
+        """Endpoint /metrics - jeden na proces; zajęty port nie zatrzymuje scrapowania"""
+        metrics_config = self.config.get_metrics_config()
+        if self.metrics_server is not None or not metrics_config['enabled']:
+            return
+        try:
+            self.metrics_server = await start_metrics_server(metrics_config['host'], port or metrics_config['port'])
+        except OSError as e:
+            logger.warning(f"⚠️ [METRICS] Nie można uruchomić endpointu metryk: {e}")
+
+    def write_metrics_summary(self):
+        summary_path = self.config.get_metrics_config()['summary_path']
+        if not summary_path:
+            return
+        # Bot i workery piszą na wspólny wolumen - każdy proces do własnego pliku (metrics_summary.<worker_id>.json)
+        base, ext = os.path.splitext(summary_path)
+        summary_path = f"{base}.{self.worker_id}{ext or '.json'}"
+        try:
+            metrics.write_summary(summary_path)
+        except OSError as e:
+            logger.debug(f"🔍 [METRICS] Nie można zapisać podsumowania: {e}")
+
+    async def run_cycle(self, cycle, output):
+        """Jeden cykl: źródła z terminem w harmonogramie, równolegle"""
+        # Przeładuj config tylko gdy plik zmienił się na dysku (mtime)
+        self.config.reload_if_changed()
+
+        # Automatyczne odświeżanie grup co 12 godzin (nie przy nagraniu/odtwarzaniu - osobna przeglądarka)
+        if self.replay is None:
+            await self.refresh_groups_if_needed()
+
+        # ASYNC ISOLATION - źródła równolegle, każde z własnym contextem i try...except
+        # Harmonogram decyduje które źródła mają już termin
+        sources = []
+        if self.scheduler.is_due('facebook:notifications') or self._fb_groups_due():
+            sources.append(('facebook', 'FB', self.run_facebook))
+        if self.scheduler.is_due('olx'):
+            sources.append(('olx', 'OLX', self.scheduled('olx', self.olx_scraper.scrape)))
+        if self._allegro_enabled() and self.scheduler.is_due('allegro'):
+            sources.append(('allegro', 'Allegro', self.scheduled('allegro', self.allegro_scraper.scrape)))
+
+        with metrics.span('cycle_total'):
+            results = await self.cycle_executor.run(sources, output)
+
+        # Podsumowanie cyklu
+        status_parts = [
+            f"{label}{'✅' if results[name] else '❌'}"
+            for name, label, _ in sources
+        ]
+        logger.info(f"✅ Cykl #{cycle} zakończony: {', '.join(status_parts)}")
+
+    async def run_forever(self, output, should_run=lambda: True, max_cycles=None):
+        """Pętla cykli aż should_run() zwróci False (albo po max_cycles cyklach)"""
+        await self.browser_pool.start()
+        await self.start_metrics()
+
+        cycle = 0
+        while True:
+            cycle += 1
+            logger.info(f"\n{'='*60}")
+            logger.info(f"🔄 CYKL #{cycle} [{self.worker_id}] - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            logger.info(f"{'='*60}")
+
+            # Sprawdź czy worker nadal ma działać
+            if not should_run():
+                logger.info("🛑 Worker zatrzymany")
+                break
+
+            try:
+                await self.run_cycle(cycle, output)
+            except Exception as e:
+                logger.error(f"⚠️ Błąd w głównej pętli (cykl #{cycle}): {e}")
+                logger.error(traceback.format_exc())
+                try:
+                    await output.send(f"⚠️ Błąd w głównej pętli: {str(e)[:100]}")
+                except Exception:
+                    pass
+
+            # Kroczące p50/p95 etapów - do porównań przed/po optymalizacjach
+            self.write_metrics_summary()
+
+            if max_cycles is not None and cycle >= max_cycles:
+                logger.info(f"🏁 Wykonano {cycle} cykli - kończę")
+                break
+
+            # MEMORY WATCHDOG - RSS przeglądarki i Pythona, recykling tylko po przekroczeniu progów
+            try:
+                await self.memory_watchdog.check()
+                await self.browser_pool.end_cycle()
+            except Exception as e:
+                logger.warning(f"⚠️ [MEMORY] Błąd sprawdzania pamięci: {e}")
+
+            # Śpij do najbliższego terminu w harmonogramie (bez harmonogramu: losowy interwał z konfiguracji)
+            keys = ['facebook:notifications', 'olx']
+            if self._allegro_enabled():
+                keys.append('allegro')
+            wait_time = self.scheduler.seconds_until_next(keys)
+            # Terminy grup FB są wspólne dla workerów (tabela dzierżaw)
+            next_group_run = self.db.get_next_group_run(self.fb_group_urls())
+            if self.scheduler.enabled and next_group_run is not None:
+                min_sleep = self.config.get_scheduler_config()['min_sleep']
+                wait_time = min(wait_time, max(next_group_run - time.time(), min_sleep))
+            logger.info(f"💤 Czekam {wait_time:.0f}s do następnego cyklu...")
+            await asyncio.sleep(wait_time)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Headless scrape worker (bez Discord gateway)")
+    parser.add_argument('--config', default='config.yaml', help="Ścieżka do config.yaml")
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Unikalna nazwa workera (dzierżawy grup FB, plik outbox)")
+    parser.add_argument('--output', choices=['jsonl', 'webhook', 'log'], default=None,
+                        help="Wyjście ofert (domyślnie worker.output z config.yaml)")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Port endpointu /metrics (domyślnie metrics.port z config.yaml)")
+    parser.add_argument('--cycles', type=int, default=None,
+                        help="Zakończ po N cyklach (domyślnie bez końca)")
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument('--record', metavar='KATALOG', default=None,
+                          help="Nagraj ruch sieciowy cykli do HAR / plików odpowiedzi HTTP")
+    fixtures.add_argument('--replay', metavar='KATALOG', default=None,
+                          help="Odtwórz nagrane cykle bez sieci, Discorda i AI")
+    args = parser.parse_args()
+
+    setup_logger()
+    config = ConfigLoader(args.config)
+    worker_config = config.get_worker_config()
+    profit_calc = ProfitabilityCalculator(config)
+
+    replay = None
+    if args.record or args.replay:
+        replay = ReplayMode('record' if args.record else 'replay', args.record or args.replay)
+        # Świeża baza i lokalny outbox w katalogu nagrania, bez AI (deterministyczny przebieg)
+        db = Database(replay.database_path())
+        ai_analyzer = None
+        output = create_output(args.output or 'jsonl', os.path.join(replay.directory, 'outbox'), replay.mode)
+    else:
+        # Nie czyść tabeli ofert - dzielą ją wszyscy workerzy i bot
+        db = Database(reset_offers=False)
+        ai_analyzer = AIAnalyzer(config)
+        output = create_output(args.output or worker_config['output'], worker_config['outbox_dir'], args.worker_id)
+    worker = ScrapeWorker(config, db, profit_calc, ai_analyzer, worker_id=args.worker_id, replay=replay)
+
+    logger.info(f"🚀 Worker {args.worker_id} startuje (wyjście: {args.output or worker_config['output']})")
+    try:
+        await worker.start_metrics(args.metrics_port)
+        await worker.run_forever(output, max_cycles=args.cycles)
+    finally:
+        await worker.browser_pool.close()
+        if hasattr(output, 'close'):
+            await output.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())